@@ -1,20 +1,37 @@
+import os
 from contextvars import ContextVar
+from typing import Literal
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
+from api.v1.schemas import FilterPayload
+from core.repositories.alchemy.models import VoiceStatus
 from filters.filter_engine import SqlAlchemyFilterEngine
 from filters.models import Shop
-from ss.audit.decorators import audit_event
+from monitoring import init as init_monitoring
+from monitoring.loop_monitor import loop_monitor
+from monitoring.multiprocess import prepare_directory
+from ss.audit import audit_event
+from ss.audit import init as init_audit
+from uow.di import get_current_user, get_service_with_session, get_service_with_uow, voice_export_response
 
 app = FastAPI()
+init_audit()
 
 
 req: ContextVar[Request] = ContextVar("request")
 
 
+@app.on_event("startup")
+async def start_loop_monitor():
+    # Мониторинг блокировок event loop; во время работы переключается loop_monitor.start()/stop()
+    if os.getenv("LOOP_MONITOR"):
+        loop_monitor.start()
+
+
 async def foo():
     r = req.get(None)
     for k, v in r.items():
@@ -30,7 +47,6 @@ async def hello_world():
 @app.get("/login")
 @audit_event("Логин")
 async def login():
-    a = 2 / 0
     return JSONResponse({"token": "<PASSWORD>"})
 
 
@@ -40,6 +56,37 @@ async def list():
     return JSONResponse({"token": "<PASSWORD>"})
 
 
+@app.post("/voices/export")
+async def export_voices(
+    filter_payload: FilterPayload, format: Literal["ndjson", "csv"] = "ndjson", user=Depends(get_current_user)
+):
+    return voice_export_response(filter_payload, user, format)
+
+
+@app.post("/voices/page")
+async def voices_page(
+    filter_payload: FilterPayload,
+    limit: int = 50,
+    offset: int = 0,
+    user=Depends(get_current_user),
+    service=Depends(get_service_with_session),
+):
+    # Тело уже сериализовано сервисом, повторная сериализация FastAPI не нужна
+    body = await service.get_voices_json(filter_payload, user, limit, offset)
+    return Response(body, media_type="application/json")
+
+
+@app.post("/voices/status", status_code=204)
+async def change_voices_status(
+    filter_payload: FilterPayload,
+    new_status: VoiceStatus,
+    user=Depends(get_current_user),
+    service=Depends(get_service_with_uow),
+):
+    await service.change_status_by_filter(filter_payload, new_status, user)
+    return Response(status_code=204)
+
+
 @app.middleware("http")
 async def create_context(request: Request, call_next):
     token = req.set(request)
@@ -50,5 +97,9 @@ async def create_context(request: Request, call_next):
     return response
 
 
+init_monitoring(app)
+
+
 if __name__ == "__main__":
+    prepare_directory()
     uvicorn.run("app:app", host="127.0.0.1", port=7000, reload=True)
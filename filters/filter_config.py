@@ -21,3 +21,17 @@ SOURCE_FIELD_MAP = {
     FilterSource.ASSIGMENT_AREA: ("status", [StatusChoices.NEW]),
     FilterSource.WORK_AREA: ("status", [StatusChoices.IN_PROGRESS]),
 }
+
+
+def unknown_role_mask(snapshot, user):
+    return snapshot.none()
+
+
+def operator_role_mask(snapshot, user):
+    return snapshot.eq("user_id", user.id) | (snapshot.is_null("user_id") & snapshot.eq("status", StatusChoices.NEW))
+
+
+MAPPING_ROLES_MASKS = {
+    UserRole.ADMIN: lambda snapshot, user: snapshot.all(),
+    UserRole.OPERATOR: operator_role_mask,
+}
@@ -7,13 +7,28 @@ from core.repositories.filters.filter_config import (
     SOURCE_FIELD_MAP,
     unknown_role_filter,
 )
-from sqlalchemy import Select, and_, or_, select
+from core.repositories.filters.strategy import (
+    AdaptiveStrategySelector,
+    FilterShape,
+    FilterStrategy,
+    default_strategy_selector,
+)
+from core.repositories.filters.text_search import text_contains, text_icontains, text_match, text_startswith
+from sqlalchemy import Select, and_, false, or_, select, true
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.util import ClauseAdapter
 
 
 class SqlAlchemyFilterEngine:
-    def __init__(self, model, white_list: Optional[list[str]]):
+    def __init__(
+        self,
+        model,
+        white_list: Optional[list[str]],
+        strategy_selector: AdaptiveStrategySelector | None = default_strategy_selector,
+    ):
         self.model = model
         self.white_list = white_list or []
+        self.strategy_selector = strategy_selector
         self.operator_map: dict[str, Callable[[Any, Any], Any]] = {
             "=": lambda col, val: col == val,
             "!=": lambda col, val: col != val,
@@ -25,11 +40,17 @@ class SqlAlchemyFilterEngine:
             "not_in": lambda col, val: ~col.in_(val),
             "is_null": lambda col, val: col.is_(None) if val else col.is_not(None),
             "between": lambda col, val: col.between(val[0], val[1]),
+            "contains": text_contains,
+            "icontains": text_icontains,
+            "startswith": text_startswith,
+            "match": text_match,
         }
 
     def _voice_filter(self, payload: FilterPayload):
-        and_clauses = list(filter(None, [self._build_clause(f) for f in payload.and_ if f.field in self.white_list]))
-        or_clauses = list(filter(None, [self._build_clause(f) for f in payload.or_ if f.field in self.white_list]))
+        and_clauses = [self._build_clause(f) for f in payload.and_ if f.field in self.white_list]
+        or_clauses = [self._build_clause(f) for f in payload.or_ if f.field in self.white_list]
+        and_clauses = [clause for clause in and_clauses if clause is not None]
+        or_clauses = [clause for clause in or_clauses if clause is not None]
         result = []
         if and_clauses:
             result.append(and_(*and_clauses))
@@ -38,9 +59,9 @@ class SqlAlchemyFilterEngine:
         return result
 
     def _build_clause(self, f):
-        col = getattr(self.model, f.field)
+        col = getattr(self.model, f.field, None)
         op_func = self.operator_map.get(f.op)
-        return op_func(col, f.value) if col and op_func else None
+        return op_func(col, f.value) if col is not None and op_func else None
 
     def _role_filter(self, user):
         return MAPPING_ROLES_DATA.get(user.role, unknown_role_filter)(self.model, user)
@@ -60,43 +81,107 @@ class SqlAlchemyFilterEngine:
         deep_date = datetime.now(timezone.utc) - timedelta(days=30)
         return self.model.created_at >= deep_date
 
-    def build_stmt(self, base_stmt: Select, payload: FilterPayload, user, use_cte) -> Select:
+    def _is_entity_stmt(self, base_stmt: Select) -> bool:
+        descriptions = base_stmt.column_descriptions
+        return len(descriptions) == 1 and descriptions[0].get("expr") is self.model
+
+    def _chain_ctes(self, base_stmt: Select, filters: dict[str, Any]) -> Select:
+        # Все колонки модели нужны в каждом CTE, чтобы условия можно было перенести на колонки CTE
+        is_entity = self._is_entity_stmt(base_stmt)
+        initial = base_stmt if is_entity else base_stmt.with_only_columns(*self.model.__table__.columns)
+        cte = initial.cte("initial")
+        for name, conditions in filters.items():
+            if conditions is None:
+                continue
+            if isinstance(conditions, bool):
+                conditions = true() if conditions else false()
+            conditions = ClauseAdapter(cte).traverse(conditions)
+            cte = select(cte).where(conditions).cte(name).prefix_with("NOT MATERIALIZED")
+        if is_entity:
+            return select(aliased(self.model, cte))
+        adapter = ClauseAdapter(cte)
+        return select(*[adapter.traverse(col) for col in base_stmt.selected_columns])
+
+    def build_stmt(self, base_stmt: Select, payload: FilterPayload, user, strategy: FilterStrategy) -> Select:
         role_filter = self._role_filter(user)
         source_filter = self._source_filter(payload.source)
         voice_filters = self._voice_filter(payload)
         top_filter = self._top_filter()
         deep_search = self._deep_search()
 
-        if use_cte:
-            cte = base_stmt.cte("initial")
-            filters = {
-                "deep_search": deep_search,
-                "role_filter": role_filter,
-                "source_filter": source_filter,
-                "top_filter": top_filter,
-                "voice_filters": and_(*voice_filters) if voice_filters else None,
-            }
-            for name, conditions in filters:
-                if conditions is not None:
-                    cte = select(cte).where(conditions).cte(name).prefix_with("NOT MATERIALIZED")
-            stmt = select(cte)
+        if strategy == FilterStrategy.CTE:
+            stmt = self._chain_ctes(
+                base_stmt,
+                {
+                    "deep_search": deep_search,
+                    "role_filter": role_filter,
+                    "source_filter": source_filter,
+                    "top_filter": top_filter,
+                    "voice_filters": and_(*voice_filters) if voice_filters else None,
+                },
+            )
+        elif strategy == FilterStrategy.HYBRID:
+            # Дешёвые системные условия — в WHERE базового запроса, пользовательские — отдельным CTE
+            base_stmt = base_stmt.where(role_filter, source_filter, top_filter, deep_search)
+            stmt = self._chain_ctes(base_stmt, {"voice_filters": and_(*voice_filters) if voice_filters else None})
         else:
             stmt = base_stmt.where(role_filter, source_filter, *voice_filters, top_filter, deep_search)
 
         return stmt
 
+    def _shape(self, payload: FilterPayload, user, use_sorting: bool) -> FilterShape:
+        return FilterShape.from_payload(
+            payload,
+            user,
+            use_sorting,
+            fields=self.white_list,
+            operators=self.operator_map,
+            sort_columns=self.model.__table__.columns.keys(),
+        )
+
+    def choose_strategy(
+        self,
+        payload: FilterPayload,
+        user,
+        use_sorting: bool = False,
+        override: FilterStrategy | None = None,
+    ) -> FilterStrategy:
+        """
+        Определяет стратегию построения запроса для формы фильтра.
+
+        Ручная стратегия override имеет приоритет; иначе решение принимает strategy_selector.
+        """
+        if self.strategy_selector is None:
+            return override or FilterStrategy.CTE
+        shape = self._shape(payload, user, use_sorting)
+        return self.strategy_selector.choose(shape, override=override)
+
+    def record_latency(
+        self, payload: FilterPayload, user, strategy: FilterStrategy, seconds: float, use_sorting: bool = False
+    ):
+        """
+        Сообщает селектору время выполнения запроса, построенного по стратегии strategy.
+        """
+        if self.strategy_selector is not None:
+            shape = self._shape(payload, user, use_sorting)
+            self.strategy_selector.record_latency(shape, strategy, seconds)
+
     def apply(
         self,
         payload: FilterPayload,
         user,
         base_stmt: Select | None = None,
         use_sorting: bool = False,
-        use_cte: bool = True,
+        use_cte: bool | None = None,
+        strategy: FilterStrategy | None = None,
     ) -> Select:
-        base_stmt = base_stmt or select(self.model)
-        stmt = self.build_stmt(base_stmt, payload, user, use_cte)
-        global_order_col = getattr(stmt, payload.global_order_by, None)
-        if use_sorting and global_order_col:
+        base_stmt = base_stmt if base_stmt is not None else select(self.model)
+        if strategy is None:
+            override = None if use_cte is None else FilterStrategy.CTE if use_cte else FilterStrategy.INLINE
+            strategy = self.choose_strategy(payload, user, use_sorting, override)
+        stmt = self.build_stmt(base_stmt, payload, user, strategy)
+        global_order_col = stmt.selected_columns.get(payload.global_order_by)
+        if use_sorting and global_order_col is not None:
             stmt = stmt.order_by(
                 global_order_col.desc() if payload.global_order_direction == "desc" else global_order_col.asc()
             )
@@ -1,15 +1,17 @@
-import asyncio
-
 from api.v1.schemas import FilterPayload
 from core.models.voice import ApiVoice
 from core.repositories.alchemy.db import AsyncSessionLocal
 from core.repositories.alchemy.models import SqlCategory, SqlVoice
 from core.repositories.base_repository import BaseRepository
 from core.repositories.filters.filter_engine import SqlAlchemyFilterEngine
-from sqlalchemy import func, select
+from sqlalchemy import func, inspect, select
 from sqlalchemy.exc import SQLAlchemyError
+from monitoring.db import instrument_repository
+from uow.fanout import ConcurrentReader
+from uow.routing import read_engine
 
 
+@instrument_repository
 class SqlAlchemyRepository(BaseRepository):
     def __init__(self, db: AsyncSessionLocal):
         self.db = db
@@ -65,14 +67,24 @@ class SqlAlchemyRepository(BaseRepository):
         self, filter_payload: FilterPayload, user, limit: int, offset: int
     ) -> tuple[list[ApiVoice], int]:
         filter_engine = SqlAlchemyFilterEngine(model=self.voice_model, white_list=self.voice_model.FILTER_WHITE_LIST)
-        stmt_voice = filter_engine.apply(filter_payload, user)
+        # Строки, а не ORM-объекты: страница может читаться в короткоживущей сессии ConcurrentReader
+        base_stmt = select(*(getattr(self.voice_model, attr.key) for attr in inspect(self.voice_model).column_attrs))
+        stmt_voice = filter_engine.apply(filter_payload, user, base_stmt=base_stmt)
         stmt_voice = stmt_voice.limit(limit).offset(offset)
-        stmt_voice_cnt = select(func.count()).select_from(filter_engine.apply(filter_payload, user))
-        voice_result, total_result = await asyncio.gather(
-            self.db.execute(stmt_voice),
-            self.db.execute(stmt_voice_cnt),
-        )
-        voices = voice_result.scalars().all()
-        total = total_result.scalar_one()
+        stmt_voice_cnt = select(func.count()).select_from(filter_engine.apply(filter_payload, user).subquery())
+
+        async def fetch_page(session):
+            result = await session.execute(stmt_voice)
+            return [dict(row) for row in result.mappings()]
+
+        async def fetch_total(session):
+            result = await session.execute(stmt_voice_cnt)
+            return result.scalar_one()
+
+        engine = read_engine(self.db)
+        if engine is not None:
+            rows, total = await ConcurrentReader(engine).run(fetch_page, fetch_total)
+        else:
+            rows, total = await fetch_page(self.db), await fetch_total(self.db)
 
-        return voices, total
+        return [self.voice_model(**row) for row in rows], total
@@ -0,0 +1,161 @@
+import enum
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Collection, Optional
+
+if TYPE_CHECKING:
+    from api.v1.schemas import FilterPayload
+
+
+class FilterStrategy(str, enum.Enum):
+    INLINE = "inline"
+    CTE = "cte"
+    HYBRID = "hybrid"
+
+
+@dataclass(frozen=True)
+class FilterShape:
+    """
+    Форма фильтра: набор полей и операторов без конкретных значений.
+
+    В форму попадают только поля из белого списка и известные операторы (остальные условия движок
+    отбрасывает), поэтому число форм ограничено и пользовательский ввод не раздувает статистику.
+    """
+
+    source: str
+    role: str
+    and_: tuple[tuple[str, str], ...]
+    or_: tuple[tuple[str, str], ...]
+    sorting: Optional[str] = None
+
+    @classmethod
+    def from_payload(
+        cls,
+        payload: "FilterPayload",
+        user,
+        use_sorting: bool = False,
+        fields: Collection[str] = (),
+        operators: Collection[str] = (),
+        sort_columns: Collection[str] = (),
+    ) -> "FilterShape":
+        """
+        Args:
+            payload: Объект FilterPayload.
+            user: Объект пользователя.
+            use_sorting: Учитывается ли сортировка.
+            fields: Белый список полей фильтра.
+            operators: Поддерживаемые операторы.
+            sort_columns: Колонки, по которым возможна сортировка.
+        """
+
+        def conditions(filters) -> tuple[tuple[str, str], ...]:
+            return tuple(sorted({(f.field, f.op) for f in filters if f.field in fields and f.op in operators}))
+
+        return cls(
+            source=str(getattr(payload.source, "value", payload.source)),
+            role=str(getattr(user.role, "value", user.role)),
+            and_=conditions(payload.and_),
+            or_=conditions(payload.or_),
+            sorting=payload.global_order_by if use_sorting and payload.global_order_by in sort_columns else None,
+        )
+
+
+@dataclass
+class StrategyStats:
+    samples: int = 0
+    latency: float = 0.0
+
+    def observe(self, value: float, alpha: float):
+        self.latency = value if not self.samples else alpha * value + (1 - alpha) * self.latency
+        self.samples += 1
+
+
+@dataclass
+class StrategyDecision:
+    shape: FilterShape
+    strategy: FilterStrategy
+    reason: str
+    stats: dict[str, dict] = field(default_factory=dict)
+
+
+class AdaptiveStrategySelector:
+    """
+    Выбирает стратегию построения запроса (inline, цепочка CTE или гибрид) для каждой формы фильтра.
+
+    Пока у стратегии меньше `min_samples` замеров, она выбирается по очереди (разведка).
+    Дальше выбирается стратегия с наименьшей сглаженной задержкой. Ручное закрепление имеет
+    приоритет над статистикой.
+    """
+
+    def __init__(
+        self,
+        strategies: tuple[FilterStrategy, ...] = tuple(FilterStrategy),
+        default: FilterStrategy = FilterStrategy.CTE,
+        min_samples: int = 5,
+        alpha: float = 0.2,
+        history_size: int = 256,
+    ):
+        self.strategies = strategies
+        self.default = default
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self._stats: dict[FilterShape, dict[FilterStrategy, StrategyStats]] = {}
+        self._pinned: dict[FilterShape | None, FilterStrategy] = {}
+        self._history: deque[StrategyDecision] = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    def pin(self, strategy: FilterStrategy, shape: FilterShape | None = None):
+        """
+        Закрепляет стратегию для формы фильтра; без формы — для всех форм.
+        """
+        with self._lock:
+            self._pinned[shape] = strategy
+
+    def unpin(self, shape: FilterShape | None = None):
+        with self._lock:
+            self._pinned.pop(shape, None)
+
+    def choose(self, shape: FilterShape, override: FilterStrategy | None = None) -> FilterStrategy:
+        with self._lock:
+            strategy, reason = self._choose(shape, override)
+            self._history.append(StrategyDecision(shape, strategy, reason, self._stats_snapshot(shape)))
+        return strategy
+
+    def _choose(self, shape: FilterShape, override: FilterStrategy | None) -> tuple[FilterStrategy, str]:
+        if override is not None:
+            return override, "override"
+        pinned = self._pinned.get(shape) or self._pinned.get(None)
+        if pinned is not None:
+            return pinned, "pinned"
+
+        stats = self._stats.get(shape, {})
+        for strategy in self.strategies:
+            if stats.get(strategy, StrategyStats()).samples < self.min_samples:
+                return strategy, "explore"
+
+        measured = {s: st.latency for s, st in stats.items() if s in self.strategies}
+        if measured:
+            return min(measured, key=measured.get), "latency"
+        return self.default, "default"
+
+    def record_latency(self, shape: FilterShape, strategy: FilterStrategy, seconds: float):
+        with self._lock:
+            self._stats.setdefault(shape, {}).setdefault(strategy, StrategyStats()).observe(seconds, self.alpha)
+
+    def _stats_snapshot(self, shape: FilterShape) -> dict[str, dict]:
+        return {s.value: {"samples": st.samples, "latency": st.latency} for s, st in self._stats.get(shape, {}).items()}
+
+    def decisions(self) -> list[StrategyDecision]:
+        """
+        Возвращает последние принятые решения (от старых к новым).
+        """
+        with self._lock:
+            return list(self._history)
+
+    def stats(self) -> dict[FilterShape, dict[str, dict]]:
+        with self._lock:
+            return {shape: self._stats_snapshot(shape) for shape in self._stats}
+
+
+default_strategy_selector = AdaptiveStrategySelector()
@@ -0,0 +1,244 @@
+import re
+
+from sqlalchemy import Boolean, String, event, false, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import coercions, roles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+LIKE_ESCAPE = "\\"
+
+# Функция SQLite для регистронезависимого поиска: встроенные lower() и LIKE понижают регистр только ASCII
+SQLITE_LOWER = "unicode_lower"
+
+
+def escape_like(value: str) -> str:
+    return value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+
+def prefix_upper_bound(prefix: str) -> str | None:
+    """
+    Возвращает наименьшую строку, большую всех строк с префиксом prefix (для BINARY-сравнения).
+    """
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+def _unicode_lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function(SQLITE_LOWER, 1, _unicode_lower, deterministic=True)
+
+
+def register_sqlite_functions(engine) -> None:
+    """
+    Регистрирует функции SQLite, нужные text_icontains, на соединениях движка.
+
+    Вызывается сразу после создания движка, до первого соединения. Для других диалектов ничего не делает,
+    повторный вызов безопасен.
+
+    Args:
+        engine: Engine или AsyncEngine (sqlite и aiosqlite).
+    """
+    engine = getattr(engine, "sync_engine", engine)
+    if engine.dialect.name != "sqlite" or event.contains(engine, "connect", _register_sqlite_functions):
+        return
+    event.listen(engine, "connect", _register_sqlite_functions)
+
+
+def _bind(value) -> ColumnElement:
+    return literal(value, type_=String())
+
+
+def _column(column) -> ColumnElement:
+    return coercions.expect(roles.ExpressionElementRole, column)
+
+
+class TextContains(ColumnElement):
+    """
+    Поиск подстроки.
+
+    PostgreSQL: `LIKE`/`ILIKE` по шаблону `%...%` (использует GIN-индекс pg_trgm).
+    SQLite: `instr()`; для регистронезависимого поиска обе строки приводятся к нижнему регистру
+    функцией unicode_lower (встроенные lower() и LIKE в SQLite работают только с ASCII).
+    """
+
+    type = Boolean()
+    _is_implicitly_boolean = True
+    inherit_cache = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("value", InternalTraversal.dp_clauseelement),
+        ("pattern", InternalTraversal.dp_clauseelement),
+        ("case_sensitive", InternalTraversal.dp_boolean),
+    ]
+
+    def __init__(self, column, value: str, case_sensitive: bool = True):
+        self.column = _column(column)
+        self.value = _bind(value)
+        self.pattern = _bind(f"%{escape_like(value)}%")
+        self.case_sensitive = case_sensitive
+
+
+class TextStartsWith(ColumnElement):
+    """
+    Поиск по префиксу.
+
+    PostgreSQL: `LIKE 'prefix%'` (использует btree-индекс с text_pattern_ops или COLLATE "C").
+    SQLite: диапазон `col >= prefix AND col < upper`, который использует обычный индекс.
+    """
+
+    type = Boolean()
+    _is_implicitly_boolean = True
+    inherit_cache = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("value", InternalTraversal.dp_clauseelement),
+        ("pattern", InternalTraversal.dp_clauseelement),
+        ("upper", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, column, value: str):
+        self.column = _column(column)
+        self.value = _bind(value)
+        self.pattern = _bind(f"{escape_like(value)}%")
+        upper = prefix_upper_bound(value)
+        self.upper = _bind(upper) if upper is not None else None
+
+
+class TextMatch(ColumnElement):
+    """
+    Полнотекстовый поиск.
+
+    PostgreSQL: `to_tsvector(config, col) @@ plainto_tsquery(config, :q)`; конфигурация
+    выводится литералом, чтобы запрос совпадал с функциональным GIN-индексом.
+    SQLite: `pk IN (SELECT rowid FROM fts WHERE fts MATCH :q)` по таблице FTS5 модели
+    (атрибут FTS_TABLE); без неё — вхождение всех слов запроса.
+    """
+
+    type = Boolean()
+    _is_implicitly_boolean = True
+    inherit_cache = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("terms", InternalTraversal.dp_clauseelement_tuple),
+        ("query", InternalTraversal.dp_clauseelement),
+        ("fts_query", InternalTraversal.dp_clauseelement),
+        ("pk", InternalTraversal.dp_clauseelement),
+        ("config", InternalTraversal.dp_string),
+        ("fts_table", InternalTraversal.dp_string),
+    ]
+
+    def __init__(self, column, query: str, pk=None, config: str = "simple", fts_table: str | None = None):
+        terms = re.findall(r"\w+", query)
+        self.column = _column(column)
+        self.terms = tuple(TextContains(column, term, case_sensitive=False) for term in terms)
+        self.query = _bind(query)
+        self.fts_query = _bind(self._fts5_query(self.column.key, terms))
+        self.pk = pk
+        self.config = config
+        self.fts_table = fts_table if pk is not None else None
+
+    @staticmethod
+    def _fts5_query(column_name: str, terms: list[str]) -> str:
+        # Каждое слово — отдельная фраза в кавычках, чтобы ввод пользователя не разбирался как синтаксис FTS5
+        phrases = " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+        return f"{column_name} : ({phrases})" if phrases else '""'
+
+
+@compiles(TextContains)
+def _contains_default(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    pattern = compiler.process(element.pattern, **kw)
+    if element.case_sensitive:
+        return f"({column} LIKE {pattern} ESCAPE '{LIKE_ESCAPE}')"
+    return f"(lower({column}) LIKE lower({pattern}) ESCAPE '{LIKE_ESCAPE}')"
+
+
+@compiles(TextContains, "postgresql")
+def _contains_postgresql(element, compiler, **kw):
+    operator = "LIKE" if element.case_sensitive else "ILIKE"
+    column = compiler.process(element.column, **kw)
+    return f"({column} {operator} {compiler.process(element.pattern, **kw)} ESCAPE '{LIKE_ESCAPE}')"
+
+
+@compiles(TextContains, "sqlite")
+def _contains_sqlite(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    value = compiler.process(element.value, **kw)
+    if element.case_sensitive:
+        return f"(instr({column}, {value}) > 0)"
+    return f"(instr({SQLITE_LOWER}({column}), {SQLITE_LOWER}({value})) > 0)"
+
+
+@compiles(TextStartsWith)
+def _startswith_default(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    return f"({column} LIKE {compiler.process(element.pattern, **kw)} ESCAPE '{LIKE_ESCAPE}')"
+
+
+@compiles(TextStartsWith, "sqlite")
+def _startswith_sqlite(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    lower = f"{column} >= {compiler.process(element.value, **kw)}"
+    if element.upper is None:
+        return f"({lower})"
+    return f"({lower} AND {column} < {compiler.process(element.upper, **kw)})"
+
+
+@compiles(TextMatch)
+def _match_default(element, compiler, **kw):
+    if not element.terms:
+        return "(1 = 0)"
+    return "(" + " AND ".join(compiler.process(term, **kw) for term in element.terms) + ")"
+
+
+@compiles(TextMatch, "postgresql")
+def _match_postgresql(element, compiler, **kw):
+    config = compiler.render_literal_value(element.config, String())
+    column = compiler.process(element.column, **kw)
+    query = compiler.process(element.query, **kw)
+    return f"(to_tsvector({config}, {column}) @@ plainto_tsquery({config}, {query}))"
+
+
+@compiles(TextMatch, "sqlite")
+def _match_sqlite(element, compiler, **kw):
+    if element.fts_table is None:
+        return _match_default(element, compiler, **kw)
+    table = compiler.preparer.quote(element.fts_table)
+    pk = compiler.process(element.pk, **kw)
+    query = compiler.process(element.fts_query, **kw)
+    return f"({pk} IN (SELECT rowid FROM {table} WHERE {table} MATCH {query}))"
+
+
+def text_contains(col, val):
+    return TextContains(col, val, case_sensitive=True)
+
+
+def text_icontains(col, val):
+    return TextContains(col, val, case_sensitive=False)
+
+
+def text_startswith(col, val):
+    return TextStartsWith(col, val) if val else col.is_not(None)
+
+
+def text_match(col, val):
+    # Пустой запрос (нет ни одного слова) ничего не находит, а не совпадает со всеми строками
+    if not re.search(r"\w", val):
+        return false()
+    model = col.class_
+    pk = model.__mapper__.primary_key[0] if len(model.__mapper__.primary_key) == 1 else None
+    return TextMatch(
+        col,
+        val,
+        pk=pk,
+        config=getattr(model, "FTS_CONFIG", "simple"),
+        fts_table=getattr(model, "FTS_TABLE", None),
+    )
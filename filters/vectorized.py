@@ -0,0 +1,203 @@
+import enum
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, Optional
+
+import numpy as np
+
+from api.v1.schemas import FilterPayload, FilterSource
+from core.repositories.filters.filter_config import (
+    MAPPING_ROLES_MASKS,
+    SOURCE_FIELD_MAP,
+    unknown_role_mask,
+)
+
+
+def _utc(value: datetime) -> np.datetime64:
+    # Наивные значения (SQLite не хранит часовой пояс) считаются UTC, как и в SQL-ветке
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+def _normalize(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return _utc(value)
+    return value
+
+
+class ColumnarSnapshot:
+    """
+    Колоночный снимок строк таблицы в массивах NumPy.
+
+    Для каждого поля хранится массив значений и маска NULL. Сравнения выполняются
+    только по не-NULL элементам, что повторяет трёхзначную логику SQL:
+    строка с NULL не проходит ни `=`, ни `!=`, ни `in`, ни `not_in`. Даты хранятся
+    как datetime64 в UTC, поэтому наивные и aware-значения сравниваются одинаково.
+    """
+
+    def __init__(self, values: dict[str, np.ndarray], nulls: dict[str, np.ndarray], size: int):
+        self.values = values
+        self.nulls = nulls
+        self.size = size
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any], fields: Iterable[str]) -> "ColumnarSnapshot":
+        """
+        Строит снимок из ORM-объектов или словарей (например, `result.mappings()`).
+
+        Args:
+            rows: Строки для снимка.
+            fields: Имена колонок, которые нужно перенести в снимок.
+        """
+        rows = list(rows)
+        get = (lambda row, name: row.get(name)) if rows and isinstance(rows[0], dict) else getattr
+        values, nulls = {}, {}
+        for name in fields:
+            raw = [_normalize(get(row, name)) for row in rows]
+            null_mask = np.fromiter((v is None for v in raw), dtype=bool, count=len(raw))
+            fill = next((v for v in raw if v is not None), None)
+            filled = [fill if v is None else v for v in raw]
+            if isinstance(fill, np.datetime64):
+                column = np.array(filled, dtype="datetime64[us]")
+            elif fill is None or isinstance(fill, (bool, int, float, str)):
+                column = np.array(filled)
+                if column.dtype.kind not in "biufU":
+                    column = np.array(filled, dtype=object)
+            else:
+                column = np.empty(len(filled), dtype=object)
+                column[:] = filled
+            values[name] = column
+            nulls[name] = null_mask
+        return cls(values, nulls, len(rows))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.values
+
+    def all(self) -> np.ndarray:
+        return np.ones(self.size, dtype=bool)
+
+    def none(self) -> np.ndarray:
+        return np.zeros(self.size, dtype=bool)
+
+    def is_null(self, name: str) -> np.ndarray:
+        return self.nulls[name]
+
+    def compare(self, name: str, predicate: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        not_null = ~self.nulls[name]
+        mask = self.none()
+        mask[not_null] = predicate(self.values[name][not_null])
+        return mask
+
+    def eq(self, name: str, value) -> np.ndarray:
+        value = _normalize(value)
+        return self.compare(name, lambda col: col == value)
+
+    def isin(self, name: str, values) -> np.ndarray:
+        values = [_normalize(v) for v in values]
+        return self.compare(name, lambda col: np.isin(col, values))
+
+
+class NumpyFilterEngine:
+    """
+    Вычисляет FilterPayload по колоночному снимку вместо SQL.
+
+    Семантика совпадает с SqlAlchemyFilterEngine: тот же набор операторов, фильтры роли
+    и источника, отбор is_top и окно deep search. Результат — индексы подходящих строк.
+    """
+
+    def __init__(self, white_list: Optional[list[str]]):
+        self.white_list = white_list or []
+        self.operator_map: dict[str, Callable[[ColumnarSnapshot, str, Any], np.ndarray]] = {
+            "=": lambda s, field, val: s.eq(field, val),
+            "!=": lambda s, field, val: s.compare(field, lambda col: col != _normalize(val)),
+            "<": lambda s, field, val: s.compare(field, lambda col: col < _normalize(val)),
+            ">": lambda s, field, val: s.compare(field, lambda col: col > _normalize(val)),
+            ">=": lambda s, field, val: s.compare(field, lambda col: col >= _normalize(val)),
+            "<=": lambda s, field, val: s.compare(field, lambda col: col <= _normalize(val)),
+            "in": lambda s, field, val: s.isin(field, val),
+            "not_in": lambda s, field, val: s.isin(field, val) ^ ~s.is_null(field),
+            "is_null": lambda s, field, val: s.is_null(field) if val else ~s.is_null(field),
+            "between": lambda s, field, val: s.compare(
+                field, lambda col: (col >= _normalize(val[0])) & (col <= _normalize(val[1]))
+            ),
+            "contains": lambda s, field, val: s.compare(field, lambda col: np.char.find(col.astype(str), val) >= 0),
+            "icontains": lambda s, field, val: s.compare(
+                field, lambda col: np.char.find(np.char.lower(col.astype(str)), val.lower()) >= 0
+            ),
+            "startswith": lambda s, field, val: s.compare(field, lambda col: np.char.startswith(col.astype(str), val)),
+        }
+
+    def _voice_filter(self, snapshot: ColumnarSnapshot, payload: FilterPayload) -> np.ndarray:
+        mask = snapshot.all()
+        and_masks = [self._build_mask(snapshot, f) for f in payload.and_ if f.field in self.white_list]
+        or_masks = [self._build_mask(snapshot, f) for f in payload.or_ if f.field in self.white_list]
+        and_masks = [m for m in and_masks if m is not None]
+        or_masks = [m for m in or_masks if m is not None]
+        if and_masks:
+            mask &= np.logical_and.reduce(and_masks)
+        if or_masks:
+            mask &= np.logical_or.reduce(or_masks)
+        return mask
+
+    def _build_mask(self, snapshot: ColumnarSnapshot, f) -> np.ndarray | None:
+        op_func = self.operator_map.get(f.op)
+        return op_func(snapshot, f.field, f.value) if f.field in snapshot and op_func else None
+
+    def _role_filter(self, snapshot: ColumnarSnapshot, user) -> np.ndarray:
+        return MAPPING_ROLES_MASKS.get(user.role, unknown_role_mask)(snapshot, user)
+
+    def _source_filter(self, snapshot: ColumnarSnapshot, source: FilterSource) -> np.ndarray:
+        entry = SOURCE_FIELD_MAP.get(source)
+        if not entry:
+            return snapshot.none()
+        field, values = entry
+        return snapshot.isin(field, values)
+
+    def _top_filter(self, snapshot: ColumnarSnapshot) -> np.ndarray:
+        return snapshot.compare("is_top", lambda col: col == True)  # noqa: E712
+
+    def _deep_search(self, snapshot: ColumnarSnapshot) -> np.ndarray:
+        deep_date = _utc(datetime.now(timezone.utc) - timedelta(days=30))
+        return snapshot.compare("created_at", lambda col: col >= deep_date)
+
+    def build_mask(self, snapshot: ColumnarSnapshot, payload: FilterPayload, user) -> np.ndarray:
+        return (
+            self._role_filter(snapshot, user)
+            & self._source_filter(snapshot, payload.source)
+            & self._voice_filter(snapshot, payload)
+            & self._top_filter(snapshot)
+            & self._deep_search(snapshot)
+        )
+
+    def apply(
+        self,
+        snapshot: ColumnarSnapshot,
+        payload: FilterPayload,
+        user,
+        use_sorting: bool = False,
+    ) -> np.ndarray:
+        """
+        Возвращает индексы строк снимка, удовлетворяющих фильтру.
+
+        Args:
+            snapshot: Колоночный снимок данных.
+            payload: Объект FilterPayload.
+            user: Объект пользователя.
+            use_sorting: Сортировать ли индексы по payload.global_order_by.
+
+        Returns:
+            Массив индексов строк.
+        """
+        indices = np.flatnonzero(self.build_mask(snapshot, payload, user))
+        order_by = payload.global_order_by
+        if use_sorting and order_by in snapshot and len(indices):
+            order = np.argsort(snapshot.values[order_by][indices], kind="stable")
+            if payload.global_order_direction == "desc":
+                order = order[::-1]
+            indices = indices[order]
+        return indices
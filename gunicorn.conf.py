@@ -0,0 +1,10 @@
+import os
+
+# Хуки многопроцессных метрик: каталог PROMETHEUS_MULTIPROC_DIR задаётся в окружении до запуска gunicorn
+# и очищается в мастер-процессе до старта воркеров (см. monitoring.multiprocess)
+from monitoring.multiprocess import child_exit, on_starting  # noqa: F401
+
+wsgi_app = "app:app"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+bind = os.getenv("BIND", "0.0.0.0:7000")
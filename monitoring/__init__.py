@@ -0,0 +1,43 @@
+"""
+Мониторинг: HTTP-метрики, метрики БД, мониторинг event loop, профилирование запросов.
+
+Публичные имена загружаются лениво при первом обращении (PEP 562), метрики и эндпоинт /metrics
+подключаются к приложению явно через init(app).
+"""
+
+import importlib
+
+_EXPORTS = {
+    "init": "monitoring.middleware",
+    "PrometheusMiddleware": "monitoring.middleware",
+    "http_metrics": "monitoring.middleware",
+    "instrument_engine": "monitoring.db",
+    "instrument_repository": "monitoring.db",
+    "LoopMonitor": "monitoring.loop_monitor",
+    "loop_monitor": "monitoring.loop_monitor",
+    "RequestProfiler": "monitoring.profiler",
+    "profiler_from_env": "monitoring.profiler",
+    "RoutedTaskMiddleware": "monitoring.profiler",
+    "sign_profile_token": "monitoring.profiler",
+    "enable_route_sketches": "monitoring.sketch",
+    "metrics_app": "monitoring.multiprocess",
+    "metrics_registry": "monitoring.multiprocess",
+    "prepare_directory": "monitoring.multiprocess",
+    "on_starting": "monitoring.multiprocess",
+    "child_exit": "monitoring.multiprocess",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,172 @@
+import functools
+import inspect
+import logging
+import random
+import time
+import weakref
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from monitoring.profiler import record_span
+
+slow_query_logger = logging.getLogger("db.slow_query")
+
+current_operation: ContextVar[str] = ContextVar("db_operation", default="unknown")
+
+# Метрики
+# В многопроцессном режиме пулы воркеров складываются, файлы завершившихся воркеров не учитываются
+POOL_SIZE = Gauge("db_pool_size", "Configured size of the connection pool", ["engine"], multiprocess_mode="livesum")
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out from the pool", ["engine"], multiprocess_mode="livesum"
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections opened above the pool size", ["engine"], multiprocess_mode="livesum"
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duration of SQL statements",
+    ["engine", "operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+SLOW_QUERIES = Counter(
+    "db_slow_queries_total", "Number of SQL statements slower than the threshold", ["engine", "operation"]
+)
+
+
+POOL_EVENTS = ("connect", "checkout", "checkin", "close")
+
+# Движок -> его инструментирование: повторный instrument_engine не подписывается второй раз
+_instrumented: "weakref.WeakKeyDictionary[Engine, EngineInstrumentation]" = weakref.WeakKeyDictionary()
+
+
+def instrument_repository(cls):
+    """
+    Декоратор класса репозитория: помечает SQL-запросы публичных методов меткой «Класс.метод».
+    """
+
+    def wrap(name, method):
+        label = f"{cls.__name__}.{name}"
+
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            token = current_operation.set(label)
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                current_operation.reset(token)
+
+        return wrapper
+
+    for name, method in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.iscoroutinefunction(method):
+            setattr(cls, name, wrap(name, method))
+    return cls
+
+
+class EngineInstrumentation:
+    """
+    Подписывается на события движка и пула SQLAlchemy и пишет метрики в реестр Prometheus.
+
+    Медленные запросы (дольше slow_query_threshold) считаются всегда, а в лог попадает
+    доля slow_query_sample_rate из них.
+    """
+
+    def __init__(
+        self,
+        engine: Engine | AsyncEngine,
+        name: str = "primary",
+        slow_query_threshold: float = 0.5,
+        slow_query_sample_rate: float = 0.1,
+    ):
+        self.engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        self.name = name
+        self.slow_query_threshold = slow_query_threshold
+        self.slow_query_sample_rate = slow_query_sample_rate
+
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(self.engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(self.engine, "handle_error", self._handle_error)
+        event.listen(self.engine, "engine_disposed", self._engine_disposed)
+        self._instrument_pool(self.engine.pool)
+
+    def _instrument_pool(self, pool):
+        # Пул, пересозданный dispose(), получает копию слушателей старого: повторная подписка удвоила бы
+        # события. event.contains() скопированных слушателей не видит, поэтому проверяется сам список
+        for name in POOL_EVENTS:
+            if self._update_pool_gauges not in list(getattr(pool.dispatch, name)):
+                event.listen(pool, name, self._update_pool_gauges)
+
+        # У пула нет события «начало ожидания», поэтому ожидание меряется вокруг pool.connect().
+        # Обёртка — атрибут экземпляра, новому пулу она нужна своя
+        if getattr(pool.connect, "_timed_by", None) is not self:
+            connect = pool.connect
+            wait = POOL_CHECKOUT_WAIT.labels(self.name)
+
+            @functools.wraps(connect)
+            def timed_connect():
+                started = time.perf_counter()
+                try:
+                    return connect()
+                finally:
+                    wait.observe(time.perf_counter() - started)
+
+            timed_connect._timed_by = self
+            pool.connect = timed_connect
+        self._update_pool_gauges()
+
+    def _engine_disposed(self, connection):
+        # dispose() создаёт новый пул: ему нужна обёртка pool.connect и актуальные значения gauge
+        self._instrument_pool(self.engine.pool)
+
+    def _update_pool_gauges(self, *args):
+        pool = self.engine.pool
+        if hasattr(pool, "size"):
+            POOL_SIZE.labels(self.name).set(pool.size())
+            POOL_CHECKED_OUT.labels(self.name).set(pool.checkedout())
+            POOL_OVERFLOW.labels(self.name).set(max(pool.overflow(), 0))
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._observe(conn, statement)
+
+    def _handle_error(self, exception_context):
+        conn = exception_context.connection
+        if conn is not None:
+            self._observe(conn, exception_context.statement or "")
+
+    def _observe(self, conn, statement: str):
+        started = conn.info.get("query_started")
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        operation = current_operation.get()
+        QUERY_DURATION.labels(self.name, operation).observe(duration)
+        record_span("db", duration)
+        if duration >= self.slow_query_threshold:
+            SLOW_QUERIES.labels(self.name, operation).inc()
+            if random.random() < self.slow_query_sample_rate:
+                slow_query_logger.warning(
+                    f"Slow query {duration:.3f}s on {self.name} in {operation}: {statement[:2000]}"
+                )
+
+
+def instrument_engine(engine: Engine | AsyncEngine, name: str = "primary", **kwargs) -> EngineInstrumentation:
+    """
+    Инструментирует движок один раз; для уже инструментированного возвращает существующий объект.
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if sync_engine not in _instrumented:
+        _instrumented[sync_engine] = EngineInstrumentation(sync_engine, name, **kwargs)
+    return _instrumented[sync_engine]
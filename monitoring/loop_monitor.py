@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+blocking_logger = logging.getLogger("loop.blocking")
+
+# Метрики
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay of the event loop heartbeat beyond its scheduled interval",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+LOOP_BLOCKS = Counter("event_loop_blocked_total", "Number of times the event loop was blocked above the threshold")
+LOOP_BLOCKED_SECONDS = Counter("event_loop_blocked_seconds_total", "Total time the event loop was seen blocked")
+LOOP_TASKS = Gauge("event_loop_tasks", "Number of tasks on the event loop", multiprocess_mode="livesum")
+
+
+@dataclass(frozen=True)
+class BlockingReport:
+    started_at: float
+    duration: float
+    stack: str
+
+
+class LoopMonitor:
+    """
+    Следит за задержками event loop.
+
+    Корутина-пульс каждые interval секунд меряет, насколько позже срока она проснулась (лаг цикла).
+    Сторожевой поток замечает, что пульса нет дольше interval + block_threshold, и снимает стек
+    потока цикла в этот момент: это стек кода, который блокирует цикл. О каждой блокировке
+    сообщается один раз, её длительность учитывается, когда цикл оживает. Количество задач
+    обновляется раз в tasks_interval секунд.
+
+    Включается и выключается в любой момент через start()/stop().
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        block_threshold: float = 0.1,
+        tasks_interval: float = 1.0,
+        log_stacks: bool = True,
+        max_reports: int = 20,
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.tasks_interval = tasks_interval
+        self.log_stacks = log_stacks
+        self.reports: deque[BlockingReport] = deque(maxlen=max_reports)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_beat = 0.0
+        self._reported_beat = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._heartbeat is not None and not self._heartbeat.done()
+
+    def start(self):
+        """
+        Запускает мониторинг текущего event loop; вызывается из корутины.
+        """
+        if self.enabled:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        # У каждого запуска своё событие остановки: сторож прошлого запуска, ещё не заметивший stop(),
+        # не должен продолжить работу вместе с новым
+        self._stopped = threading.Event()
+        self._heartbeat = self._loop.create_task(self._beat(), name="loop-monitor-heartbeat")
+        self._watchdog = threading.Thread(
+            target=self._watch, args=(self._stopped,), name="loop-monitor-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        self._stopped.set()
+        self._watchdog = None
+
+    async def _beat(self):
+        loop = asyncio.get_running_loop()
+        tasks_at = 0.0
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            LOOP_LAG.observe(max(now - scheduled, 0.0))
+            beat = time.monotonic()
+            if self._reported_beat == self._last_beat:
+                # Цикл ожил после замеченной блокировки: учитываем её полную длительность
+                LOOP_BLOCKED_SECONDS.inc(beat - self._last_beat - self.interval)
+            self._last_beat = beat
+            if now - tasks_at >= self.tasks_interval:
+                tasks_at = now
+                LOOP_TASKS.set(len(asyncio.all_tasks(loop)))
+
+    def _watch(self, stopped: threading.Event):
+        check = min(self.interval, self.block_threshold) / 2
+        while not stopped.wait(check):
+            last_beat = self._last_beat
+            blocked = time.monotonic() - last_beat - self.interval
+            if blocked < self.block_threshold or self._reported_beat == last_beat:
+                continue
+            self._reported_beat = last_beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            self.reports.append(BlockingReport(last_beat + self.interval, blocked, stack))
+            LOOP_BLOCKS.inc()
+            if self.log_stacks:
+                blocking_logger.warning(f"Event loop blocked for more than {blocked:.3f}s at:\n{stack}")
+
+
+loop_monitor = LoopMonitor()
@@ -1,95 +1,233 @@
+import os
 import time
-from typing import Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional, Tuple
 
-from prometheus_client import Counter, Gauge, Histogram, make_asgi_app
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
 from starlette.routing import Match
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
-from starlette.types import ASGIApp
-
-
-# Метрики
-REQUESTS = Counter(
-    "http_requests_total",
-    "Total number of requests",
-    ["method", "path_template"],
-)
-RESPONSES = Counter(
-    "http_responses_total",
-    "Total number of responses",
-    ["method", "path_template", "status_code"],
-)
-REQUEST_DURATION = Histogram(
-    "http_request_duration_seconds",
-    "Duration of HTTP requests in seconds",
-    ["method", "path_template"],
-)
-EXCEPTIONS = Counter(
-    "http_exceptions_total",
-    "Total number of exceptions",
-    ["method", "path_template", "exception_type"],
-)
-REQUESTS_IN_PROGRESS = Gauge(
-    "http_requests_in_progress",
-    "Number of HTTP requests in progress",
-    ["method", "path_template"],
-)
-
-
-class PrometheusMiddleware(BaseHTTPMiddleware):
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+if TYPE_CHECKING:
+    from monitoring.profiler import RequestProfiler
+    from monitoring.sketch import RouteSketches
+    from ss.metrics.labels import LabelBudget
+
+
+@dataclass(frozen=True)
+class HttpMetrics:
+    requests: Any
+    responses: Any
+    duration: Any
+    exceptions: Any
+    in_progress: Any
+
+
+@lru_cache(maxsize=None)
+def http_metrics() -> HttpMetrics:
+    """
+    Метрики HTTP-запросов. Регистрируются в реестре при первом обращении (создании middleware),
+    а не при импорте модуля.
+    """
+    from prometheus_client import Counter, Gauge, Histogram
+
+    return HttpMetrics(
+        requests=Counter(
+            "http_requests_total",
+            "Total number of requests",
+            ["method", "path_template"],
+        ),
+        responses=Counter(
+            "http_responses_total",
+            "Total number of responses",
+            ["method", "path_template", "status_code"],
+        ),
+        duration=Histogram(
+            "http_request_duration_seconds",
+            "Duration of HTTP requests in seconds",
+            ["method", "path_template"],
+        ),
+        exceptions=Counter(
+            "http_exceptions_total",
+            "Total number of exceptions",
+            ["method", "path_template", "exception_type"],
+        ),
+        in_progress=Gauge(
+            "http_requests_in_progress",
+            "Number of HTTP requests in progress",
+            ["method", "path_template"],
+            multiprocess_mode="livesum",
+        ),
+    )
+
+
+# Прежние модульные имена метрик остаются доступны: REQUESTS, RESPONSES, ...
+_METRIC_ATTRIBUTES = {
+    "REQUESTS": "requests",
+    "RESPONSES": "responses",
+    "REQUEST_DURATION": "duration",
+    "EXCEPTIONS": "exceptions",
+    "REQUESTS_IN_PROGRESS": "in_progress",
+}
+
+
+def __getattr__(name: str):
+    attribute = _METRIC_ATTRIBUTES.get(name)
+    if attribute is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(http_metrics(), attribute)
+
+
+class PrometheusMiddleware:
+    """
+    ASGI-middleware с метриками HTTP-запросов.
+
+    Шаблон пути определяется по маршрутам приложения один раз на (метод, путь) и хранится
+    в ограниченном LRU-кеше; после обработки кеш уточняется маршрутом из scope. Пути вне
+    allowed_prefixes отсекаются по сырому пути до поиска шаблона. Путь без маршрута в метках
+    нормализуется и ограничивается LabelBudget. Тело ответа не буферизуется, длительность
+    измеряется до конца отправки ответа.
+    """
+
     def __init__(
-        self, app: ASGIApp, allowed_prefixes: tuple[str] = ("/api/v1",), filter_unhandled_paths: bool = False
+        self,
+        app: ASGIApp,
+        allowed_prefixes: tuple[str] = ("/api/v1",),
+        filter_unhandled_paths: bool = False,
+        template_cache_size: int = 1024,
+        label_budget: Optional["LabelBudget"] = None,
+        latency_sketches: Optional["RouteSketches"] = None,
+        profiler: Optional["RequestProfiler"] = None,
     ) -> None:
-        super().__init__(app)
+        if label_budget is None:
+            from ss.metrics.labels import label_budget
+        self.app = app
+        self.metrics = http_metrics()
+        self.label_budget = label_budget
+        self.latency_sketches = latency_sketches
+        self.profiler = profiler
         self.filter_unhandled_paths = filter_unhandled_paths
-        self.allowed_prefixes = allowed_prefixes
+        self.allowed_prefixes = tuple(allowed_prefixes)
+        self.template_cache_size = template_cache_size
+        self._templates: OrderedDict[tuple[str, str], Tuple[str, bool]] = OrderedDict()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Профилировщик охватывает все HTTP-запросы, включая пути вне allowed_prefixes
+        if self.profiler is not None and scope["type"] == "http":
+            await self.profiler.profile(scope, lambda: self._handle(scope, receive, send))
+        else:
+            await self._handle(scope, receive, send)
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        method = request.method
-        path_template, is_handled_path = self._get_path_template(request)
+    async def _handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.allowed_prefixes):
+            await self.app(scope, receive, send)
+            return
 
-        if not any(path_template.startswith(api_prefix) for api_prefix in self.allowed_prefixes):
-            return await call_next(request)
+        method = scope["method"]
+        key = (method, scope["path"])
+        path_template, is_handled_path = self._get_path_template(scope, key)
 
+        # Префикс проверен по сырому пути: шаблон может быть «__other__» от LabelBudget и всё равно учитывается
         if self._is_path_filtered(is_handled_path):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
-        REQUESTS_IN_PROGRESS.labels(method, path_template).inc()
-        REQUESTS.labels(method, path_template).inc()
+        metrics = self.metrics
+        in_progress = metrics.in_progress.labels(method, path_template)
+        in_progress.inc()
+        metrics.requests.labels(method, path_template).inc()
         start_time = time.perf_counter()
 
         status_code = HTTP_500_INTERNAL_SERVER_ERROR
 
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
-            EXCEPTIONS.labels(method, path_template, type(exc).__name__).inc()
+            metrics.exceptions.labels(method, path_template, type(exc).__name__).inc()
             raise exc from None
         else:
-            status_code = response.status_code
             duration = time.perf_counter() - start_time
-            REQUEST_DURATION.labels(method, path_template).observe(duration)
+            metrics.duration.labels(method, path_template).observe(duration)
+            if self.latency_sketches is not None:
+                self.latency_sketches.observe(method, path_template, duration)
+            self._remember_route(scope, key)
         finally:
-            RESPONSES.labels(method, path_template, status_code).inc()
-            REQUESTS_IN_PROGRESS.labels(method, path_template).dec()
-
-        return response
-
-    @staticmethod
-    def _get_path_template(request: Request) -> Tuple[str, bool]:
-        for route in request.app.routes:
-            match, _ = route.matches(request.scope)
+            metrics.responses.labels(method, path_template, status_code).inc()
+            in_progress.dec()
+
+    def _get_path_template(self, scope: Scope, key: tuple[str, str]) -> Tuple[str, bool]:
+        cached = self._templates.get(key)
+        if cached is not None:
+            self._templates.move_to_end(key)
+            return cached
+        for route in scope["app"].routes:
+            match, _ = route.matches(scope)
             if match == Match.FULL:
-                return getattr(route, "path", request.url.path), True
-        return request.url.path, False
+                return self._store(key, (getattr(route, "path", scope["path"]), True))
+        # Путь без маршрута нормализуется и ограничивается бюджетом, чтобы сканеры не раздували число серий
+        return self._store(key, (self.label_budget.path("http_requests_total", scope["path"]), False))
+
+    def _remember_route(self, scope: Scope, key: tuple[str, str]) -> None:
+        # Роутер кладёт сработавший маршрут в scope: это точнее перебора, если маршруты меняются
+        route = scope.get("route")
+        path = getattr(route, "path", None)
+        if path is not None and self._templates.get(key) != (path, True):
+            self._store(key, (path, True))
+
+    def _store(self, key: tuple[str, str], value: Tuple[str, bool]) -> Tuple[str, bool]:
+        self._templates[key] = value
+        self._templates.move_to_end(key)
+        while len(self._templates) > self.template_cache_size:
+            self._templates.popitem(last=False)
+        return value
 
     def _is_path_filtered(self, is_handled_path: bool) -> bool:
         return self.filter_unhandled_paths and not is_handled_path
 
 
-app.add_middleware(PrometheusMiddleware)
-
-# Прометей эндпоинт
-app.mount("/metrics", make_asgi_app())
+def init(
+    app,
+    latency_sketches: Optional["RouteSketches"] = None,
+    profiler: Optional["RequestProfiler"] = None,
+    metrics_path: str = "/metrics",
+    **options,
+) -> None:
+    """
+    Подключает PrometheusMiddleware и эндпоинт метрик к приложению; вызывается при его создании.
+
+    Если скетчи и профилировщик не переданы, квантильные скетчи по маршрутам включаются переменной
+    HTTP_LATENCY_SKETCHES, профилирование запросов — переменной PROFILER_DIR (см. profiler_from_env).
+
+    Args:
+        app: Приложение Starlette/FastAPI.
+        latency_sketches: Скетчи длительности по маршрутам.
+        profiler: Профилировщик запросов.
+        metrics_path: Путь эндпоинта метрик.
+        **options: Остальные параметры PrometheusMiddleware.
+    """
+    from monitoring.multiprocess import metrics_app
+
+    if latency_sketches is None and os.getenv("HTTP_LATENCY_SKETCHES"):
+        from monitoring.sketch import enable_route_sketches
+
+        latency_sketches = enable_route_sketches()
+    if profiler is None:
+        from monitoring.profiler import profiler_from_env
+
+        profiler = profiler_from_env()
+    app.add_middleware(PrometheusMiddleware, latency_sketches=latency_sketches, profiler=profiler, **options)
+    if profiler is not None:
+        from starlette.middleware import Middleware
+
+        from monitoring.profiler import RoutedTaskMiddleware
+
+        # В конец списка, то есть внутрь всех middleware приложения, сразу перед роутером
+        app.user_middleware.append(Middleware(RoutedTaskMiddleware))
+    app.mount(metrics_path, metrics_app())
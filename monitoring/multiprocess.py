@@ -0,0 +1,136 @@
+import glob
+import os
+import re
+
+from prometheus_client import REGISTRY, CollectorRegistry, make_asgi_app, multiprocess
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Файлы значений: <тип>_<pid>.db или gauge_<режим>_<pid>.db
+_PID_RE = re.compile(r"_(\d+)\.db$")
+
+# Файлы, которые пишут воркеры: значения prometheus_client и скетчи длительности (monitoring.sketch)
+_RUN_FILE_PATTERNS = ("*.db", "sketch_*.json")
+
+# Дополнительные коллекторы, которые собирают значения сами (например, из файлов всех воркеров)
+_collectors = []
+
+
+def multiprocess_dir() -> str | None:
+    return os.environ.get(MULTIPROC_DIR_ENV) or os.environ.get(MULTIPROC_DIR_ENV.lower())
+
+
+def is_multiprocess() -> bool:
+    return multiprocess_dir() is not None
+
+
+def prepare_directory():
+    """
+    Очищает каталог метрик перед запуском воркеров.
+
+    Вызывается один раз в мастер-процессе до запуска воркеров: хуком gunicorn on_starting
+    или перед uvicorn.run. Файлы прошлого запуска иначе продолжат суммироваться в счётчики.
+    Удаляются только файлы метрик (*.db и sketch_*.json): остальное содержимое каталога,
+    если он указывает на общий путь, не трогается.
+    """
+    path = multiprocess_dir()
+    if path is None:
+        return
+    os.makedirs(path, exist_ok=True)
+    for pattern in _RUN_FILE_PATTERNS:
+        for file in glob.glob(os.path.join(path, pattern)):
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def sweep_dead_workers() -> list[int]:
+    """
+    Удаляет live-gauge файлы завершившихся воркеров.
+
+    Счётчики и гистограммы мёртвых воркеров сохраняются, чтобы суммы не уменьшались.
+
+    Returns:
+        Идентификаторы процессов, файлы которых были убраны.
+    """
+    path = multiprocess_dir()
+    if path is None:
+        return []
+    pids = {int(m.group(1)) for f in glob.glob(os.path.join(path, "gauge_live*.db")) if (m := _PID_RE.search(f))}
+    dead = [pid for pid in pids if pid != os.getpid() and not _is_alive(pid)]
+    for pid in dead:
+        multiprocess.mark_process_dead(pid, path)
+    return dead
+
+
+def on_starting(server):
+    """
+    Хук gunicorn: очищает каталог метрик в мастер-процессе до запуска воркеров.
+    """
+    prepare_directory()
+
+
+def child_exit(server, worker):
+    """
+    Хук gunicorn: убирает live-gauge файлы завершившегося воркера.
+    """
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def register_collector(collector):
+    """
+    Регистрирует коллектор для /metrics в обоих режимах.
+    """
+    _collectors.append(collector)
+    if not is_multiprocess():
+        REGISTRY.register(collector)
+
+
+def _multiprocess_registry() -> CollectorRegistry:
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _collectors:
+        registry.register(collector)
+    return registry
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Реестр для отдачи метрик.
+
+    В многопроцессном режиме собирается заново из файлов всех воркеров (live-gauge файлы
+    завершившихся воркеров предварительно убираются); иначе — реестр текущего процесса.
+    """
+    if not is_multiprocess():
+        return REGISTRY
+    sweep_dead_workers()
+    return _multiprocess_registry()
+
+
+def metrics_app():
+    """
+    ASGI-приложение для /metrics.
+
+    В многопроцессном режиме (задан PROMETHEUS_MULTIPROC_DIR) значения всех воркеров собираются
+    из файлов каталога при каждом запросе; иначе отдаётся реестр текущего процесса.
+    """
+    if not is_multiprocess():
+        return make_asgi_app()
+
+    async def scrape(scope, receive, send):
+        # Реестр собирается на каждый запрос, чтобы учесть коллекторы, зарегистрированные после монтирования
+        registry = metrics_registry() if scope["type"] == "http" else _multiprocess_registry()
+        await make_asgi_app(registry)(scope, receive, send)
+
+    return scrape
@@ -0,0 +1,353 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+
+profiler_logger = logging.getLogger("profiler")
+
+PROFILE_HEADER = b"x-profile"
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+
+def record_span(kind: str, seconds: float):
+    """
+    Добавляет время операции (db, audit, ...) к профилю текущего запроса, если он профилируется.
+    """
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.spans[kind] = profile.spans.get(kind, 0.0) + seconds
+
+
+@contextmanager
+def profile_span(kind: str):
+    if _current_profile.get() is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(kind, time.perf_counter() - started)
+
+
+def sign_profile_token(secret: str, ttl: float = 300.0) -> str:
+    """
+    Выпускает значение заголовка X-Profile, действующее ttl секунд.
+    """
+    expires = str(int(time.time() + ttl))
+    signature = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_profile_token(secret: str, token: str) -> bool:
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def _frame_name(code) -> str:
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _await_chain(awaitable) -> tuple[list, object]:
+    """
+    Проходит по цепочке await от корутины задачи вглубь; возвращает код корутин и самую внутреннюю.
+    """
+    codes = []
+    innermost = None
+    seen = 0
+    while awaitable is not None and seen < 256:
+        seen += 1
+        get_coro = getattr(awaitable, "get_coro", None)
+        if get_coro is not None:
+            awaitable = get_coro()
+            continue
+        code = getattr(awaitable, "cr_code", None) or getattr(awaitable, "ag_code", None)
+        code = code or getattr(awaitable, "gi_code", None)
+        if code is None:
+            codes.append(f"<await {type(awaitable).__name__}>")
+            break
+        codes.append(code)
+        innermost = awaitable
+        awaitable = (
+            getattr(awaitable, "cr_await", None)
+            or getattr(awaitable, "ag_await", None)
+            or getattr(awaitable, "gi_yieldfrom", None)
+        )
+    return codes, innermost
+
+
+class RequestProfile:
+    def __init__(self, task: asyncio.Task, thread_id: int, method: str, path: str, reason: Optional[str]):
+        self.task = task
+        self.thread_id = thread_id
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.spans: dict[str, float] = {}
+
+    def sample(self, frames: dict):
+        codes, innermost = _await_chain(self.task.get_coro())
+        stack = [code if isinstance(code, str) else _frame_name(code) for code in codes]
+        running = innermost is not None and (
+            getattr(innermost, "cr_running", False) or getattr(innermost, "ag_running", False)
+        )
+        if running:
+            # Задача сейчас выполняется: добавляем синхронные вызовы под самой внутренней корутиной
+            frame = frames.get(self.thread_id)
+            inner_frame = getattr(innermost, "cr_frame", None) or getattr(innermost, "ag_frame", None)
+            sync = []
+            while frame is not None and frame is not inner_frame:
+                sync.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            if frame is not None:
+                stack.extend(reversed(sync))
+        self.samples[tuple(stack)] += 1
+
+
+class RoutedTaskMiddleware:
+    """
+    ASGI-middleware, отмечающая задачу, в которой выполняется маршрут.
+
+    BaseHTTPMiddleware (@app.middleware("http")) вызывает остальное приложение в дочерней задаче,
+    и стек задачи, в которой начат профиль, обрывается на call_next. Middleware ставится ближе всех
+    к роутеру и на время вызова переключает профиль запроса из ContextVar на свою задачу.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        profile = _current_profile.get()
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+        outer_task = profile.task
+        profile.task = asyncio.current_task()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.task = outer_task
+
+
+class _Sampler:
+    """
+    Общий на процесс поток, снимающий стеки профилируемых задач каждые interval секунд.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles: set[RequestProfile] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def remove(self, profile: RequestProfile) -> Counter:
+        """
+        Прекращает семплирование профиля и возвращает копию его семплов.
+
+        Снимки делаются под той же блокировкой, поэтому после выхода поток профиль больше не меняет.
+        """
+        with self._lock:
+            self._profiles.discard(profile)
+            return Counter(profile.samples)
+
+    def active(self) -> int:
+        return len(self._profiles)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._profiles:
+                    self._sample_all()
+                    idle = False
+                else:
+                    self._wakeup.clear()
+                    idle = True
+            if idle:
+                self._wakeup.wait()
+            else:
+                time.sleep(self.interval)
+
+    def _sample_all(self):
+        frames = sys._current_frames()
+        for profile in self._profiles:
+            try:
+                profile.sample(frames)
+            except Exception:
+                # Стек меняется конкурентно с чтением; неудачный снимок просто пропускается
+                continue
+        del frames
+
+
+class RequestProfiler:
+    """
+    Семплирующий профилировщик отдельных запросов.
+
+    Запрос профилируется, если:
+    - передан заголовок X-Profile с подписью sign_profile_token(secret);
+    - он попал в долю sample_rate;
+    - он выполняется дольше latency_threshold секунд (семплирование начинается с этого момента).
+
+    Пока запрос не профилируется, стоимость сводится к проверке заголовка, random() и, при заданном
+    latency_threshold, одному таймеру цикла. Для профилируемого запроса фоновый поток каждые interval
+    секунд снимает стек задачи по цепочке await, а время БД и аудита копится через record_span.
+    Результат пишется в directory как collapsed stacks и speedscope JSON; хранится не больше max_files
+    профилей, одновременно профилируется не больше max_active запросов.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        secret: Optional[str] = None,
+        sample_rate: float = 0.0,
+        latency_threshold: Optional[float] = None,
+        interval: float = 0.005,
+        max_files: int = 100,
+        max_active: int = 4,
+    ):
+        self.directory = directory
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.latency_threshold = latency_threshold
+        self.max_files = max_files
+        self.max_active = max_active
+        self._sampler = _Sampler(interval)
+        os.makedirs(directory, exist_ok=True)
+
+    def _trigger(self, scope) -> Optional[str]:
+        if self.secret:
+            for name, value in scope.get("headers", ()):
+                if name == PROFILE_HEADER:
+                    return "header" if verify_profile_token(self.secret, value.decode("latin-1")) else None
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    def _start(self, profile: RequestProfile, reason: str):
+        if self._sampler.active() >= self.max_active:
+            return
+        profile.reason = reason
+        self._sampler.add(profile)
+
+    async def profile(self, scope, call: Callable[[], Awaitable[None]]) -> None:
+        reason = self._trigger(scope)
+        if reason is None and self.latency_threshold is None:
+            await call()
+            return
+
+        loop = asyncio.get_running_loop()
+        profile = RequestProfile(
+            asyncio.current_task(), threading.get_ident(), scope.get("method", ""), scope.get("path", ""), None
+        )
+        token = _current_profile.set(profile)
+        timer = None
+        if reason is not None:
+            self._start(profile, reason)
+        else:
+            timer = loop.call_later(self.latency_threshold, self._start, profile, "latency")
+        try:
+            await call()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            samples = self._sampler.remove(profile)
+            _current_profile.reset(token)
+            profile.duration = time.perf_counter() - profile.started
+            if profile.reason is not None and samples:
+                try:
+                    await loop.run_in_executor(None, self._write, profile, samples)
+                except Exception:
+                    # Ошибка записи профиля не должна превращать ответ в 500
+                    profiler_logger.exception(f"Failed to write profile of {profile.method} {profile.path}")
+
+    def _write(self, profile: RequestProfile, samples: Counter):
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", profile.path).strip("_")[:80] or "root"
+        base = os.path.join(self.directory, f"{time.time_ns()}-{os.getpid()}-{profile.method}-{slug}-{profile.reason}")
+        timings = " ".join(f"{kind}={seconds:.3f}s" for kind, seconds in sorted(profile.spans.items()))
+        title = f"{profile.method} {profile.path} total={profile.duration:.3f}s {timings}".strip()
+
+        with open(f"{base}.collapsed", "w") as f:
+            for stack, count in samples.items():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+        frames: dict[str, int] = {}
+        stacks = []
+        weights = []
+        for stack, count in samples.items():
+            stacks.append([frames.setdefault(name, len(frames)) for name in stack])
+            weights.append(count * self._sampler.interval)
+        speedscope = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": title,
+            "exporter": "monitoring.profiler",
+            "shared": {"frames": [{"name": name} for name in frames]},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": title,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": stacks,
+                    "weights": weights,
+                }
+            ],
+        }
+        with open(f"{base}.speedscope.json", "w") as f:
+            json.dump(speedscope, f)
+
+        profiler_logger.info(f"Profiled {title} ({profile.reason}) -> {base}")
+        self._prune()
+
+    def _prune(self):
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(".collapsed"))
+        for name in names[: max(len(names) - self.max_files, 0)]:
+            stem = name[: -len(".collapsed")]
+            for suffix in (".collapsed", ".speedscope.json"):
+                try:
+                    os.remove(os.path.join(self.directory, stem + suffix))
+                except FileNotFoundError:
+                    pass
+
+
+def profiler_from_env() -> Optional[RequestProfiler]:
+    """
+    Создаёт профилировщик по PROFILER_DIR, PROFILER_SECRET, PROFILER_SAMPLE_RATE и
+    PROFILER_LATENCY_THRESHOLD; без PROFILER_DIR профилирование выключено.
+    """
+    directory = os.getenv("PROFILER_DIR")
+    if not directory:
+        return None
+    threshold = os.getenv("PROFILER_LATENCY_THRESHOLD")
+    return RequestProfiler(
+        directory,
+        secret=os.getenv("PROFILER_SECRET") or None,
+        sample_rate=float(os.getenv("PROFILER_SAMPLE_RATE", 0)),
+        latency_threshold=float(threshold) if threshold else None,
+    )
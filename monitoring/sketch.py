@@ -0,0 +1,291 @@
+import atexit
+import glob
+import json
+import logging
+import math
+import os
+import threading
+from typing import Iterable, Optional
+
+from prometheus_client.core import GaugeMetricFamily, HistogramMetricFamily
+
+from monitoring.multiprocess import multiprocess_dir, register_collector
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+logger = logging.getLogger(__name__)
+
+
+class DDSketch:
+    """
+    Квантильный скетч с гарантией относительной ошибки (DDSketch).
+
+    Значение v попадает в корзину ceil(log_gamma(v)), где gamma = (1 + a) / (1 - a); любой квантиль
+    оценивается с относительной ошибкой не больше a. Число корзин ограничено max_bins: при
+    переполнении сливаются самые нижние корзины, так что точность хвоста (p99, p999) сохраняется.
+    Скетчи с одинаковой точностью складываются без потерь.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048, min_value: float = 1e-9):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        if value <= self.min_value:
+            self.zero_count += count
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + count
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _collapse(self):
+        keys = sorted(self.bins)
+        excess = keys[: len(keys) - self.max_bins + 1]
+        self.bins[excess[-1]] = sum(self.bins.pop(key) for key in excess[:-1]) + self.bins[excess[-1]]
+
+    def merge(self, other: "DDSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        while len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return max(self.min, 0.0)
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    def count_le(self, bound: float) -> int:
+        """
+        Оценка количества значений не больше bound (с той же относительной ошибкой по значению).
+        """
+        if bound <= self.min_value:
+            return self.zero_count
+        limit = self._key(bound)
+        return self.zero_count + sum(count for key, count in self.bins.items() if key <= limit)
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": dict(self.bins),
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, max_bins: int = 2048) -> "DDSketch":
+        sketch = cls(data["relative_accuracy"], max_bins)
+        sketch.bins = {int(key): count for key, count in data["bins"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+
+class RouteSketches:
+    """
+    Скетчи длительности запросов по (метод, шаблон пути).
+
+    В многопроцессном режиме фоновый поток воркера раз в flush_interval секунд (и при выходе)
+    сохраняет его скетчи в файл sketch_<pid>.json каталога метрик; при сборе метрик скетчи всех
+    воркеров, включая завершившиеся, складываются. Запись файла не выполняется в потоке запроса,
+    поэтому observe не блокирует event loop. Значения накапливаются с запуска, как у гистограмм.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        max_bins: int = 2048,
+        max_routes: int = 500,
+        directory: Optional[str] = None,
+        flush_interval: float = 5.0,
+    ):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.max_routes = max_routes
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._sketches: dict[tuple[str, str], DDSketch] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        # Процесс, в котором запущен поток записи: после fork (gunicorn --preload) поток запускается заново
+        self._flusher_pid: Optional[int] = None
+        if directory is not None:
+            atexit.register(self.close)
+
+    def observe(self, method: str, path_template: str, seconds: float):
+        key = (method, path_template)
+        with self._lock:
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                if len(self._sketches) >= self.max_routes:
+                    return
+                sketch = self._sketches[key] = DDSketch(self.relative_accuracy, self.max_bins)
+            sketch.add(seconds)
+            if self.directory is not None and self._flusher_pid != os.getpid():
+                self._start_flusher()
+
+    def _start_flusher(self):
+        self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._flush_periodically, name="route-sketches-flush", daemon=True)
+        thread.start()
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("Failed to save route sketches")
+
+    def close(self):
+        """
+        Останавливает фоновую запись и сохраняет скетчи последний раз.
+        """
+        self._stopped.set()
+        self.flush()
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"sketch_{pid}.json")
+
+    def _dump(self) -> list[dict]:
+        with self._lock:
+            return [
+                {"method": method, "path_template": path, "sketch": sketch.to_dict()}
+                for (method, path), sketch in self._sketches.items()
+            ]
+
+    def flush(self):
+        if self.directory is None:
+            return
+        path = self._path(os.getpid())
+        tmp_path = f"{path}.tmp"
+        with self._flush_lock:
+            with open(tmp_path, "w") as f:
+                json.dump(self._dump(), f)
+            os.replace(tmp_path, path)
+
+    def merged(self) -> dict[tuple[str, str], DDSketch]:
+        """
+        Складывает скетчи текущего процесса и сохранённые скетчи остальных воркеров.
+        """
+        result: dict[tuple[str, str], DDSketch] = {}
+        entries = self._dump()
+        if self.directory is not None:
+            own = self._path(os.getpid())
+            for path in glob.glob(os.path.join(self.directory, "sketch_*.json")):
+                if path == own:
+                    continue
+                try:
+                    with open(path) as f:
+                        entries.extend(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        for entry in entries:
+            sketch = DDSketch.from_dict(entry["sketch"], self.max_bins)
+            key = (entry["method"], entry["path_template"])
+            if key in result:
+                result[key].merge(sketch)
+            else:
+                result[key] = sketch
+        return result
+
+
+class SketchCollector:
+    """
+    Отдаёт квантили скетчей в http_request_duration_quantile_seconds и, для маршрутов из
+    bucket_overrides, гистограмму http_request_duration_route_seconds со своими границами корзин.
+    """
+
+    def __init__(
+        self,
+        sketches: RouteSketches,
+        quantiles: Iterable[float] = DEFAULT_QUANTILES,
+        bucket_overrides: Optional[dict[str, Iterable[float]]] = None,
+    ):
+        self.sketches = sketches
+        self.quantiles = tuple(quantiles)
+        self.bucket_overrides = {path: sorted(buckets) for path, buckets in (bucket_overrides or {}).items()}
+
+    def collect(self):
+        merged = self.sketches.merged()
+        quantiles = GaugeMetricFamily(
+            "http_request_duration_quantile_seconds",
+            "Request duration quantiles from mergeable sketches",
+            labels=["method", "path_template", "quantile"],
+        )
+        histogram = HistogramMetricFamily(
+            "http_request_duration_route_seconds",
+            "Request duration with per-route buckets, estimated from sketches",
+            labels=["method", "path_template"],
+        )
+        for (method, path), sketch in merged.items():
+            for q in self.quantiles:
+                value = sketch.quantile(q)
+                if value is not None:
+                    quantiles.add_metric([method, path, str(q)], value)
+            buckets = self.bucket_overrides.get(path)
+            if buckets:
+                histogram.add_metric(
+                    [method, path],
+                    [(str(bound), sketch.count_le(bound)) for bound in buckets] + [("+Inf", sketch.count)],
+                    sketch.sum,
+                )
+        yield quantiles
+        if self.bucket_overrides:
+            yield histogram
+
+
+def enable_route_sketches(
+    relative_accuracy: float = 0.01,
+    quantiles: Iterable[float] = DEFAULT_QUANTILES,
+    bucket_overrides: Optional[dict[str, Iterable[float]]] = None,
+    **kwargs,
+) -> RouteSketches:
+    """
+    Создаёт скетчи маршрутов и регистрирует их коллектор для /metrics.
+    """
+    sketches = RouteSketches(relative_accuracy, directory=multiprocess_dir(), **kwargs)
+    register_collector(SketchCollector(sketches, quantiles, bucket_overrides))
+    return sketches
@@ -0,0 +1,336 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from perf.report import compare, format_report, load_report, regressions_to_dict, save_report
+
+
+def _run(args) -> int:
+    # Модели приложения нужны только для прогона; сравнение отчётов работает без них
+    from perf.harness import HarnessOptions, load_scenarios, run_harness
+
+    options = HarnessOptions(
+        target=args.target,
+        mode=args.mode,
+        rps=args.rps,
+        duration=args.duration,
+        warmup=args.warmup,
+        users=args.users,
+        role=args.role,
+        max_in_flight=args.max_in_flight,
+        voices=args.voices,
+        records_per_voice=args.records_per_voice,
+        database_url=args.database_url,
+        filter_payload=json.loads(args.filter_payload),
+        scenarios=load_scenarios(args.scenarios) if args.scenarios else None,
+        fluent_delay=args.fluent_delay,
+        env=dict(item.split("=", 1) for item in args.env),
+        seed=args.seed,
+    )
+    report = asyncio.run(run_harness(options))
+    save_report(report, args.output)
+    print(format_report(report))
+    print(f"Report saved to {args.output}")
+    return 0
+
+
+def _compare(args) -> int:
+    regressions = compare(
+        load_report(args.baseline),
+        load_report(args.candidate),
+        latency_tolerance=args.latency_tolerance,
+        latency_floor_ms=args.latency_floor_ms,
+        throughput_tolerance=args.throughput_tolerance,
+        error_rate_tolerance=args.error_rate_tolerance,
+    )
+    if args.json:
+        print(json.dumps(regressions_to_dict(regressions), ensure_ascii=False, indent=2))
+    else:
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if not regressions:
+            print("No regressions")
+    return 1 if regressions else 0
+
+
+def _filters(args) -> int:
+    from perf.filter_suite import (
+        DatasetSpec,
+        FilterStrategy,
+        SuiteOptions,
+        check_report,
+        format_results,
+        run_suite,
+        update_baseline,
+    )
+
+    options = SuiteOptions(
+        database_url=args.database_url,
+        dataset=DatasetSpec(
+            rows=args.rows, records_per_voice=args.records_per_voice, operators=args.operators, seed=args.seed
+        ),
+        strategies=tuple(FilterStrategy(name) for name in args.strategy) if args.strategy else tuple(FilterStrategy),
+        only=args.only,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        recreate=args.recreate,
+    )
+    report = asyncio.run(run_suite(options))
+    save_report(report, args.output)
+    print(format_results(report))
+
+    baseline = load_report(args.baseline) if args.baseline and os.path.exists(args.baseline) else None
+    if args.update_baseline:
+        save_report(update_baseline(report, baseline), args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    errors, warnings = check_report(report, baseline, floor_ms=args.floor_ms, fail_on_plan_change=args.strict_plans)
+    for violation in warnings + errors:
+        print(violation)
+    return 1 if errors else 0
+
+
+def _vectorized(args) -> int:
+    from perf.filter_suite import DatasetSpec
+    from perf.vectorized_bench import VectorizedOptions, format_vectorized, run_vectorized
+
+    options = VectorizedOptions(
+        database_url=args.database_url,
+        dataset=DatasetSpec(
+            rows=args.rows, records_per_voice=args.records_per_voice, operators=args.operators, seed=args.seed
+        ),
+        only=args.only,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        recreate=args.recreate,
+    )
+    report = asyncio.run(run_vectorized(options))
+    save_report(report, args.output)
+    print(format_vectorized(report))
+    return 0 if all(result["agree"] for result in report["results"].values()) else 1
+
+
+def _bulk(args) -> int:
+    from perf.bulk_bench import BULK_METHODS, BulkOptions, format_bulk, run_bulk
+
+    options = BulkOptions(
+        database_url=args.database_url,
+        rows=args.rows,
+        records_per_voice=args.records_per_voice,
+        chunk_size=args.chunk_size,
+        methods=tuple(args.method) if args.method else BULK_METHODS,
+        seed=args.seed,
+    )
+    report = asyncio.run(run_bulk(options))
+    save_report(report, args.output)
+    print(format_bulk(report))
+    return 0
+
+
+def _serialize(args) -> int:
+    from perf.filter_suite import DatasetSpec
+    from perf.serialize_bench import SERIALIZE_PATHS, SerializeOptions, format_serialize, run_serialize
+
+    options = SerializeOptions(
+        database_url=args.database_url,
+        dataset=DatasetSpec(
+            rows=args.rows, records_per_voice=args.records_per_voice, operators=args.operators, seed=args.seed
+        ),
+        page_size=args.page_size,
+        pages=args.pages,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        paths=tuple(args.path) if args.path else SERIALIZE_PATHS,
+        recreate=args.recreate,
+    )
+    report = asyncio.run(run_serialize(options))
+    save_report(report, args.output)
+    print(format_serialize(report))
+    return 0 if all(result["agree"] for result in report["results"].values()) else 1
+
+
+def _middleware(args) -> int:
+    from perf.middleware_bench import MIDDLEWARE_VARIANTS, MiddlewareOptions, format_middleware, run_middleware
+
+    options = MiddlewareOptions(
+        routes=args.routes,
+        paths=args.paths,
+        requests=args.requests,
+        warmup=args.warmup,
+        variants=tuple(args.variant) if args.variant else MIDDLEWARE_VARIANTS,
+    )
+    report = asyncio.run(run_middleware(options))
+    save_report(report, args.output)
+    print(format_middleware(report))
+    return 0
+
+
+def _matcher(args) -> int:
+    from perf.matcher_bench import MatcherOptions, format_matcher, run_matcher
+
+    options = MatcherOptions(
+        rules=args.rules,
+        paths=args.paths,
+        lookups=args.lookups,
+        miss_ratio=args.miss_ratio,
+        prefix_only=args.prefix_only,
+        seed=args.seed,
+    )
+    report = run_matcher(options)
+    save_report(report, args.output)
+    print(format_matcher(report))
+    return 0 if all(result["agree"] for result in report["results"].values()) else 1
+
+
+def _imports(args) -> int:
+    from perf.importtime import build_import_report, format_import_report, measure
+
+    output = measure(args.module, env=dict(item.split("=", 1) for item in args.env))
+    report = build_import_report(args.module, output, top=args.top)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(format_import_report(report))
+    if args.max_ms is not None and (report["module_ms"] or 0) > args.max_ms:
+        print(f"import {args.module} took {report['module_ms']} ms, budget {args.max_ms} ms")
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m perf", description="Load test harness for the FastAPI app")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Seed a database, run the app and replay scenarios")
+    run.add_argument("--target", default="app:app", help="ASGI application as module:attribute")
+    run.add_argument("--mode", choices=("asgi", "uvicorn"), default="asgi")
+    run.add_argument("--rps", type=float, default=50.0, help="Scenario starts per second")
+    run.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    run.add_argument("--warmup", type=float, default=5.0, help="Seconds excluded from the report")
+    run.add_argument("--users", type=int, default=10, help="Number of virtual users")
+    run.add_argument("--role", default="OPERATOR", help="UserRole of virtual users")
+    run.add_argument("--max-in-flight", type=int, default=256)
+    run.add_argument("--voices", type=int, default=10_000)
+    run.add_argument("--records-per-voice", type=int, default=2)
+    run.add_argument("--database-url", help="Seed this database instead of a temporary SQLite file")
+    run.add_argument("--filter-payload", default="{}", help="FilterPayload JSON for the default scenarios")
+    run.add_argument("--scenarios", help="JSON file with a list of scenarios")
+    run.add_argument("--fluent-delay", type=float, default=0.0, help="Artificial latency of the fake Fluent")
+    run.add_argument("--env", action="append", default=[], help="Extra NAME=VALUE set before importing the app")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--output", default="perf-report.json")
+    run.set_defaults(handler=_run)
+
+    cmp = commands.add_parser("compare", help="Compare two reports; exit code 1 on regressions")
+    cmp.add_argument("baseline")
+    cmp.add_argument("candidate")
+    cmp.add_argument("--latency-tolerance", type=float, default=0.10)
+    cmp.add_argument("--latency-floor-ms", type=float, default=1.0)
+    cmp.add_argument("--throughput-tolerance", type=float, default=0.05)
+    cmp.add_argument("--error-rate-tolerance", type=float, default=0.01)
+    cmp.add_argument("--json", action="store_true", help="Print regressions as JSON")
+    cmp.set_defaults(handler=_compare)
+
+    filters = commands.add_parser("filters", help="Filter engine benchmark against a stored baseline")
+    filters.add_argument("--database-url", default="sqlite+aiosqlite:///perf-filters.db")
+    filters.add_argument("--rows", type=int, default=1_000_000, help="Voice records in the synthetic dataset")
+    filters.add_argument("--records-per-voice", type=int, default=2)
+    filters.add_argument("--operators", type=int, default=200)
+    filters.add_argument("--seed", type=int, default=0)
+    filters.add_argument("--strategy", action="append", choices=("inline", "cte", "hybrid"))
+    filters.add_argument("--only", help="Run only cases whose name contains this substring")
+    filters.add_argument("--repeat", type=int, default=5)
+    filters.add_argument("--warmup", type=int, default=1)
+    filters.add_argument(
+        "--baseline", help="Baseline report to compare with (or to write), e.g. perf/baselines/filters-sqlite.json"
+    )
+    filters.add_argument("--update-baseline", action="store_true", help="Write the run as the new baseline")
+    filters.add_argument("--floor-ms", type=float, default=2.0, help="Ignore slowdowns smaller than this")
+    filters.add_argument("--strict-plans", action="store_true", help="Fail when a query plan changes")
+    filters.add_argument(
+        "--recreate", action="store_true", help="Recreate the voice table even if the database has no dataset marker"
+    )
+    filters.add_argument("--output", default="perf-filters.json")
+    filters.set_defaults(handler=_filters)
+
+    vectorized = commands.add_parser("vectorized", help="Per-query latency: SQL filter engine vs NumPy snapshot")
+    vectorized.add_argument("--database-url", default="sqlite+aiosqlite:///perf-vectorized.db")
+    vectorized.add_argument("--rows", type=int, default=100_000, help="Voice records in the synthetic dataset")
+    vectorized.add_argument("--records-per-voice", type=int, default=2)
+    vectorized.add_argument("--operators", type=int, default=200)
+    vectorized.add_argument("--seed", type=int, default=0)
+    vectorized.add_argument("--only", help="Run only cases whose name contains this substring")
+    vectorized.add_argument("--repeat", type=int, default=20)
+    vectorized.add_argument("--warmup", type=int, default=2)
+    vectorized.add_argument(
+        "--recreate", action="store_true", help="Recreate the voice table even if the database has no dataset marker"
+    )
+    vectorized.add_argument("--output", default="perf-vectorized.json")
+    vectorized.set_defaults(handler=_vectorized)
+
+    bulk = commands.add_parser("bulk", help="Rows per second: ORM add_all vs Core bulk insert and upsert")
+    bulk.add_argument("--database-url", default="sqlite+aiosqlite:///perf-bulk.db")
+    bulk.add_argument("--rows", type=int, default=100_000)
+    bulk.add_argument("--records-per-voice", type=int, default=2)
+    bulk.add_argument("--chunk-size", type=int, default=5000)
+    bulk.add_argument("--method", action="append", choices=("orm", "insert", "upsert"))
+    bulk.add_argument("--seed", type=int, default=0)
+    bulk.add_argument("--output", default="perf-bulk.json")
+    bulk.set_defaults(handler=_bulk)
+
+    serialize = commands.add_parser(
+        "serialize", help="Voice page latency: ORM + model_validate vs column projection with batch validation"
+    )
+    serialize.add_argument("--database-url", default="sqlite+aiosqlite:///perf-serialize.db")
+    serialize.add_argument("--rows", type=int, default=100_000, help="Voice records in the synthetic dataset")
+    serialize.add_argument("--records-per-voice", type=int, default=2)
+    serialize.add_argument("--operators", type=int, default=200)
+    serialize.add_argument("--seed", type=int, default=0)
+    serialize.add_argument("--page-size", type=int, default=500)
+    serialize.add_argument("--pages", type=int, default=10, help="Cycle through this many leading pages")
+    serialize.add_argument("--path", action="append", choices=("orm", "projection", "trusted"))
+    serialize.add_argument("--repeat", type=int, default=50)
+    serialize.add_argument("--warmup", type=int, default=5)
+    serialize.add_argument(
+        "--recreate", action="store_true", help="Recreate the voice table even if the database has no dataset marker"
+    )
+    serialize.add_argument("--output", default="perf-serialize.json")
+    serialize.set_defaults(handler=_serialize)
+
+    middleware = commands.add_parser(
+        "middleware", help="Per-request overhead: ASGI PrometheusMiddleware vs the BaseHTTPMiddleware version"
+    )
+    middleware.add_argument("--routes", type=int, default=50, help="Routes in the app; requests hit the last ones")
+    middleware.add_argument("--paths", type=int, default=100, help="Distinct request paths")
+    middleware.add_argument("--requests", type=int, default=20_000)
+    middleware.add_argument("--warmup", type=int, default=1_000)
+    middleware.add_argument("--variant", action="append", choices=("none", "base_http", "asgi"))
+    middleware.add_argument("--output", default="perf-middleware.json")
+    middleware.set_defaults(handler=_middleware)
+
+    matcher = commands.add_parser("matcher", help="Endpoint label lookup: compiled EndpointMatcher vs linear scan")
+    matcher.add_argument("--rules", type=int, default=500)
+    matcher.add_argument("--paths", type=int, default=2_000, help="Distinct request paths")
+    matcher.add_argument("--lookups", type=int, default=200_000)
+    matcher.add_argument("--miss-ratio", type=float, default=0.2, help="Share of paths that match no rule")
+    matcher.add_argument("--prefix-only", action="store_true", help="Generate only prefix rules")
+    matcher.add_argument("--seed", type=int, default=0)
+    matcher.add_argument("--output", default="perf-matcher.json")
+    matcher.set_defaults(handler=_matcher)
+
+    imports = commands.add_parser("imports", help="Report the slowest modules imported by a module")
+    imports.add_argument("module", nargs="?", default="app")
+    imports.add_argument("--top", type=int, default=20)
+    imports.add_argument("--env", action="append", default=[], help="Extra NAME=VALUE for the interpreter")
+    imports.add_argument("--max-ms", type=float, help="Exit code 1 when the import takes longer")
+    imports.add_argument("--json", action="store_true", help="Print the report as JSON")
+    imports.set_defaults(handler=_imports)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import platform
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import sqlalchemy
+from sqlalchemy import MetaData, Table
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import registry
+
+from core.repositories.alchemy.models import SqlVoice
+from perf.seed import generate_rows, voice_overrides
+from uow.bulk import bulk_insert
+
+BULK_METHODS = ("orm", "insert", "upsert")
+# Отдельная таблица: замер не трогает таблицу голосов приложения
+BENCH_TABLE = "perf_bulk_voice"
+
+
+@dataclass
+class BulkOptions:
+    database_url: str = "sqlite+aiosqlite:///perf-bulk.db"
+    rows: int = 100_000
+    records_per_voice: int = 2
+    chunk_size: int = 5000
+    methods: tuple[str, ...] = BULK_METHODS
+    seed: int = 0
+
+
+def _bench_table() -> Table:
+    return SqlVoice.__table__.to_metadata(MetaData(), name=BENCH_TABLE)
+
+
+async def _save_orm(session: AsyncSession, table: Table, rows: list[dict]) -> int:
+    """
+    Прежний путь save_voices: ORM-объекты через add_all и unit of work.
+    """
+
+    class BenchVoice:
+        pass
+
+    registry().map_imperatively(BenchVoice, table)
+    session.add_all(BenchVoice(**row) for row in rows)
+    await session.flush()
+    return len(rows)
+
+
+async def _save_core(session: AsyncSession, table: Table, rows: list[dict], chunk_size: int, upsert: bool) -> int:
+    conflict_columns = [SqlVoice.get_record_id().key] if upsert else None
+    report = await bulk_insert(session, table, rows, chunk_size=chunk_size, conflict_columns=conflict_columns)
+    if not report.ok:
+        raise RuntimeError(f"bulk insert failed: {report.failures[0].error}")
+    return report.saved
+
+
+async def run_bulk(options: BulkOptions) -> dict:
+    """
+    Замеряет скорость сохранения голосов (строк в секунду) разными способами.
+
+    orm — ORM-объекты через add_all, insert — bulk_insert (на PostgreSQL с asyncpg — COPY),
+    upsert — bulk_insert с ON CONFLICT по record id поверх уже сохранённых строк. Каждый способ
+    пишет в свою пустую таблицу perf_bulk_voice (для upsert она заранее заполнена теми же строками),
+    таблица удаляется после замера.
+
+    Returns:
+        Отчёт: meta и results (ключ — способ).
+    """
+    table = _bench_table()
+    rows = list(generate_rows(table, options.rows, voice_overrides(options.records_per_voice), options.seed))
+    engine = create_async_engine(options.database_url)
+    results = {}
+    try:
+        for method in options.methods:
+            async with engine.begin() as connection:
+                await connection.run_sync(table.drop, checkfirst=True)
+                await connection.run_sync(table.create)
+                if method == "upsert":
+                    await connection.execute(table.insert(), rows)
+            async with AsyncSession(engine) as session:
+                started = time.perf_counter()
+                if method == "orm":
+                    saved = await _save_orm(session, table, rows)
+                else:
+                    saved = await _save_core(session, table, rows, options.chunk_size, upsert=method == "upsert")
+                await session.commit()
+                elapsed = time.perf_counter() - started
+            results[method] = {
+                "rows": saved,
+                "seconds": round(elapsed, 3),
+                "rows_per_second": round(saved / elapsed) if elapsed else None,
+            }
+        async with engine.begin() as connection:
+            await connection.run_sync(table.drop, checkfirst=True)
+        dialect, driver = engine.dialect.name, engine.dialect.driver
+    finally:
+        await engine.dispose()
+
+    return {
+        "meta": {
+            "dialect": dialect,
+            "driver": driver,
+            "rows": options.rows,
+            "chunk_size": options.chunk_size,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+        },
+        "results": results,
+    }
+
+
+def format_bulk(report: dict, baseline: Optional[str] = "orm") -> str:
+    meta = report["meta"]
+    lines = [
+        f"{meta['rows']} rows, {meta['dialect']}+{meta['driver']}, chunk {meta['chunk_size']}",
+        f"{'method':<8} {'seconds':>9} {'rows/s':>10} {'speedup':>8}",
+    ]
+    reference = report["results"].get(baseline, {}).get("rows_per_second")
+    for method, result in report["results"].items():
+        speedup = f"{result['rows_per_second'] / reference:>7.1f}x" if reference else f"{'-':>8}"
+        lines.append(f"{method:<8} {result['seconds']:>9.2f} {result['rows_per_second']:>10} {speedup}")
+    return "\n".join(lines)
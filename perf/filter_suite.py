@@ -0,0 +1,551 @@
+import hashlib
+import json
+import platform
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Iterable, Optional
+
+import sqlalchemy
+from sqlalchemy import Column, MetaData, String, Table, func, inspect, select, true
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+
+from api.v1.schemas import FilterSource
+from core.repositories.alchemy.models import SqlVoice, UserRole, VoiceStatus
+from filters.filter_engine import SqlAlchemyFilterEngine
+from filters.strategy import FilterStrategy
+from filters.text_search import register_sqlite_functions
+from perf.loadgen import percentile
+from perf.seed import ValueFactory, seed_table
+
+# Словарь для текстовых полей; первые слова встречаются чаще последних (закон Ципфа)
+# fmt: off
+VOCABULARY = (
+    "заявка", "оператор", "звонок", "клиент", "договор", "оплата", "доставка", "возврат", "тариф", "ошибка",
+    "жалоба", "отзыв", "карта", "кредит", "перевод", "счёт", "лимит", "бонус", "акция", "скидка",
+    "подписка", "роуминг", "интернет", "баланс", "пароль", "приложение", "офис", "курьер", "гарантия", "претензия",
+)
+# fmt: on
+_VOCABULARY_WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+# Доли статусов в наборе; свободны только NEW
+STATUS_WEIGHTS = {
+    VoiceStatus.NEW: 0.5,
+    VoiceStatus.IN_PROGRESS: 0.2,
+    VoiceStatus.CHANGED: 0.1,
+    VoiceStatus.CONFIRMED: 0.1,
+    VoiceStatus.VIEWED: 0.1,
+}
+
+_dataset_metadata = MetaData()
+DATASET_TABLE = Table("perf_dataset", _dataset_metadata, Column("spec", String, nullable=False))
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    Параметры синтетического набора: rows записей голосов по records_per_voice на голос, занятые
+    записи распределены между operators операторами, даты создания — за последние days дней
+    (поиск по умолчанию смотрит 30 дней).
+    """
+
+    rows: int = 1_000_000
+    records_per_voice: int = 2
+    operators: int = 200
+    days: int = 90
+    seed: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__, sort_keys=True)
+
+
+def dataset_overrides(spec: DatasetSpec) -> dict[str, ValueFactory]:
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    now = datetime.now(timezone.utc)
+    # Статус и исполнитель должны согласовываться, поэтому выбираются один раз на запись
+    state: dict[str, Any] = {"i": None}
+
+    def record_state(i: int, rng: random.Random) -> dict:
+        if state["i"] != i:
+            status = rng.choices(statuses, weights)[0]
+            user_id = None if status == VoiceStatus.NEW else rng.randint(1, spec.operators)
+            state.update(i=i, status=status, user_id=user_id)
+        return state
+
+    return {
+        "record_id": lambda i, rng: f"record-{i}",
+        "voice_id": lambda i, rng: f"voice-{i // spec.records_per_voice}",
+        "is_top": lambda i, rng: i % spec.records_per_voice == spec.records_per_voice - 1,
+        "status": lambda i, rng: record_state(i, rng)["status"],
+        "user_id": lambda i, rng: record_state(i, rng)["user_id"],
+        "author_id": lambda i, rng: (
+            record_state(i, rng)["user_id"]
+            if record_state(i, rng)["status"] in (VoiceStatus.CHANGED, VoiceStatus.CONFIRMED)
+            else None
+        ),
+        "created_at": lambda i, rng: now - timedelta(seconds=rng.uniform(0, spec.days * 86400)),
+        "name": lambda i, rng: " ".join(rng.choices(VOCABULARY, _VOCABULARY_WEIGHTS, k=rng.randint(2, 6))),
+    }
+
+
+async def ensure_dataset(engine, spec: DatasetSpec, recreate: bool = False) -> bool:
+    """
+    Готовит набор данных; если в базе уже лежит набор с теми же параметрами, он переиспользуется.
+
+    Пересоздаётся только таблица голосов. База без отметки perf_dataset, в которой уже есть таблицы,
+    не трогается: это может быть рабочая база приложения.
+
+    Args:
+        engine: асинхронный движок SQLAlchemy.
+        spec: параметры набора.
+        recreate: пересоздать таблицу голосов даже в чужой базе.
+
+    Returns:
+        True, если набор был сгенерирован заново.
+    """
+    async with engine.begin() as connection:
+        tables = set(await connection.run_sync(lambda sync_connection: inspect(sync_connection).get_table_names()))
+        if tables and DATASET_TABLE.name not in tables and not recreate:
+            raise RuntimeError(
+                f"Database {engine.url.render_as_string()} has tables {sorted(tables)} but no "
+                f"{DATASET_TABLE.name} marker; refusing to overwrite it (use recreate to force)"
+            )
+        await connection.run_sync(_dataset_metadata.create_all)
+        stored = (await connection.execute(select(DATASET_TABLE.c.spec))).scalar()
+    if stored == spec.to_json():
+        return False
+
+    table = SqlVoice.__table__
+    async with engine.begin() as connection:
+        await connection.run_sync(table.drop, checkfirst=True)
+        await connection.run_sync(table.create)
+        await connection.execute(DATASET_TABLE.delete())
+    async with AsyncSession(engine) as session:
+        report = await seed_table(session, SqlVoice, spec.rows, dataset_overrides(spec), spec.seed)
+        if not report.ok:
+            raise RuntimeError(f"Dataset generation failed: {report.failures[0].error}")
+        await session.execute(DATASET_TABLE.insert().values(spec=spec.to_json()))
+        await session.commit()
+    # Статистика нужна планировщику, иначе планы на свежей базе не показательны
+    async with engine.begin() as connection:
+        await connection.exec_driver_sql("ANALYZE")
+    return True
+
+
+@dataclass(frozen=True)
+class Condition:
+    field: str
+    op: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class BenchPayload:
+    """
+    Форма FilterPayload для бенчмарка. Движок читает у payload только эти атрибуты.
+    """
+
+    source: Any
+    and_: tuple[Condition, ...] = ()
+    or_: tuple[Condition, ...] = ()
+    global_order_by: Optional[str] = None
+    global_order_direction: str = "asc"
+
+
+@dataclass(frozen=True)
+class FilterCase:
+    """
+    Форма фильтра из каталога.
+
+    top и deep_search включают системные условия «только активные записи» и «глубина поиска»; в
+    приложении они есть всегда, выключенные показывают их вклад в план и время. tolerance —
+    допустимый относительный рост медианы против базового прогона, budget_ms — потолок медианы в
+    миллисекундах (None — без потолка). Бюджет из файла базового прогона важнее.
+    """
+
+    name: str
+    payload: BenchPayload
+    role: str
+    use_sorting: bool = False
+    limit: int = 50
+    top: bool = True
+    deep_search: bool = True
+    tolerance: float = 0.25
+    budget_ms: Optional[float] = None
+
+    @property
+    def fields(self) -> set[str]:
+        return {condition.field for condition in (*self.payload.and_, *self.payload.or_)}
+
+
+class BenchFilterEngine(SqlAlchemyFilterEngine):
+    """
+    Движок фильтров, в котором системные условия top и deep search можно выключить.
+    """
+
+    def __init__(self, *args, top: bool = True, deep_search: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.top = top
+        self.deep_search = deep_search
+
+    def _top_filter(self):
+        return super()._top_filter() if self.top else true()
+
+    def _deep_search(self):
+        return super()._deep_search() if self.deep_search else true()
+
+
+# Варианты системных условий: суффикс имени формы -> (top, deep_search)
+SYSTEM_FILTER_VARIANTS = {
+    "all_records": (False, True),
+    "all_time": (True, False),
+    "all_records_all_time": (False, False),
+}
+
+
+def _voice_filter_shapes(spec: DatasetSpec) -> dict[str, dict]:
+    """
+    Формы пользовательских условий. budget_ms — примерно двойная худшая медиана формы на наборе
+    по умолчанию (1 млн записей) на SQLite, см. perf/baselines/filters-sqlite.json, не меньше 50 мс;
+    относится ко всем вариантам формы, включая варианты без системных условий.
+    """
+    voices = spec.rows // spec.records_per_voice
+    rng = random.Random(spec.seed)
+    many_ids = [f"voice-{rng.randrange(voices)}" for _ in range(1000)]
+    common, rare = VOCABULARY[0], VOCABULARY[-1]
+    return {
+        "system_only": {"budget_ms": 1250},
+        "voice_id_eq": {
+            "and_": (Condition("voice_id", "=", f"voice-{voices // 2}"),),
+            "tolerance": 0.5,
+            "budget_ms": 50,
+        },
+        "voice_id_in_1000": {"and_": (Condition("voice_id", "in", many_ids),), "budget_ms": 50},
+        "status_in": {
+            "and_": (Condition("status", "in", [VoiceStatus.NEW, VoiceStatus.IN_PROGRESS]),),
+            "budget_ms": 950,
+        },
+        "name_contains_common": {"and_": (Condition("name", "contains", common),), "budget_ms": 1700},
+        "name_contains_rare": {"and_": (Condition("name", "contains", rare),), "budget_ms": 1700},
+        "name_icontains": {"and_": (Condition("name", "icontains", rare.upper()),), "budget_ms": 6000},
+        "name_startswith": {"and_": (Condition("name", "startswith", rare[:4]),), "budget_ms": 1200},
+        "name_match": {"and_": (Condition("name", "match", f"{common} {rare}"),), "budget_ms": 5250},
+        "or_two_words": {
+            "or_": (Condition("name", "contains", rare), Condition("name", "contains", VOCABULARY[-2])),
+            "budget_ms": 1550,
+        },
+        "mixed_and_or": {
+            "and_": (Condition("status", "!=", VoiceStatus.VIEWED), Condition("name", "startswith", common[:3])),
+            "or_": (Condition("voice_id", "in", many_ids[:100]), Condition("name", "contains", rare)),
+            "budget_ms": 1050,
+        },
+    }
+
+
+def default_catalog(spec: DatasetSpec) -> list[FilterCase]:
+    """
+    Каталог форм: каждая форма пользовательских условий для каждой роли и каждого источника,
+    варианты без системных условий (SYSTEM_FILTER_VARIANTS) и варианты с сортировкой.
+    """
+    cases = []
+    for shape, options in _voice_filter_shapes(spec).items():
+        options = dict(options)
+        limits = {"tolerance": options.pop("tolerance", 0.25), "budget_ms": options.pop("budget_ms")}
+        for role in (UserRole.ADMIN, UserRole.OPERATOR):
+            for source in (FilterSource.ASSIGMENT_AREA, FilterSource.WORK_AREA):
+                payload = BenchPayload(source=source, **options)
+                name = f"{shape}/{role.name.lower()}/{source.name.lower()}"
+                cases.append(FilterCase(name, payload, role.name, **limits))
+        for variant, (top, deep_search) in SYSTEM_FILTER_VARIANTS.items():
+            payload = BenchPayload(FilterSource.ASSIGMENT_AREA, **options)
+            name = f"{shape}/admin/assigment_area/{variant}"
+            cases.append(FilterCase(name, payload, UserRole.ADMIN.name, top=top, deep_search=deep_search, **limits))
+        for column, direction in (("created_at", "desc"), ("name", "asc")):
+            payload = BenchPayload(
+                FilterSource.ASSIGMENT_AREA, global_order_by=column, global_order_direction=direction, **options
+            )
+            name = f"{shape}/operator/assigment_area/sort_{column}_{direction}"
+            cases.append(FilterCase(name, payload, UserRole.OPERATOR.name, use_sorting=True, **limits))
+    return cases
+
+
+def _plan_lines_postgresql(node: dict, depth: int = 0) -> list[str]:
+    line = "  " * depth + node["Node Type"]
+    if "Relation Name" in node:
+        line += f" on {node['Relation Name']}"
+    if "Index Name" in node:
+        line += f" using {node['Index Name']}"
+    lines = [line]
+    for child in node.get("Plans", ()):
+        lines.extend(_plan_lines_postgresql(child, depth + 1))
+    return lines
+
+
+async def explain(connection: AsyncConnection, stmt) -> tuple[list[str], Optional[float]]:
+    """
+    План запроса в виде строк (отступ — вложенность) и оценка стоимости (только PostgreSQL).
+
+    Запрос компилируется с литералами и отправляется драйверу как есть: в литералах дат и шаблонов
+    встречаются двоеточия и проценты, которые text() принял бы за параметры.
+    """
+    dialect = connection.dialect
+    sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if dialect.name == "postgresql":
+        plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return _plan_lines_postgresql(plan[0]["Plan"]), plan[0]["Plan"]["Total Cost"]
+    if dialect.name == "sqlite":
+        rows = (await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")).all()
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node_id] + detail)
+        return lines, None
+    return [], None
+
+
+def plan_fingerprint(lines: Iterable[str]) -> str:
+    return hashlib.sha1("\n".join(lines).encode()).hexdigest()[:12]
+
+
+@dataclass
+class CaseResult:
+    case: str
+    strategy: str
+    median_ms: float
+    p95_ms: float
+    total: int
+    plan: list[str]
+    plan_fingerprint: str
+    cost: Optional[float] = None
+    budget_ms: Optional[float] = None
+    tolerance: float = 0.25
+
+
+async def run_case(
+    connection: AsyncConnection,
+    engine: SqlAlchemyFilterEngine,
+    case: FilterCase,
+    strategy: FilterStrategy,
+    repeat: int,
+    warmup: int,
+) -> CaseResult:
+    """
+    Выполняет форму так же, как VoiceRepository._paginate: страницу и подсчёт по одной стратегии.
+    """
+    user = SimpleNamespace(id=1, role=UserRole[case.role])
+    page_stmt = engine.apply(case.payload, user, use_sorting=case.use_sorting, strategy=strategy).limit(case.limit)
+    # Подсчёт, как и в репозитории, строится без сортировки
+    count_stmt = select(func.count()).select_from(engine.apply(case.payload, user, strategy=strategy).subquery())
+
+    latencies = []
+    total = 0
+    for i in range(warmup + repeat):
+        started = time.perf_counter()
+        (await connection.execute(page_stmt)).all()
+        total = (await connection.execute(count_stmt)).scalar_one()
+        if i >= warmup:
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+
+    page_plan, cost = await explain(connection, page_stmt)
+    count_plan, _ = await explain(connection, count_stmt)
+    plan = [f"page: {line}" for line in page_plan] + [f"count: {line}" for line in count_plan]
+    return CaseResult(
+        case=case.name,
+        strategy=strategy.value,
+        median_ms=round(percentile(latencies, 0.5) * 1000, 3),
+        p95_ms=round(percentile(latencies, 0.95) * 1000, 3),
+        total=total,
+        plan=plan,
+        plan_fingerprint=plan_fingerprint(plan),
+        cost=cost,
+        budget_ms=case.budget_ms,
+        tolerance=case.tolerance,
+    )
+
+
+@dataclass
+class SuiteOptions:
+    database_url: str = "sqlite+aiosqlite:///perf-filters.db"
+    dataset: DatasetSpec = field(default_factory=DatasetSpec)
+    strategies: tuple[FilterStrategy, ...] = tuple(FilterStrategy)
+    only: Optional[str] = None  # подстрока имени формы
+    repeat: int = 5
+    warmup: int = 1
+    recreate: bool = False  # пересоздать таблицу голосов в базе без отметки perf_dataset
+
+
+async def run_suite(options: SuiteOptions, catalog: Optional[list[FilterCase]] = None) -> dict:
+    """
+    Прогоняет каталог форм по всем стратегиям и возвращает отчёт.
+
+    Формы с полями вне FILTER_WHITE_LIST модели пропускаются: движок молча отбросил бы такие
+    условия, и замер описывал бы другую форму.
+
+    Returns:
+        Отчёт: meta, results (ключ — «форма@стратегия») и skipped.
+    """
+    catalog = catalog if catalog is not None else default_catalog(options.dataset)
+    white_list = set(SqlVoice.FILTER_WHITE_LIST)
+    filter_engines = {}
+    engine = create_async_engine(options.database_url)
+    register_sqlite_functions(engine)
+    results, skipped = {}, []
+    try:
+        seeding_started = time.perf_counter()
+        seeded = await ensure_dataset(engine, options.dataset, options.recreate)
+        seed_seconds = time.perf_counter() - seeding_started
+        async with engine.connect() as connection:
+            for case in catalog:
+                if options.only and options.only not in case.name:
+                    continue
+                if not case.fields <= white_list:
+                    skipped.append(case.name)
+                    continue
+                system_filters = (case.top, case.deep_search)
+                if system_filters not in filter_engines:
+                    # Адаптивный выбор стратегии не нужен: стратегия задаётся явно
+                    filter_engines[system_filters] = BenchFilterEngine(
+                        SqlVoice,
+                        SqlVoice.FILTER_WHITE_LIST,
+                        strategy_selector=None,
+                        top=case.top,
+                        deep_search=case.deep_search,
+                    )
+                for strategy in options.strategies:
+                    result = await run_case(
+                        connection, filter_engines[system_filters], case, strategy, options.repeat, options.warmup
+                    )
+                    results[f"{case.name}@{strategy.value}"] = result.__dict__
+        dialect = engine.dialect.name
+    finally:
+        await engine.dispose()
+
+    return {
+        "meta": {
+            "dialect": dialect,
+            "dataset": options.dataset.__dict__,
+            "seeded": seeded,
+            "seed_seconds": seed_seconds,
+            "repeat": options.repeat,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+@dataclass(frozen=True)
+class Violation:
+    key: str
+    kind: str  # incomparable, budget, regression, result_mismatch, plan_changed
+    detail: str
+
+    def __str__(self) -> str:
+        return f"{self.kind.upper()} {self.key}: {self.detail}"
+
+
+def check_report(
+    report: dict, baseline: Optional[dict] = None, floor_ms: float = 2.0, fail_on_plan_change: bool = False
+) -> tuple[list[Violation], list[Violation]]:
+    """
+    Проверяет отчёт по бюджетам форм и против базового прогона.
+
+    Ошибки:
+    - budget — медиана выше budget_ms формы (бюджет из базового прогона важнее бюджета каталога);
+    - regression — медиана выросла больше чем на tolerance формы и больше чем на floor_ms;
+    - result_mismatch — стратегии одной формы вернули разное количество строк;
+    - incomparable — базовый прогон снят на другой СУБД или другом наборе данных.
+    Записи базового прогона без замеров (только budget_ms) задают лишь бюджет.
+    Смена плана (plan_changed) — предупреждение, ошибка только при fail_on_plan_change.
+
+    Returns:
+        Ошибки и предупреждения.
+    """
+    errors, warnings = [], []
+    results = report["results"]
+
+    totals: dict[str, set[int]] = {}
+    for result in results.values():
+        totals.setdefault(result["case"], set()).add(result["total"])
+    for case, values in totals.items():
+        if len(values) > 1:
+            errors.append(Violation(case, "result_mismatch", f"strategies returned {sorted(values)} rows"))
+
+    base_results = {}
+    if baseline is not None:
+        for name in ("dialect", "dataset"):
+            if baseline["meta"][name] != report["meta"][name]:
+                errors.append(Violation("meta", "incomparable", f"{name} differs from the baseline"))
+                return errors, warnings
+        base_results = baseline["results"]
+
+    for key, result in results.items():
+        base = base_results.get(key)
+        budget = base.get("budget_ms") if base and base.get("budget_ms") is not None else result["budget_ms"]
+        if budget is not None and result["median_ms"] > budget:
+            errors.append(Violation(key, "budget", f"median {result['median_ms']:.1f}ms > budget {budget:.1f}ms"))
+        if base is None or "median_ms" not in base:
+            continue
+        before, after = base["median_ms"], result["median_ms"]
+        if after > before * (1 + result["tolerance"]) and after - before > floor_ms:
+            errors.append(Violation(key, "regression", f"median {before:.1f}ms -> {after:.1f}ms"))
+        if base["plan_fingerprint"] != result["plan_fingerprint"]:
+            violation = Violation(key, "plan_changed", "\n".join(["was:", *base["plan"], "now:", *result["plan"]]))
+            (errors if fail_on_plan_change else warnings).append(violation)
+    return errors, warnings
+
+
+def seed_baseline(
+    spec: DatasetSpec,
+    dialect: str = "sqlite",
+    catalog: Optional[list[FilterCase]] = None,
+    strategies: Iterable[FilterStrategy] = tuple(FilterStrategy),
+) -> dict:
+    """
+    Базовый прогон без замеров: только бюджеты каталога для набора spec на СУБД dialect.
+
+    Проверка по нему ловит превышение бюджетов; --update-baseline на эталонной машине дополнит его
+    медианами и планами, сохранив бюджеты.
+    """
+    catalog = catalog if catalog is not None else default_catalog(spec)
+    return {
+        "meta": {"dialect": dialect, "dataset": spec.__dict__},
+        "results": {
+            f"{case.name}@{strategy.value}": {"budget_ms": case.budget_ms}
+            for case in catalog
+            for strategy in strategies
+        },
+        "skipped": [],
+    }
+
+
+def update_baseline(report: dict, baseline: Optional[dict]) -> dict:
+    """
+    Новый базовый прогон из отчёта с сохранением бюджетов, заданных в старом.
+    """
+    updated = json.loads(json.dumps(report))
+    if baseline is not None:
+        for key, result in updated["results"].items():
+            budget = baseline["results"].get(key, {}).get("budget_ms")
+            if budget is not None:
+                result["budget_ms"] = budget
+    return updated
+
+
+def format_results(report: dict) -> str:
+    lines = [f"{'case':<64} {'strategy':>8} {'median':>9} {'p95':>9} {'rows':>9}  plan"]
+    for result in report["results"].values():
+        lines.append(
+            f"{result['case']:<64} {result['strategy']:>8} {result['median_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+            f"{result['total']:>9}  {result['plan_fingerprint']}"
+        )
+    return "\n".join(lines)
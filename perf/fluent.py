@@ -0,0 +1,48 @@
+import asyncio
+from collections import deque
+from typing import Optional
+
+
+class FakeFluentCollector:
+    """
+    Локальный TCP-приёмник вместо Fluent для нагрузочных прогонов.
+
+    FluentAuditTransport открывает соединение на каждое сообщение, поэтому сообщением считается
+    всё, что пришло в одно соединение. delay имитирует медленный коллектор: ответ (закрытие
+    соединения) задерживается на delay секунд. Последние keep_last сообщений сохраняются.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0, keep_last: int = 100):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.messages = 0
+        self.bytes = 0
+        self.last: deque[bytes] = deque(maxlen=keep_last)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            data = await reader.read()
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if data:
+                self.messages += 1
+                self.bytes += len(data)
+                self.last.append(data)
+        finally:
+            writer.close()
+
+    async def start(self) -> "FakeFluentCollector":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def stats(self) -> dict:
+        return {"messages": self.messages, "bytes": self.bytes}
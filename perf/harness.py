@@ -0,0 +1,260 @@
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from perf.fluent import FakeFluentCollector
+from perf.loadgen import USER_HEADER, LoadGenerator, Scenario, Step
+from perf.report import build_report
+from perf.seed import seed_database
+
+
+@dataclass
+class HarnessOptions:
+    target: str = "app:app"
+    mode: str = "asgi"  # asgi — через httpx.ASGITransport, uvicorn — настоящий HTTP-сервер в этом же процессе
+    rps: float = 50.0
+    duration: float = 30.0
+    warmup: float = 5.0
+    users: int = 10
+    role: str = "OPERATOR"
+    max_in_flight: int = 256
+    voices: int = 10_000
+    records_per_voice: int = 2
+    database_url: Optional[str] = None  # None — новая SQLite-база во временном каталоге
+    filter_payload: dict = field(default_factory=dict)
+    scenarios: Optional[list[Scenario]] = None  # None — default_scenarios(filter_payload)
+    fluent_delay: float = 0.0
+    env: dict[str, str] = field(default_factory=dict)
+    seed: int = 0
+
+
+# Голосов в одной смене статуса; у каждого запуска свой набор
+STATUS_CHANGE_VOICES = 20
+
+
+def user_voice_filter(
+    filter_payload: dict, voices: int, users: int, size: int = STATUS_CHANGE_VOICES, source: Optional[str] = None
+):
+    """
+    Тело FilterPayload для запуска сценария: исходный фильтр, суженный до голосов этого запуска.
+
+    Голоса voice-<k> (см. perf.seed.voice_overrides) делятся между виртуальными пользователями по k mod users,
+    а очередной запуск пользователя берёт следующие size голосов своей доли. Поэтому пользователи
+    не меняют статус одних и тех же голосов, а запуски одного пользователя пересекаются, только если
+    одновременно выполняется больше запусков, чем помещается в его долю. source заменяет источник
+    исходного фильтра.
+
+    Returns:
+        Функция (user, run) -> JSON фильтра для Step.json.
+    """
+    from api.v1.schemas import FilterPayload
+
+    and_key = FilterPayload.model_fields["and_"].alias or "and_"
+
+    def build(user: int, run: int) -> dict:
+        share = range(user - 1, voices, users)
+        slices = max(len(share) // size, 1)
+        start = (run // users) % slices * size
+        ids = [f"voice-{k}" for k in share[start : start + size]]
+        condition = {"field": "voice_id", "op": "in", "value": ids}
+        payload = {**filter_payload, and_key: [*filter_payload.get(and_key, []), condition]}
+        if source is not None:
+            payload["source"] = source
+        return payload
+
+    return build
+
+
+def default_scenarios(filter_payload: dict, voices: int = 10_000, users: int = 10) -> list[Scenario]:
+    """
+    Сценарии по умолчанию: аудируемый /login, страница списка голосов по фильтру и массовая смена
+    статуса (взять голоса в работу и вернуть обратно) на своих для каждого запуска голосах.
+
+    Без source в filter_payload берётся область назначения. Голоса, взятые в работу, из неё уходят,
+    поэтому возврат выполняется по тем же голосам в рабочей области. Оператор видит взятые в работу
+    голоса только с user_id = своему id, а смена статуса заполняет author_id: с ролью OPERATOR
+    возврат не находит голосов (404), смену статуса целиком проверяет роль ADMIN.
+    """
+    from api.v1.schemas import FilterSource
+    from core.repositories.alchemy.models import VoiceStatus
+
+    filter_payload = {"source": FilterSource.ASSIGMENT_AREA.value, **filter_payload}
+    take_filter = user_voice_filter(filter_payload, voices, users)
+    release_filter = user_voice_filter(filter_payload, voices, users, source=FilterSource.WORK_AREA.value)
+    return [
+        Scenario("login", [Step("GET", "/login")], weight=1),
+        Scenario(
+            "voices_page",
+            [Step("POST", "/voices/page", params={"limit": 50, "offset": 0}, json=filter_payload)],
+            weight=8,
+        ),
+        Scenario(
+            "status_change",
+            [
+                Step(
+                    "POST",
+                    "/voices/status",
+                    params={"new_status": VoiceStatus.IN_PROGRESS.value},
+                    json=take_filter,
+                    expect=(204,),
+                ),
+                Step(
+                    "POST",
+                    "/voices/status",
+                    params={"new_status": VoiceStatus.NEW.value},
+                    json=release_filter,
+                    expect=(204,),
+                ),
+            ],
+            weight=1,
+        ),
+    ]
+
+
+def load_scenarios(path: str) -> list[Scenario]:
+    with open(path) as f:
+        return [Scenario.from_dict(data) for data in json.load(f)]
+
+
+def _perf_user_dependency(role: str):
+    from fastapi import Request
+
+    from core.repositories.alchemy.models import UserRole
+
+    user_role = UserRole[role]
+
+    async def perf_user(request: Request):
+        return SimpleNamespace(id=int(request.headers.get(USER_HEADER, 1)), role=user_role)
+
+    return perf_user
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextlib.asynccontextmanager
+async def _client(app, mode: str) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Клиент к приложению. В режиме uvicorn сервер и генератор нагрузки делят один event loop,
+    поэтому потолок RPS ниже, чем у отдельного сервера; для сравнения прогонов режим должен совпадать.
+    """
+    if mode == "asgi":
+        # Ошибки приложения превращаются в ответ 500, как у настоящего сервера
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://perf") as client:
+            yield client
+        return
+    if mode != "uvicorn":
+        raise ValueError(f"Unknown mode {mode!r}")
+
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", access_log=False))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            yield client
+    finally:
+        server.should_exit = True
+        await serving
+
+
+async def run_harness(options: HarnessOptions) -> dict:
+    """
+    Полный прогон: база, поддельный Fluent, приложение, нагрузка и отчёт.
+
+    Нагрузка идёт на настоящее приложение options.target (по умолчанию app:app) со всеми его
+    зависимостями: без пакетов приложения (core, api, conf) прогон падает на импорте, до заполнения БД.
+    Переменные окружения (DATABASE_URL, адрес аудита и options.env) выставляются до импорта
+    приложения, потому что модули читают их при импорте. Поэтому прогон запускается в отдельном
+    процессе (python -m perf run), а не из уже работающего приложения. Аутентификация заменяется
+    зависимостью, которая строит пользователя с ролью options.role по заголовку X-Perf-User.
+
+    Returns:
+        JSON-отчёт (см. perf.report.build_report).
+    """
+    started_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    workdir = tempfile.mkdtemp(prefix="perf-")
+    database_url = options.database_url or f"sqlite+aiosqlite:///{os.path.join(workdir, 'perf.db')}"
+
+    collector = await FakeFluentCollector(delay=options.fluent_delay).start()
+    os.environ.update(
+        {
+            "DATABASE_URL": database_url,
+            "AUDIT_FLUENT_HOST": collector.host,
+            "AUDIT_FLUENT_PORT": str(collector.port),
+            "AUDIT_CATALOG_FLUENT_HOST": collector.host,
+            "AUDIT_CATALOG_FLUENT_PORT": str(collector.port),
+            **options.env,
+        }
+    )
+    try:
+        module_name, _, attr = options.target.partition(":")
+        app = getattr(importlib.import_module(module_name), attr or "app")
+
+        from uow.di import get_current_user
+
+        app.dependency_overrides[get_current_user] = _perf_user_dependency(options.role)
+
+        # Движок приложения подключается к БД лениво, поэтому её можно заполнить после импорта
+        seeded_at = time.perf_counter()
+        seed_reports = await seed_database(database_url, options.voices, options.records_per_voice, seed=options.seed)
+        seed_seconds = time.perf_counter() - seeded_at
+
+        scenarios = options.scenarios or default_scenarios(options.filter_payload, options.voices, options.users)
+        async with _client(app, options.mode) as client:
+            generator = LoadGenerator(
+                client,
+                scenarios,
+                rps=options.rps,
+                duration=options.duration,
+                warmup=options.warmup,
+                users=options.users,
+                max_in_flight=options.max_in_flight,
+                seed=options.seed,
+            )
+            result = await generator.run()
+    finally:
+        await collector.stop()
+
+    meta = {
+        "target": options.target,
+        "mode": options.mode,
+        "rps": options.rps,
+        "duration": options.duration,
+        "warmup": options.warmup,
+        "users": options.users,
+        "role": options.role,
+        "voices": options.voices,
+        "records_per_voice": options.records_per_voice,
+        "database": database_url.split("://", 1)[0],
+        "seed_seconds": seed_seconds,
+        "seed_failures": sum(len(report.failures) for report in seed_reports.values()),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "started_at": started_at,
+    }
+    return build_report(result, meta, collector.stats())
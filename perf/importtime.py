@@ -0,0 +1,114 @@
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Optional
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S.*)$")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    children: list = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "module": self.module,
+            "self_ms": round(self.self_us / 1000, 3),
+            "cumulative_ms": round(self.cumulative_us / 1000, 3),
+            "depth": self.depth,
+        }
+
+
+def parse_importtime(output: str) -> list:
+    """
+    Разбирает вывод `python -X importtime` в дерево импортов.
+
+    Args:
+        output: stderr интерпретатора
+
+    Returns:
+        Корневые записи; вложенные импорты лежат в children. Дочерние строки печатаются
+        раньше родителя, поэтому они копятся по глубине до строки с меньшим отступом.
+    """
+    pending = {}
+    roots = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        depth = (len(indent) - 1) // 2
+        record = ImportRecord(module.strip(), int(self_us), int(cumulative_us), depth)
+        record.children = pending.pop(depth + 1, [])
+        pending.setdefault(depth, []).append(record)
+    for depth in sorted(pending):
+        roots.extend(pending[depth])
+    return roots
+
+
+def flatten(records: list) -> list:
+    result = []
+    stack = list(reversed(records))
+    while stack:
+        record = stack.pop()
+        result.append(record)
+        stack.extend(reversed(record.children))
+    return result
+
+
+def measure(module: str, python: Optional[str] = None, env: Optional[dict] = None, cwd: Optional[str] = None) -> str:
+    """
+    Импортирует модуль в отдельном интерпретаторе с -X importtime и возвращает его stderr.
+
+    Raises:
+        RuntimeError: импорт завершился ошибкой
+    """
+    completed = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, **(env or {})},
+        cwd=cwd,
+    )
+    if completed.returncode != 0:
+        lines = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed:\n" + "\n".join(lines[-20:]))
+    return completed.stderr
+
+
+def build_import_report(module: str, output: str, top: int = 20) -> dict:
+    """
+    Собирает отчёт: суммарное время импорта и самые медленные модули по собственному
+    и по накопленному времени. Модули старта интерпретатора (site и т.п.) в топ не попадают,
+    если модуль найден в дереве.
+    """
+    roots = parse_importtime(output)
+    target = next((record for record in flatten(roots) if record.module == module), None)
+    records = flatten([target] if target else roots)
+    return {
+        "module": module,
+        "total_ms": round(sum(record.cumulative_us for record in roots) / 1000, 3),
+        "module_ms": round(target.cumulative_us / 1000, 3) if target else None,
+        "modules": len(records),
+        "top_self": [r.to_dict() for r in sorted(records, key=lambda r: r.self_us, reverse=True)[:top]],
+        "top_cumulative": [r.to_dict() for r in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]],
+    }
+
+
+def format_import_report(report: dict) -> str:
+    lines = [
+        f"import {report['module']}: {report['module_ms']} ms"
+        f" (all imports {report['total_ms']} ms, {report['modules']} modules)",
+    ]
+    for title, key in (("self", "top_self"), ("cumulative", "top_cumulative")):
+        lines.append("")
+        lines.append(f"{'self ms':>10} {'cumul ms':>10}  slowest by {title}")
+        for record in report[key]:
+            lines.append(f"{record['self_ms']:>10.3f} {record['cumulative_ms']:>10.3f}  {record['module']}")
+    return "\n".join(lines)
@@ -0,0 +1,181 @@
+import asyncio
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import httpx
+
+USER_HEADER = "x-perf-user"
+
+
+@dataclass
+class Step:
+    """
+    Запрос сценария. json может быть функцией (user, run) -> тело запроса: так у каждого виртуального
+    пользователя и запуска сценария свои данные; run одинаков для всех шагов одного запуска.
+    """
+
+    method: str
+    path: str
+    params: dict[str, Any] = field(default_factory=dict)
+    json: Any = None
+    expect: tuple[int, ...] = (200,)
+
+    def body(self, user: int, run: int) -> Any:
+        return self.json(user, run) if callable(self.json) else self.json
+
+
+@dataclass
+class Scenario:
+    """
+    Сценарий — последовательность запросов одного виртуального пользователя.
+
+    Задержка сценария считается от запланированного момента старта до ответа на последний шаг,
+    поэтому в неё входит и ожидание в очереди, если сервис не успевает за целевым RPS.
+    """
+
+    name: str
+    steps: list[Step]
+    weight: float = 1.0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Scenario":
+        steps = [
+            Step(
+                method=step.get("method", "GET").upper(),
+                path=step["path"],
+                params=step.get("params", {}),
+                json=step.get("json"),
+                expect=tuple(step.get("expect", (200,))),
+            )
+            for step in data["steps"]
+        ]
+        return cls(name=data["name"], steps=steps, weight=data.get("weight", 1.0))
+
+
+@dataclass
+class ScenarioStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    error_kinds: Counter = field(default_factory=Counter)
+
+    def merge(self, other: "ScenarioStats"):
+        self.latencies.extend(other.latencies)
+        self.errors += other.errors
+        self.statuses.update(other.statuses)
+        self.error_kinds.update(other.error_kinds)
+
+
+@dataclass
+class RunResult:
+    scenarios: dict[str, ScenarioStats]
+    elapsed: float
+    scheduled: int
+    peak_in_flight: int
+
+
+def percentile(sorted_values: list[float], q: float) -> Optional[float]:
+    """
+    Перцентиль по ближайшему рангу.
+    """
+    if not sorted_values:
+        return None
+    rank = min(max(math.ceil(q * len(sorted_values)) - 1, 0), len(sorted_values) - 1)
+    return sorted_values[rank]
+
+
+class LoadGenerator:
+    """
+    Генератор нагрузки с открытой моделью: сценарии запускаются по расписанию с частотой rps
+    независимо от того, успел ли сервис ответить на предыдущие.
+
+    Сценарий для очередного запуска выбирается случайно по весам, виртуальный пользователь — по кругу
+    из users (его номер уходит в заголовке X-Perf-User). Одновременно выполняется не больше
+    max_in_flight сценариев; запуски сверх этого ждут и учитывают ожидание в задержке.
+    Запуски первых warmup секунд в статистику не попадают.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        scenarios: list[Scenario],
+        rps: float,
+        duration: float,
+        warmup: float = 0.0,
+        users: int = 10,
+        max_in_flight: int = 256,
+        seed: int = 0,
+    ):
+        if not scenarios:
+            raise ValueError("At least one scenario is required")
+        self.client = client
+        self.scenarios = scenarios
+        self.rps = rps
+        self.duration = duration
+        self.warmup = warmup
+        self.users = users
+        self.max_in_flight = max_in_flight
+        self._rng = random.Random(seed)
+        self._weights = [scenario.weight for scenario in scenarios]
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    async def _run_scenario(
+        self, scenario: Scenario, user: int, run: int, scheduled: float, stats: Optional[ScenarioStats]
+    ):
+        statuses = []
+        error = None
+        async with self._semaphore:
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            try:
+                for step in scenario.steps:
+                    response = await self.client.request(
+                        step.method,
+                        step.path,
+                        params=step.params,
+                        json=step.body(user, run),
+                        headers={USER_HEADER: str(user)},
+                    )
+                    statuses.append(str(response.status_code))
+                    if response.status_code not in step.expect:
+                        error = f"status_{response.status_code}"
+                        break
+            except Exception as e:
+                error = type(e).__name__
+            finally:
+                self._in_flight -= 1
+        latency = time.perf_counter() - scheduled
+        if stats is None:
+            return
+        stats.latencies.append(latency)
+        stats.statuses.update(statuses)
+        if error is not None:
+            stats.errors += 1
+            stats.error_kinds[error] += 1
+
+    async def run(self) -> RunResult:
+        measured = {scenario.name: ScenarioStats() for scenario in self.scenarios}
+        tasks = set()
+        total = int((self.warmup + self.duration) * self.rps)
+        started = time.perf_counter()
+        measure_from = started + self.warmup
+        for i in range(total):
+            scheduled = started + i / self.rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            scenario = self._rng.choices(self.scenarios, self._weights)[0]
+            stats = measured[scenario.name] if scheduled >= measure_from else None
+            task = asyncio.create_task(self._run_scenario(scenario, i % self.users + 1, i, scheduled, stats))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - measure_from
+        return RunResult(measured, elapsed, total, self._peak_in_flight)
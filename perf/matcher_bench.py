@@ -0,0 +1,130 @@
+import platform
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from ss.metrics.matcher import EndpointMatcher, EndpointRule
+
+
+@dataclass
+class MatcherOptions:
+    rules: int = 500
+    paths: int = 2_000
+    lookups: int = 200_000
+    miss_ratio: float = 0.2  # доля путей, не подходящих ни под одно правило
+    prefix_only: bool = False  # только prefix-правила: одно префиксное дерево без разрывов
+    seed: int = 0
+
+
+def generate_rules(count: int, prefix_only: bool = False) -> list[EndpointRule]:
+    """
+    Правила, похожие на ENDPOINT_RULES: в основном префиксы разделов API, каждое десятое — contains,
+    каждое двадцать пятое — regex (кроме prefix_only).
+    """
+    rules = []
+    for i in range(count):
+        if prefix_only:
+            rules.append(EndpointRule("prefix", f"/api/v1/section{i}/", f"section_{i}"))
+        elif i % 25 == 24:
+            rules.append(EndpointRule("regex", rf"/api/v2/report{i}/\d+", f"report_{i}"))
+        elif i % 10 == 9:
+            rules.append(EndpointRule("contains", f"/explore{i}/", f"explore_{i}"))
+        else:
+            rules.append(EndpointRule("prefix", f"/api/v1/section{i}/", f"section_{i}"))
+    return rules
+
+
+def generate_paths(rules: list[EndpointRule], count: int, miss_ratio: float, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    paths = []
+    for n in range(count):
+        if rng.random() < miss_ratio:
+            paths.append(f"/api/v1/unknown/{n}")
+            continue
+        rule = rng.choice(rules)
+        if rule.kind == "regex":
+            paths.append(rule.pattern.replace(r"\d+", str(n)))
+        elif rule.kind == "contains":
+            paths.append(f"/api/v1/charts{rule.pattern}{n}")
+        else:
+            paths.append(f"{rule.pattern}{n}")
+    return paths
+
+
+def linear_matcher(rules: list[EndpointRule]) -> Callable[[str], Optional[str]]:
+    """
+    Прежний способ: список (предикат, метка), предикаты проверяются по порядку до первого совпадения.
+    """
+    predicates = []
+    for rule in rules:
+        if rule.kind == "prefix":
+            predicates.append((lambda path, pattern=rule.pattern: path.startswith(pattern), rule.label))
+        elif rule.kind == "contains":
+            predicates.append((lambda path, pattern=rule.pattern: pattern in path, rule.label))
+        else:
+            predicates.append((lambda path, regex=re.compile(rule.pattern): regex.match(path), rule.label))
+
+    def match(path: str) -> Optional[str]:
+        for predicate, label in predicates:
+            if predicate(path):
+                return label
+        return None
+
+    return match
+
+
+def run_matcher(options: MatcherOptions) -> dict:
+    """
+    Сравнивает время определения метки пути: перебор правил (linear) и EndpointMatcher (compiled).
+
+    contains- и regex-правила между префиксами разрывают префиксное дерево EndpointMatcher
+    на части; prefix_only показывает случай одного дерева. Перед замером проверяется, что оба способа дают одинаковые метки на всех путях (agree).
+
+    Returns:
+        Отчёт: meta и results (ключ — способ).
+    """
+    rules = generate_rules(options.rules, options.prefix_only)
+    paths = generate_paths(rules, options.paths, options.miss_ratio, options.seed)
+    matchers = {"linear": linear_matcher(rules), "compiled": EndpointMatcher(rules).match}
+    expected = [matchers["linear"](path) for path in paths]
+    results = {}
+    for name, match in matchers.items():
+        agree = [match(path) for path in paths] == expected
+        started = time.perf_counter()
+        for i in range(options.lookups):
+            match(paths[i % len(paths)])
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            "ns_per_lookup": round(elapsed / options.lookups * 1e9, 1),
+            "lookups_per_second": round(options.lookups / elapsed) if elapsed else None,
+            "agree": agree,
+        }
+
+    return {
+        "meta": {
+            "rules": options.rules,
+            "paths": options.paths,
+            "lookups": options.lookups,
+            "miss_ratio": options.miss_ratio,
+            "prefix_only": options.prefix_only,
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+
+
+def format_matcher(report: dict, baseline: Optional[str] = "linear") -> str:
+    meta = report["meta"]
+    lines = [
+        f"{meta['rules']} {'prefix ' if meta['prefix_only'] else ''}rules, {meta['paths']} paths, {meta['lookups']} lookups, {meta['miss_ratio']:.0%} misses",
+        f"{'matcher':<9} {'ns/lookup':>10} {'speedup':>8} agree",
+    ]
+    reference = report["results"].get(baseline, {}).get("ns_per_lookup")
+    for name, result in report["results"].items():
+        speedup = (
+            f"{reference / result['ns_per_lookup']:>7.1f}x" if reference and result["ns_per_lookup"] else f"{'-':>8}"
+        )
+        lines.append(f"{name:<9} {result['ns_per_lookup']:>10.1f} {speedup} {result['agree']}")
+    return "\n".join(lines)
@@ -0,0 +1,187 @@
+import platform
+import time
+from dataclasses import dataclass
+
+import starlette
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Match
+from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+from starlette.types import ASGIApp
+
+from monitoring.middleware import PrometheusMiddleware, http_metrics
+from perf.loadgen import percentile
+from ss.metrics.labels import LabelBudget
+
+MIDDLEWARE_VARIANTS = ("none", "base_http", "asgi")
+
+
+@dataclass
+class MiddlewareOptions:
+    routes: int = 50  # маршрутов /api/v1/resource{i}/{item_id}; запросы идут к последним
+    paths: int = 100  # разных путей в запросах
+    requests: int = 20_000
+    warmup: int = 1_000
+    variants: tuple[str, ...] = MIDDLEWARE_VARIANTS
+
+
+class BaseHttpPrometheusMiddleware(BaseHTTPMiddleware):
+    """
+    Прежняя реализация PrometheusMiddleware на BaseHTTPMiddleware: перебор маршрутов на каждый запрос.
+
+    Оставлена только как точка отсчёта для бенчмарка; пишет в те же метрики.
+    """
+
+    def __init__(
+        self, app: ASGIApp, allowed_prefixes: tuple[str] = ("/api/v1",), filter_unhandled_paths: bool = False
+    ) -> None:
+        super().__init__(app)
+        self.metrics = http_metrics()
+        self.filter_unhandled_paths = filter_unhandled_paths
+        self.allowed_prefixes = allowed_prefixes
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        method = request.method
+        path_template, is_handled_path = self._get_path_template(request)
+
+        if not any(path_template.startswith(api_prefix) for api_prefix in self.allowed_prefixes):
+            return await call_next(request)
+
+        if self.filter_unhandled_paths and not is_handled_path:
+            return await call_next(request)
+
+        metrics = self.metrics
+        metrics.in_progress.labels(method, path_template).inc()
+        metrics.requests.labels(method, path_template).inc()
+        start_time = time.perf_counter()
+
+        status_code = HTTP_500_INTERNAL_SERVER_ERROR
+
+        try:
+            response = await call_next(request)
+        except Exception as exc:
+            metrics.exceptions.labels(method, path_template, type(exc).__name__).inc()
+            raise exc from None
+        else:
+            status_code = response.status_code
+            duration = time.perf_counter() - start_time
+            metrics.duration.labels(method, path_template).observe(duration)
+        finally:
+            metrics.responses.labels(method, path_template, status_code).inc()
+            metrics.in_progress.labels(method, path_template).dec()
+
+        return response
+
+    @staticmethod
+    def _get_path_template(request: Request) -> tuple[str, bool]:
+        for route in request.app.routes:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                return getattr(route, "path", request.url.path), True
+        return request.url.path, False
+
+
+def build_app(variant: str, routes: int) -> FastAPI:
+    app = FastAPI()
+
+    async def endpoint(item_id: str):
+        return PlainTextResponse(item_id)
+
+    for i in range(routes):
+        app.add_api_route(f"/api/v1/resource{i}/{{item_id}}", endpoint, methods=["GET"])
+    if variant == "base_http":
+        app.add_middleware(BaseHttpPrometheusMiddleware)
+    elif variant == "asgi":
+        app.add_middleware(PrometheusMiddleware, label_budget=LabelBudget())
+    return app
+
+
+async def _request(app, path: str) -> int:
+    """
+    Один GET напрямую через ASGI, без HTTP-клиента и сокетов.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def run_middleware(options: MiddlewareOptions) -> dict:
+    """
+    Замеряет время обработки запроса приложением без middleware метрик (none), с прежней
+    реализацией на BaseHTTPMiddleware (base_http) и с ASGI PrometheusMiddleware (asgi).
+
+    Запросы идут к последним маршрутам приложения, поэтому перебор маршрутов проходит весь список.
+    overhead_us — разница медиан с вариантом none.
+
+    Returns:
+        Отчёт: meta и results (ключ — вариант).
+    """
+    last = range(max(options.routes - 5, 0), options.routes)
+    paths = [f"/api/v1/resource{last[i % len(last)]}/{i}" for i in range(options.paths)]
+    results = {}
+    for variant in options.variants:
+        app = build_app(variant, options.routes)
+        latencies = []
+        for i in range(options.warmup + options.requests):
+            started = time.perf_counter()
+            status = await _request(app, paths[i % len(paths)])
+            elapsed = time.perf_counter() - started
+            if status != 200:
+                raise RuntimeError(f"{variant}: unexpected status {status}")
+            if i >= options.warmup:
+                latencies.append(elapsed)
+        latencies.sort()
+        results[variant] = {
+            "median_us": round(percentile(latencies, 0.5) * 1e6, 2),
+            "p95_us": round(percentile(latencies, 0.95) * 1e6, 2),
+        }
+    reference = results.get("none", {}).get("median_us")
+    for result in results.values():
+        result["overhead_us"] = round(result["median_us"] - reference, 2) if reference is not None else None
+
+    return {
+        "meta": {
+            "routes": options.routes,
+            "paths": options.paths,
+            "requests": options.requests,
+            "python": platform.python_version(),
+            "starlette": starlette.__version__,
+        },
+        "results": results,
+    }
+
+
+def format_middleware(report: dict) -> str:
+    meta = report["meta"]
+    lines = [
+        f"{meta['requests']} requests, {meta['routes']} routes, {meta['paths']} paths",
+        f"{'variant':<10} {'median us':>10} {'p95 us':>9} {'overhead us':>12}",
+    ]
+    for variant, result in report["results"].items():
+        overhead = f"{result['overhead_us']:>12.1f}" if result["overhead_us"] is not None else f"{'-':>12}"
+        lines.append(f"{variant:<10} {result['median_us']:>10.1f} {result['p95_us']:>9.1f} {overhead}")
+    return "\n".join(lines)
@@ -0,0 +1,131 @@
+import json
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from perf.loadgen import RunResult, ScenarioStats, percentile
+
+TOTAL = "__total__"
+
+REPORT_QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+
+def summarize(stats: ScenarioStats, elapsed: float) -> dict:
+    latencies = sorted(stats.latencies)
+    count = len(latencies)
+    latency_ms = {
+        name: round(percentile(latencies, q) * 1000, 3) if count else None for name, q in REPORT_QUANTILES.items()
+    }
+    latency_ms["max"] = round(latencies[-1] * 1000, 3) if count else None
+    latency_ms["mean"] = round(sum(latencies) / count * 1000, 3) if count else None
+    return {
+        "count": count,
+        "errors": stats.errors,
+        "error_rate": stats.errors / count if count else 0.0,
+        "throughput_rps": count / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": latency_ms,
+        "statuses": dict(stats.statuses),
+        "error_kinds": dict(stats.error_kinds),
+    }
+
+
+def build_report(result: RunResult, meta: dict, audit: Optional[dict] = None) -> dict:
+    """
+    Собирает JSON-отчёт прогона: итог по всем сценариям (__total__) и по каждому сценарию.
+    """
+    total = ScenarioStats()
+    for stats in result.scenarios.values():
+        total.merge(stats)
+    scenarios = {name: summarize(stats, result.elapsed) for name, stats in result.scenarios.items()}
+    scenarios[TOTAL] = summarize(total, result.elapsed)
+    return {
+        "meta": {
+            **meta,
+            "elapsed": result.elapsed,
+            "scheduled": result.scheduled,
+            "peak_in_flight": result.peak_in_flight,
+        },
+        "scenarios": scenarios,
+        "audit": audit or {},
+    }
+
+
+def save_report(report: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def load_report(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+@dataclass(frozen=True)
+class Regression:
+    scenario: str
+    metric: str
+    baseline: float
+    candidate: float
+
+    def __str__(self) -> str:
+        return f"{self.scenario}: {self.metric} {self.baseline:.4g} -> {self.candidate:.4g}"
+
+
+def compare(
+    baseline: dict,
+    candidate: dict,
+    latency_tolerance: float = 0.10,
+    latency_floor_ms: float = 1.0,
+    throughput_tolerance: float = 0.05,
+    error_rate_tolerance: float = 0.01,
+) -> list[Regression]:
+    """
+    Сравнивает два отчёта и возвращает регрессии кандидата относительно базового прогона.
+
+    Задержка считается регрессией, если выросла больше чем на latency_tolerance (доля) и больше чем на
+    latency_floor_ms миллисекунд: так шум на быстрых эндпоинтах не валит сравнение. Пропускная
+    способность — если упала больше чем на throughput_tolerance, доля ошибок — если выросла больше чем
+    на error_rate_tolerance (абсолютно). Сценарии, которых нет в одном из отчётов, не сравниваются.
+
+    Args:
+        baseline: Отчёт базового прогона.
+        candidate: Отчёт проверяемого прогона.
+        latency_tolerance: Допустимый относительный рост задержки.
+        latency_floor_ms: Допустимый абсолютный рост задержки, мс.
+        throughput_tolerance: Допустимое относительное падение пропускной способности.
+        error_rate_tolerance: Допустимый абсолютный рост доли ошибок.
+
+    Returns:
+        Список регрессий; пустой — кандидат не хуже базового прогона.
+    """
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        cand = candidate["scenarios"].get(name)
+        if cand is None or not base["count"] or not cand["count"]:
+            continue
+        for metric in REPORT_QUANTILES:
+            before, after = base["latency_ms"][metric], cand["latency_ms"][metric]
+            if after > before * (1 + latency_tolerance) and after - before > latency_floor_ms:
+                regressions.append(Regression(name, f"latency_{metric}_ms", before, after))
+        before, after = base["throughput_rps"], cand["throughput_rps"]
+        if after < before * (1 - throughput_tolerance):
+            regressions.append(Regression(name, "throughput_rps", before, after))
+        before, after = base["error_rate"], cand["error_rate"]
+        if after - before > error_rate_tolerance:
+            regressions.append(Regression(name, "error_rate", before, after))
+    return regressions
+
+
+def format_report(report: dict) -> str:
+    lines = [f"{'scenario':<24} {'count':>7} {'rps':>8} {'err%':>6} {'p50':>9} {'p95':>9} {'p99':>9}"]
+    for name, s in report["scenarios"].items():
+        lat = s["latency_ms"]
+        cells = [f"{lat[q]:.1f}" if lat[q] is not None else "-" for q in REPORT_QUANTILES]
+        lines.append(
+            f"{name:<24} {s['count']:>7} {s['throughput_rps']:>8.1f} {s['error_rate'] * 100:>6.2f} "
+            + " ".join(f"{cell:>9}" for cell in cells)
+        )
+    return "\n".join(lines)
+
+
+def regressions_to_dict(regressions: list[Regression]) -> list[dict]:
+    return [asdict(regression) for regression in regressions]
@@ -0,0 +1,139 @@
+import datetime
+import enum
+import random
+from typing import Any, Callable, Iterator
+
+from core.repositories.alchemy.models import SqlThematic, SqlVoice, VoiceStatus
+from sqlalchemy import Column, Table
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from uow.bulk import BulkSaveReport, bulk_insert
+
+# Значение колонки по номеру строки; для голосов номер строки — номер записи
+ValueFactory = Callable[[int, random.Random], Any]
+
+
+def _default_value(column: Column, i: int, rng: random.Random) -> Any:
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+    if issubclass(python_type, enum.Enum):
+        members = list(python_type)
+        return members[i % len(members)]
+    if python_type is bool:
+        return True
+    if python_type is int:
+        return i
+    if python_type is float:
+        return rng.random()
+    if python_type is datetime.datetime:
+        return datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=i)
+    if python_type is datetime.date:
+        return datetime.date.today() - datetime.timedelta(days=i % 365)
+    if python_type is str:
+        # Небольшая кардинальность, чтобы фильтры по строковым полям что-то находили
+        return f"{column.name}-{i}" if column.primary_key or column.unique else f"{column.name}-{i % 97}"
+    return None
+
+
+def generate_rows(table: Table, count: int, overrides: dict[str, ValueFactory], seed: int = 0) -> Iterator[dict]:
+    """
+    Генерирует строки таблицы по её колонкам.
+
+    Значения колонок из overrides строятся их фабриками, остальные — по типу колонки.
+    Автоинкрементные первичные ключи заполняет БД.
+
+    Args:
+        table: Таблица.
+        count: Количество строк.
+        overrides: Имя колонки -> фабрика значения.
+        seed: Зерно генератора случайных чисел.
+
+    Returns:
+        Итератор словарей колонок.
+    """
+    rng = random.Random(seed)
+    columns = [
+        column
+        for column in table.columns
+        if column.name in overrides or not (column.primary_key and column.autoincrement is True)
+    ]
+    for i in range(count):
+        yield {
+            column.name: overrides[column.name](i, rng) if column.name in overrides else _default_value(column, i, rng)
+            for column in columns
+        }
+
+
+def voice_overrides(records_per_voice: int) -> dict[str, ValueFactory]:
+    """
+    Голос — несколько записей с одним voice_id; активна (is_top) последняя. Все голоса свободны.
+    """
+    return {
+        "record_id": lambda i, rng: f"record-{i}",
+        "voice_id": lambda i, rng: f"voice-{i // records_per_voice}",
+        "status": lambda i, rng: VoiceStatus.NEW,
+        "user_id": lambda i, rng: None,
+        "author_id": lambda i, rng: None,
+        "is_top": lambda i, rng: i % records_per_voice == records_per_voice - 1,
+    }
+
+
+THEMATIC_OVERRIDES: dict[str, ValueFactory] = {
+    "ext_id": lambda i, rng: f"thematic-{i}",
+    "active": lambda i, rng: True,
+    **{f"level_{level}_id": (lambda i, rng, level=level: f"l{level}-{i % (10**level)}") for level in range(1, 5)},
+    **{
+        f"level_{level}_name": (lambda i, rng, level=level: f"Уровень {level} №{i % (10**level)}")
+        for level in range(1, 5)
+    },
+}
+
+
+async def seed_table(
+    session: AsyncSession,
+    model,
+    count: int,
+    overrides: dict[str, ValueFactory],
+    seed: int = 0,
+    chunk_size: int = 10_000,
+) -> BulkSaveReport:
+    """
+    Заполняет таблицу модели count синтетическими строками (см. generate_rows).
+    """
+    table = model.__table__
+    return await bulk_insert(session, table, generate_rows(table, count, overrides, seed), chunk_size=chunk_size)
+
+
+async def seed_database(
+    url: str, voices: int = 10_000, records_per_voice: int = 2, thematics: int = 200, seed: int = 0
+) -> dict[str, BulkSaveReport]:
+    """
+    Создаёт схему и заполняет БД синтетическими голосами и тематиками.
+
+    Args:
+        url: URL базы данных (например, sqlite+aiosqlite:///perf.db).
+        voices: Количество голосов.
+        records_per_voice: Записей на один голос.
+        thematics: Количество тематик.
+        seed: Зерно генератора случайных чисел.
+
+    Returns:
+        Отчёты вставки по таблицам.
+    """
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(SqlVoice.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            reports = {
+                SqlVoice.__tablename__: await seed_table(
+                    session, SqlVoice, voices * records_per_voice, voice_overrides(records_per_voice), seed
+                ),
+                SqlThematic.__tablename__: await seed_table(session, SqlThematic, thematics, THEMATIC_OVERRIDES, seed),
+            }
+            await session.commit()
+        return reports
+    finally:
+        await engine.dispose()
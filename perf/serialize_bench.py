@@ -0,0 +1,134 @@
+import json
+import platform
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Optional
+
+import pydantic
+import sqlalchemy
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from api.v1.schemas import FilterSource
+from core.models.voice import ApiVoice
+from core.repositories.alchemy.models import UserRole
+from filters.text_search import register_sqlite_functions
+from perf.filter_suite import BenchPayload, DatasetSpec, ensure_dataset
+from perf.loadgen import percentile
+from uow.projection import dump_many_json, page_json, projection_columns
+from uow.repo import VoiceRepository
+from uow.result_cache import VoiceListCache
+from uow.thematic_catalog import ThematicCatalog
+
+SERIALIZE_PATHS = ("orm", "projection", "trusted")
+
+
+@dataclass
+class SerializeOptions:
+    database_url: str = "sqlite+aiosqlite:///perf-serialize.db"
+    dataset: DatasetSpec = field(default_factory=lambda: DatasetSpec(rows=100_000))
+    page_size: int = 500
+    pages: int = 10  # страницы подряд с начала выборки, по кругу
+    repeat: int = 50
+    warmup: int = 5
+    paths: tuple[str, ...] = SERIALIZE_PATHS
+    recreate: bool = False  # пересоздать таблицу голосов в базе без отметки perf_dataset
+
+
+async def _orm_page(repository: VoiceRepository, payload, user, limit: int, offset: int) -> bytes:
+    """
+    Прежний путь: ORM-объекты, model_validate на каждый объект и сериализация ответа, как у FastAPI.
+    """
+    voices, total = await repository.get_voices_with_paginates(payload, user, limit, offset)
+    items = [ApiVoice.model_validate(voice) for voice in voices]
+    return json.dumps(jsonable_encoder({"items": items, "total": total})).encode()
+
+
+async def _projection_page(
+    repository: VoiceRepository, payload, user, limit: int, offset: int, trusted: bool = False
+) -> bytes:
+    """
+    Путь get_voices_json: колонки проекции ApiVoice, пакетная валидация и готовые байты JSON.
+    """
+    columns = projection_columns(repository.voice_model, ApiVoice)
+    rows, total = await repository.get_voice_rows_with_paginates(payload, user, limit, offset, columns)
+    return page_json(dump_many_json(ApiVoice, rows, trusted=trusted), total)
+
+
+async def _page(path: str, repository: VoiceRepository, payload, user, limit: int, offset: int) -> bytes:
+    if path == "orm":
+        return await _orm_page(repository, payload, user, limit, offset)
+    return await _projection_page(repository, payload, user, limit, offset, trusted=path == "trusted")
+
+
+async def run_serialize(options: SerializeOptions) -> dict:
+    """
+    Сравнивает время выдачи страницы голосов: ORM + model_validate на каждый объект + jsonable_encoder
+    против проекции колонок с пакетной валидацией (projection) и без неё (trusted).
+
+    Кеш страниц выключен: каждый замер читает страницу из базы. Ответы путей сравниваются
+    после разбора JSON (agree).
+
+    Returns:
+        Отчёт: meta и results (ключ — путь).
+    """
+    payload = BenchPayload(source=FilterSource.ASSIGMENT_AREA)
+    user = SimpleNamespace(id=1, role=UserRole.ADMIN)
+    engine = create_async_engine(options.database_url)
+    register_sqlite_functions(engine)
+    results, answers, sizes = {}, {}, {}
+    try:
+        await ensure_dataset(engine, options.dataset, options.recreate)
+        for path in options.paths:
+            latencies = []
+            for i in range(options.warmup + options.repeat):
+                offset = i % options.pages * options.page_size
+                async with AsyncSession(engine) as session:
+                    repository = VoiceRepository(session, ThematicCatalog(), VoiceListCache())
+                    started = time.perf_counter()
+                    body = await _page(path, repository, payload, user, options.page_size, offset)
+                    elapsed = time.perf_counter() - started
+                if i >= options.warmup:
+                    latencies.append(elapsed)
+                if offset == 0:
+                    answers[path], sizes[path] = json.loads(body), len(body)
+            latencies.sort()
+            results[path] = {
+                "median_ms": round(percentile(latencies, 0.5) * 1000, 3),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+                "bytes": sizes[path],
+            }
+        reference = next(iter(answers.values()), None)
+        for path, result in results.items():
+            result["agree"] = answers[path] == reference
+        dialect, driver = engine.dialect.name, engine.dialect.driver
+    finally:
+        await engine.dispose()
+
+    return {
+        "meta": {
+            "dialect": dialect,
+            "driver": driver,
+            "rows": options.dataset.rows,
+            "page_size": options.page_size,
+            "repeat": options.repeat,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "pydantic": pydantic.VERSION,
+        },
+        "results": results,
+    }
+
+
+def format_serialize(report: dict, baseline: Optional[str] = "orm") -> str:
+    meta = report["meta"]
+    lines = [
+        f"{meta['rows']} rows, page {meta['page_size']}, {meta['dialect']}+{meta['driver']}",
+        f"{'path':<11} {'median ms':>10} {'p95 ms':>9} {'speedup':>8} agree",
+    ]
+    reference = report["results"].get(baseline, {}).get("median_ms")
+    for path, result in report["results"].items():
+        speedup = f"{reference / result['median_ms']:>7.1f}x" if reference and result["median_ms"] else f"{'-':>8}"
+        lines.append(f"{path:<11} {result['median_ms']:>10.2f} {result['p95_ms']:>9.2f} {speedup} {result['agree']}")
+    return "\n".join(lines)
@@ -0,0 +1,144 @@
+import platform
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Optional
+
+import numpy as np
+import sqlalchemy
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.repositories.alchemy.models import SqlVoice, UserRole
+from filters.strategy import FilterStrategy
+from filters.text_search import register_sqlite_functions
+from filters.vectorized import ColumnarSnapshot, NumpyFilterEngine
+from perf.filter_suite import BenchFilterEngine, DatasetSpec, FilterCase, default_catalog, ensure_dataset
+from perf.loadgen import percentile
+
+
+@dataclass
+class VectorizedOptions:
+    database_url: str = "sqlite+aiosqlite:///perf-vectorized.db"
+    dataset: DatasetSpec = field(default_factory=lambda: DatasetSpec(rows=100_000))
+    only: Optional[str] = None  # подстрока имени формы
+    repeat: int = 20
+    warmup: int = 2
+    recreate: bool = False  # пересоздать таблицу голосов в базе без отметки perf_dataset
+
+
+class BenchNumpyFilterEngine(NumpyFilterEngine):
+    """
+    NumpyFilterEngine с отключаемыми системными условиями, как BenchFilterEngine.
+    """
+
+    def __init__(self, *args, top: bool = True, deep_search: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.top = top
+        self.deep_search = deep_search
+
+    def _top_filter(self, snapshot: ColumnarSnapshot) -> np.ndarray:
+        return super()._top_filter(snapshot) if self.top else snapshot.all()
+
+    def _deep_search(self, snapshot: ColumnarSnapshot) -> np.ndarray:
+        return super()._deep_search(snapshot) if self.deep_search else snapshot.all()
+
+
+def _timings(latencies: list[float]) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "median_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+    }
+
+
+async def run_vectorized(options: VectorizedOptions, catalog: Optional[list[FilterCase]] = None) -> dict:
+    """
+    Сравнивает задержку одного запроса по фильтру: SQL (SqlAlchemyFilterEngine, первичные ключи всех
+    подходящих строк) и NumPy (NumpyFilterEngine по снимку той же таблицы).
+
+    Формы с операторами, которых нет у NumpyFilterEngine (match), пропускаются. Время построения
+    снимка считается отдельно: снимок строится один раз и переиспользуется между запросами.
+
+    Returns:
+        Отчёт: meta, results (ключ — имя формы) и skipped.
+    """
+    catalog = catalog if catalog is not None else default_catalog(options.dataset)
+    operators = set(NumpyFilterEngine(SqlVoice.FILTER_WHITE_LIST).operator_map)
+    table = SqlVoice.__table__
+    pk = table.primary_key.columns.values()[0]
+    engine = create_async_engine(options.database_url)
+    register_sqlite_functions(engine)
+    results, skipped = {}, []
+    try:
+        await ensure_dataset(engine, options.dataset, options.recreate)
+        async with engine.connect() as connection:
+            started = time.perf_counter()
+            rows = (await connection.execute(select(table))).mappings().all()
+            snapshot = ColumnarSnapshot.from_rows([dict(row) for row in rows], table.columns.keys())
+            snapshot_seconds = time.perf_counter() - started
+
+            for case in catalog:
+                if options.only and options.only not in case.name:
+                    continue
+                ops = {condition.op for condition in (*case.payload.and_, *case.payload.or_)}
+                if not ops <= operators:
+                    skipped.append(case.name)
+                    continue
+                system_filters = {"top": case.top, "deep_search": case.deep_search}
+                sql_engine = BenchFilterEngine(
+                    SqlVoice, SqlVoice.FILTER_WHITE_LIST, strategy_selector=None, **system_filters
+                )
+                numpy_engine = BenchNumpyFilterEngine(SqlVoice.FILTER_WHITE_LIST, **system_filters)
+                user = SimpleNamespace(id=1, role=UserRole[case.role])
+                stmt = sql_engine.apply(case.payload, user, base_stmt=select(pk), strategy=FilterStrategy.INLINE)
+                sql_latencies, numpy_latencies = [], []
+                for i in range(options.warmup + options.repeat):
+                    started = time.perf_counter()
+                    sql_ids = (await connection.execute(stmt)).scalars().all()
+                    sql_elapsed = time.perf_counter() - started
+                    started = time.perf_counter()
+                    indices = numpy_engine.apply(snapshot, case.payload, user)
+                    numpy_elapsed = time.perf_counter() - started
+                    if i >= options.warmup:
+                        sql_latencies.append(sql_elapsed)
+                        numpy_latencies.append(numpy_elapsed)
+                numpy_ids = snapshot.values[pk.key][indices]
+                results[case.name] = {
+                    "rows": len(sql_ids),
+                    "agree": sorted(sql_ids) == sorted(np.asarray(numpy_ids).tolist()),
+                    "sql": _timings(sql_latencies),
+                    "numpy": _timings(numpy_latencies),
+                }
+        dialect = engine.dialect.name
+    finally:
+        await engine.dispose()
+
+    return {
+        "meta": {
+            "dialect": dialect,
+            "dataset": options.dataset.__dict__,
+            "snapshot_ms": round(snapshot_seconds * 1000, 3),
+            "repeat": options.repeat,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sqlalchemy": sqlalchemy.__version__,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def format_vectorized(report: dict) -> str:
+    lines = [
+        f"snapshot of {report['meta']['dataset']['rows']} rows built in {report['meta']['snapshot_ms']:.1f}ms",
+        f"{'case':<64} {'rows':>8} {'sql ms':>9} {'numpy ms':>9} {'speedup':>8}  agree",
+    ]
+    for name, result in report["results"].items():
+        sql, vectorized = result["sql"]["median_ms"], result["numpy"]["median_ms"]
+        speedup = sql / vectorized if vectorized else float("inf")
+        lines.append(
+            f"{name:<64} {result['rows']:>8} {sql:>9.2f} {vectorized:>9.2f} {speedup:>7.1f}x  "
+            f"{'yes' if result['agree'] else 'NO'}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,47 @@
+"""
+Аудит событий.
+
+Публичные имена загружаются лениво при первом обращении (PEP 562): `from ss.audit import audit_event`
+не тянет pydantic, jinja2 и транспорт, пока задекорированная функция не вызвана. Транспорт
+регистрируется явно через init() при старте приложения.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "audit_event": "ss.audit.decorators",
+    "emit_audit_event_async": "ss.audit.emitters",
+    "emit_audit_event_sync": "ss.audit.emitters",
+    "emit_audit_catalog_async": "ss.audit.emitters",
+    "emit_audit_catalog_sync": "ss.audit.emitters",
+    "AuditEventClass": "ss.audit.audit_types",
+    "BaseEventType": "ss.audit.event_types",
+    "EventTypeRegistry": "ss.audit.event_types",
+    "BaseAuditTransport": "ss.audit.transport",
+    "FluentAuditTransport": "ss.audit.transport",
+    "KafkaAuditTransport": "ss.audit.transport",
+}
+
+__all__ = ["init", *_EXPORTS]
+
+
+def init(transport_cls=None):
+    """
+    Регистрирует транспорт аудита; без аргумента — FluentAuditTransport.
+    """
+    from ss.audit import transport
+
+    transport.init(transport_cls or transport.FluentAuditTransport)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,10 +1,19 @@
 import inspect
-from functools import wraps
+from functools import lru_cache, wraps
 
-from ss.audit.audit_types import AuditEventClass
-from ss.audit.emitters import emit_audit_event_async, emit_audit_event_sync
-from ss.audit.event_types import EventTypeRegistry
-from ss.audit.utils import make_audit_context
+
+@lru_cache(maxsize=None)
+def _audit():
+    # Модели аудита (pydantic), шаблоны (jinja2), DI и транспорт загружаются при первом вызове
+    # задекорированной функции, а не при импорте модуля с обработчиками
+    from ss.audit import emitters
+    from ss.audit.audit_types import AuditEventClass
+    from ss.audit.event_types import EventTypeRegistry
+    from ss.audit.transport import ensure_initialized
+    from ss.audit.utils import make_audit_context
+
+    ensure_initialized()
+    return AuditEventClass, EventTypeRegistry, make_audit_context, emitters
 
 
 def audit_event(event_type_str: str):
@@ -13,32 +22,34 @@ def audit_event(event_type_str: str):
 
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
+            AuditEventClass, EventTypeRegistry, make_audit_context, emitters = _audit()
             event_type = EventTypeRegistry.get_by_title(event_type_str)
             if event_type is None:
                 return await func(*args, **kwargs)
             context = make_audit_context()
             try:
-                await emit_audit_event_async(AuditEventClass.START, event_type, context)
+                await emitters.emit_audit_event_async(AuditEventClass.START, event_type, context)
                 result = await func(*args, **kwargs)
-                await emit_audit_event_async(AuditEventClass.SUCCESS, event_type, context)
+                await emitters.emit_audit_event_async(AuditEventClass.SUCCESS, event_type, context)
                 return result
             except Exception as e:
-                await emit_audit_event_async(AuditEventClass.FAILURE, event_type, context, error=e)
+                await emitters.emit_audit_event_async(AuditEventClass.FAILURE, event_type, context, error=e)
                 raise
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
+            AuditEventClass, EventTypeRegistry, make_audit_context, emitters = _audit()
             event_type = EventTypeRegistry.get_by_title(event_type_str)
             if event_type is None:
                 return func(*args, **kwargs)
             context = make_audit_context()
             try:
-                emit_audit_event_sync(AuditEventClass.START, event_type, context)
+                emitters.emit_audit_event_sync(AuditEventClass.START, event_type, context)
                 result = func(*args, **kwargs)
-                emit_audit_event_sync(AuditEventClass.SUCCESS, context)
+                emitters.emit_audit_event_sync(AuditEventClass.SUCCESS, event_type, context)
                 return result
             except Exception as e:
-                emit_audit_event_sync(AuditEventClass.FAILURE, context, error=e)
+                emitters.emit_audit_event_sync(AuditEventClass.FAILURE, event_type, context, error=e)
                 raise
 
         return async_wrapper if is_async else sync_wrapper
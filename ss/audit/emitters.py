@@ -3,6 +3,7 @@ import json
 import os
 from typing import Iterable, Generator, TypeVar, Type
 
+from monitoring.profiler import profile_span
 from ss.audit.audit_types import AuditEventClass, AuditContext
 from ss.audit.event_types import EventTypeRegistry, BaseEventType
 from ss.audit.transport import BaseAuditTransport
@@ -74,7 +75,8 @@ async def emit_audit_event_async(
 
     audit_message = make_audit_event(event_class, event_type_class, audit_context, error)
 
-    await transport.send_async(audit_message, host=audit_fluent_host, port=audit_fluent_port)
+    with profile_span("audit"):
+        await transport.send_async(audit_message, host=audit_fluent_host, port=audit_fluent_port)
 
 
 @inject
@@ -91,4 +93,5 @@ def emit_audit_event_sync(
 
     audit_message = make_audit_event(event_class, event_type_class, audit_context, error)
 
-    transport.send_sync(audit_message, host=audit_fluent_host, port=audit_fluent_port)
+    with profile_span("audit"):
+        transport.send_sync(audit_message, host=audit_fluent_host, port=audit_fluent_port)
@@ -3,13 +3,16 @@ from __future__ import annotations
 import os
 import uuid
 from dataclasses import dataclass, field
-from typing import Any, Type, Optional
-
-from jinja2 import Template
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Type, Optional
 
 # from conf.ss import AUDIT_SOURCE_NAME
 # from core.utils.helpers import EnvDict
-from ss.audit.audit_types import AuditEventClass, EventObject
+
+if TYPE_CHECKING:
+    from jinja2 import Template
+
+    from ss.audit.audit_types import EventObject
 
 AUDIT_SOURCE_NAME = "TEST_AUDIT"
 
@@ -22,6 +25,14 @@ class EnvDict(dict):
         raise NotImplementedError()
 
 
+@lru_cache(maxsize=256)
+def _template(source: str) -> Template:
+    # jinja2 загружается при первом рендере; шаблоны типов событий компилируются один раз
+    from jinja2 import Template
+
+    return Template(source)
+
+
 class EventTypeRegistry:
     __EVENTS: list[Type[BaseEventType]] = []
     __EVENTS_BY_TITLE: dict[str, Type[BaseEventType]] = {}
@@ -76,7 +87,7 @@ class BaseEventType:
         EventTypeRegistry.registry(cls)
 
     def _render(self, tpl: str) -> str:
-        return Template(tpl).render(
+        return _template(tpl).render(
             this=self,
             error=self.error,
             env=EnvDict(),
@@ -92,6 +103,8 @@ class BaseEventType:
 
     @property
     def object(self) -> EventObject:
+        from ss.audit.audit_types import EventObject
+
         return EventObject(
             id=self.pk,
             name=self.name,
@@ -103,6 +116,8 @@ class BaseEventType:
 
     @classmethod
     def audit_admin_message(cls):
+        from ss.audit.audit_types import AuditEventClass
+
         return {
             "code": cls.code,
             "type": cls.type,
@@ -1,5 +1,6 @@
 import asyncio
 
+from ss.audit import init
 from ss.audit.emitters import emit_audit_catalog_sync, emit_audit_catalog_async
 
 
@@ -8,5 +9,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    init()
     # emit_audit_catalog_sync()
     asyncio.run(main())
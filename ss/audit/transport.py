@@ -60,4 +60,20 @@ class KafkaAuditTransport(BaseAuditTransport):
         pass
 
 
-container.bind(BaseAuditTransport, FluentAuditTransport)
+def init(transport_cls: type[BaseAuditTransport] = FluentAuditTransport):
+    """
+    Регистрирует транспорт аудита в DI-контейнере; вызывается при старте приложения.
+
+    Args:
+        transport_cls: Класс транспорта, который получат эмиттеры.
+    """
+    container.bind(BaseAuditTransport, transport_cls)
+    container.clear_cache()
+
+
+def ensure_initialized():
+    """
+    Регистрирует транспорт по умолчанию, если init() ещё не вызывали.
+    """
+    if not container.is_bound(BaseAuditTransport):
+        init()
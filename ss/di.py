@@ -27,6 +27,9 @@ class Container:
     def bind(self, type_, cls_):
         self._bind[type_] = cls_
 
+    def is_bound(self, type_) -> bool:
+        return type_ in self._bind
+
     def override(self, target_func, replacement):
         self._cache.pop(target_func, None)
 
@@ -0,0 +1,67 @@
+import re
+import threading
+
+from prometheus_client import Counter
+
+OVERFLOW_LABEL = "__other__"
+ID_PLACEHOLDER = "{id}"
+
+LABEL_VALUES_REJECTED = Counter(
+    "metric_label_values_rejected_total",
+    "Label values replaced with the overflow bucket because the metric hit its series budget",
+    ["metric", "label"],
+)
+
+# Сегменты пути, похожие на идентификаторы: числа, UUID, длинные hex-строки и токены
+_ID_SEGMENT = re.compile(
+    r"^(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,}"
+    r"|[A-Za-z0-9_-]{32,})$"
+)
+
+
+def normalize_path(path: str) -> str:
+    """
+    Заменяет сегменты пути, похожие на идентификаторы, на {id}: /voices/42 -> /voices/{id}.
+    """
+    return "/".join(ID_PLACEHOLDER if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+class LabelBudget:
+    """
+    Ограничивает количество различных значений метки у метрики.
+
+    Пока бюджет метрики не исчерпан, значения пропускаются как есть; новые значения сверх бюджета
+    заменяются на «__other__» и учитываются в metric_label_values_rejected_total. Уже виденные
+    значения продолжают пропускаться.
+    """
+
+    def __init__(self, max_values: int = 200, overrides: dict[str, int] | None = None):
+        self.max_values = max_values
+        self.overrides = dict(overrides or {})
+        self._seen: dict[tuple[str, str], set[str]] = {}
+        self._lock = threading.Lock()
+
+    def limit(self, metric: str, label: str, value: str) -> str:
+        seen = self._seen.get((metric, label))
+        if seen is not None and value in seen:
+            return value
+        with self._lock:
+            seen = self._seen.setdefault((metric, label), set())
+            if value in seen or len(seen) < self.overrides.get(metric, self.max_values):
+                seen.add(value)
+                return value
+        LABEL_VALUES_REJECTED.labels(metric, label).inc()
+        return OVERFLOW_LABEL
+
+    def path(self, metric: str, path: str, label: str = "path_template") -> str:
+        """
+        Нормализует путь и пропускает его через бюджет метрики.
+        """
+        return self.limit(metric, label, normalize_path(path))
+
+    def reset(self):
+        with self._lock:
+            self._seen.clear()
+
+
+label_budget = LabelBudget()
@@ -0,0 +1,91 @@
+import re
+from dataclasses import dataclass
+from typing import Iterable, Literal
+
+
+@dataclass(frozen=True)
+class EndpointRule:
+    """
+    Правило сопоставления пути с меткой эндпоинта.
+
+    kind: prefix — путь начинается с pattern; contains — путь содержит pattern;
+    regex — регулярное выражение pattern совпадает с началом пути.
+    """
+
+    kind: Literal["prefix", "contains", "regex"]
+    pattern: str
+    label: str
+
+    def to_regex(self) -> str:
+        if self.kind == "prefix":
+            return re.escape(self.pattern)
+        if self.kind == "contains":
+            return ".*?" + re.escape(self.pattern)
+        if self.kind == "regex":
+            return f"(?:{self.pattern})"
+        raise ValueError(f"Unknown endpoint rule kind: {self.kind}")
+
+
+ENDPOINT_RULES: list[EndpointRule] = [
+    EndpointRule("prefix", "/api/v1/dashboard/", "dashboard"),
+    EndpointRule("prefix", "/api/v1/chart/", "chart"),
+    EndpointRule("prefix", "/api/v1/slice/", "slice"),
+    EndpointRule("contains", "/explore/", "explore"),
+]
+
+
+class EndpointMatcher:
+    """
+    Сопоставляет путь с правилами одним проходом скомпилированного регулярного выражения.
+
+    Каждое правило заканчивается именованной группой r<номер>, по lastgroup определяется метка.
+    Подряд идущие prefix-правила сворачиваются в префиксное дерево, поэтому общие части путей
+    проверяются один раз. Выигрывает первое подходящее правило, как при переборе списка:
+    префикс, перекрытый более ранним коротким префиксом, недостижим и отбрасывается.
+    """
+
+    def __init__(self, rules: Iterable[EndpointRule]):
+        self.rules = list(rules)
+        self._labels = {f"r{i}": rule.label for i, rule in enumerate(self.rules)}
+        alternatives = []
+        trie = None
+        for i, rule in enumerate(self.rules):
+            if rule.kind == "prefix":
+                trie = trie if trie is not None else {}
+                self._insert(trie, rule.pattern, f"r{i}")
+                continue
+            if trie is not None:
+                alternatives.append(self._trie_regex(trie))
+                trie = None
+            alternatives.append(f"{rule.to_regex()}(?P<r{i}>)")
+        if trie is not None:
+            alternatives.append(self._trie_regex(trie))
+        self._regex = re.compile("|".join(alternatives), re.DOTALL) if alternatives else None
+
+    @staticmethod
+    def _insert(trie: dict, prefix: str, group: str):
+        node = trie
+        for char in prefix:
+            if "" in node:
+                return
+            node = node.setdefault(char, {})
+        if "" not in node:
+            node[""] = group
+
+    @classmethod
+    def _trie_regex(cls, node: dict) -> str:
+        # Более длинные продолжения проверяются раньше конца узла: они попали в дерево только
+        # если их правило стоит в списке раньше, чем правило, заканчивающееся в этом узле
+        parts = [re.escape(char) + cls._trie_regex(child) for char, child in node.items() if char]
+        if "" in node:
+            parts.append(f"(?P<{node['']}>)")
+        return parts[0] if len(parts) == 1 else "(?:" + "|".join(parts) + ")"
+
+    def match(self, path: str) -> str | None:
+        if self._regex is None:
+            return None
+        found = self._regex.match(path)
+        return self._labels[found.lastgroup] if found else None
+
+
+endpoint_matcher = EndpointMatcher(ENDPOINT_RULES)
@@ -1,8 +1,12 @@
 import time
-from typing import Callable
+from typing import Iterable
 
-from flask import request, Response
-from prometheus_client import Counter, Histogram, Gauge, generate_latest
+from flask import request
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, Gauge, generate_latest
+
+from monitoring.multiprocess import metrics_registry
+from ss.metrics.labels import label_budget
+from ss.metrics.matcher import ENDPOINT_RULES, EndpointMatcher, EndpointRule, endpoint_matcher  # noqa: F401
 
 # Define Prometheus metrics
 REQUESTS = Counter(
@@ -29,57 +33,96 @@ REQUESTS_IN_PROGRESS = Gauge(
     "http_requests_in_progress",
     "Number of HTTP requests in progress",
     ["method"],
+    multiprocess_mode="livesum",
 )
 
 
-ENDPOINT_MATCHER: list[tuple[Callable[[str], bool], str]] = [
-    (lambda s: s.startswith("/api/v1/dashboard/"), "dashboard"),
-    (lambda s: s.startswith("/api/v1/chart/"), "chart"),
-    (lambda s: s.startswith("/api/v1/slice/"), "slice"),
-    (lambda s: "/explore/" in s, "explore"),
-]
+def get_metric_label(path: str) -> str | None:
+    return endpoint_matcher.match(path)
+
+
+EXCEPTION_ENVIRON_KEY = "metrics.exception_type"
+
 
+class _MeasuredBody:
+    """
+    Тело ответа, которое записывает метрики при закрытии, то есть после отправки последнего байта.
+    """
 
-def get_metric_label(rule):
-    for matcher, label in ENDPOINT_MATCHER:
-        if matcher(rule):
-            return label
-        return None
+    def __init__(self, body: Iterable[bytes], on_close):
+        self._body = body
+        self._on_close = on_close
+
+    def __iter__(self):
+        return iter(self._body)
+
+    def close(self):
+        try:
+            close = getattr(self._body, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._on_close()
 
 
 class MetricsMiddleware:
-    def __init__(self, app):
+    """
+    WSGI-middleware с метриками HTTP-запросов для Flask.
+
+    Подключается поверх app.wsgi_app и отдаёт /metrics без участия Flask. Метка эндпоинта
+    определяется EndpointMatcher; запросы без метки учитываются только в http_requests_in_progress
+    и, при исключении, под нормализованным путём с ограничением LabelBudget. Длительность
+    измеряется до закрытия тела ответа.
+    """
+
+    def __init__(self, app, rules: Iterable[EndpointRule] | None = None, metrics_path: str = "/metrics"):
         self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.matcher = EndpointMatcher(rules) if rules is not None else endpoint_matcher
+        self.metrics_path = metrics_path
+        app.wsgi_app = self
+
+        @app.teardown_request
+        def remember_exception(exc):
+            # Flask сам превращает исключение в ответ 500, поэтому его тип передаётся через environ
+            if exc is not None:
+                request.environ[EXCEPTION_ENVIRON_KEY] = type(exc).__name__
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if path == self.metrics_path:
+            start_response("200 OK", [("Content-Type", CONTENT_TYPE_LATEST)])
+            return [generate_latest(metrics_registry())]
 
-        @self.app.route("/metrics")
-        def metrics():
-            return Response(generate_latest(), mimetype="text/plain")
+        method = environ.get("REQUEST_METHOD", "GET")
+        label = self.matcher.match(path)
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        if label:
+            REQUESTS.labels(method, label).inc()
+        start_time = time.perf_counter()
+        status_code = "500"
 
-        @self.app.before_request
-        def start_timer():
-            REQUESTS_IN_PROGRESS.labels(request.method).inc()
-            label = get_metric_label(request.path)
+        def start_response_wrapper(status, headers, exc_info=None):
+            nonlocal status_code
+            status_code = status.split(" ", 1)[0]
+            return start_response(status, headers, exc_info)
+
+        def finish(exception_type: str | None = None):
+            in_progress.dec()
+            exception_type = exception_type or environ.get(EXCEPTION_ENVIRON_KEY)
+            path_label = label or label_budget.path("http_requests_total", path)
+            if exception_type:
+                EXCEPTIONS.labels(method, path_label, exception_type).inc()
             if label:
-                start_time = time.perf_counter()
-                REQUESTS.labels(request.method, label).inc()
-
-                g.start_time = start_time
-                g.label = label
-
-        @self.app.after_request
-        def record_metrics(response):
-            start = getattr(request, "_start_time", None)
-            label = getattr(request, "_label", None)
-            if start and label:
-                latency = time.perf_counter() - start
-                REQUEST_LATENCY.labels(request.method, label).observe(latency)
-                RESPONSES.labels(request.method, label, str(response.status_code)).inc()
-
-            return response
-
-        @self.app.teardown_request
-        def teardown_request(exc):
-            REQUESTS_IN_PROGRESS.labels(request.method).dec()
-            if exc is not None:
-                EXCEPTIONS.labels(request.method, request.path, type(exc).__name__).inc()
-                RESPONSES.labels(request.method, request.path, 500).inc()
+                REQUEST_LATENCY.labels(method, label).observe(time.perf_counter() - start_time)
+            if label or exception_type:
+                RESPONSES.labels(method, path_label, status_code).inc()
+
+        try:
+            body = self.wsgi_app(environ, start_response_wrapper)
+        except Exception as exc:
+            status_code = "500"
+            finish(type(exc).__name__)
+            raise
+        return _MeasuredBody(body, finish)
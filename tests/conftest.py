@@ -0,0 +1,200 @@
+"""
+Локальные модели и схемы для тестов.
+
+Пакеты приложения (api, core, conf) в этом репозитории не лежат. Если они не установлены, тесты получают
+минимальные модули с теми же именами: схемы фильтра, модели голосов и тематик, настройки и алиасы
+core.repositories.* на локальные модули filters и uow. Если приложение установлено, используются его модули.
+"""
+
+import datetime
+import enum
+import importlib
+import importlib.util
+import sys
+import types
+from typing import Any, Optional
+
+
+def _module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def _alias(name: str, target: str) -> None:
+    sys.modules[name] = importlib.import_module(target)
+
+
+def _install_schemas() -> None:
+    from pydantic import BaseModel, ConfigDict, Field
+
+    class FilterSource(str, enum.Enum):
+        ASSIGMENT_AREA = "assigment_area"
+        WORK_AREA = "work_area"
+
+    class FilterCondition(BaseModel):
+        field: str
+        op: str
+        value: Any = None
+
+    class FilterPayload(BaseModel):
+        model_config = ConfigDict(populate_by_name=True)
+
+        source: FilterSource
+        and_: list[FilterCondition] = Field(default_factory=list, alias="and")
+        or_: list[FilterCondition] = Field(default_factory=list, alias="or")
+        global_order_by: Optional[str] = None
+        global_order_direction: str = "asc"
+
+    _module("api")
+    _module("api.v1")
+    _module("api.v1.schemas", FilterSource=FilterSource, FilterCondition=FilterCondition, FilterPayload=FilterPayload)
+
+
+def _install_models() -> None:
+    from pydantic import BaseModel, ConfigDict
+    from sqlalchemy import Boolean, Column, DateTime, Integer, String, true
+    from sqlalchemy.orm import declarative_base
+
+    class StatusChoices(str, enum.Enum):
+        NEW = "NEW"
+        IN_PROGRESS = "IN_PROGRESS"
+        CONFIRMED = "CONFIRMED"
+        CHANGED = "CHANGED"
+        VIEWED = "VIEWED"
+
+    class UserRole(str, enum.Enum):
+        ADMIN = "admin"
+        OPERATOR = "operator"
+
+    Base = declarative_base()
+
+    class SqlVoice(Base):
+        __tablename__ = "voice"
+
+        id = Column(Integer, primary_key=True)
+        record_id = Column(String, unique=True, nullable=False)
+        voice_id = Column(String, nullable=False, index=True)
+        name = Column(String)
+        status = Column(String, nullable=False)
+        user_id = Column(Integer)
+        author_id = Column(Integer)
+        is_top = Column(Boolean, nullable=False, default=True)
+        created_at = Column(DateTime(timezone=True))
+
+        FILTER_WHITE_LIST = ["name", "status", "user_id", "voice_id", "record_id"]
+
+        @classmethod
+        def get_record_id(cls):
+            return cls.record_id
+
+        @classmethod
+        def get_voice_id(cls):
+            return cls.voice_id
+
+        @classmethod
+        def is_active(cls):
+            return true()
+
+    class SqlThematic(Base):
+        __tablename__ = "thematic"
+
+        id = Column(Integer, primary_key=True)
+        ext_id = Column(String, unique=True, nullable=False)
+        level_1_id = Column(String)
+        level_1_name = Column(String)
+        level_2_id = Column(String)
+        level_2_name = Column(String)
+        level_3_id = Column(String)
+        level_3_name = Column(String)
+        level_4_id = Column(String)
+        level_4_name = Column(String)
+        active = Column(Boolean, nullable=False, default=True)
+        updated_at = Column(DateTime(timezone=True))
+
+        @classmethod
+        def get_ext_id(cls):
+            return cls.ext_id
+
+        @classmethod
+        def is_active(cls):
+            return cls.active.is_(True)
+
+    class ApiVoice(BaseModel):
+        model_config = ConfigDict(from_attributes=True)
+
+        id: int
+        record_id: str
+        voice_id: str
+        name: Optional[str] = None
+        status: StatusChoices
+        user_id: Optional[int] = None
+        author_id: Optional[int] = None
+        is_top: bool
+        created_at: Optional[datetime.datetime] = None
+
+    class ApiThematic(BaseModel):
+        model_config = ConfigDict(from_attributes=True)
+
+        ext_id: str
+        level_1_name: Optional[str] = None
+        level_2_name: Optional[str] = None
+        level_3_name: Optional[str] = None
+        level_4_name: Optional[str] = None
+
+    class ApiThematicLevel(BaseModel):
+        model_config = ConfigDict(from_attributes=True)
+
+        id: str
+        name: Optional[str] = None
+        thematic_id: Optional[str] = None
+
+    class BaseRepository:
+        pass
+
+    _module("core")
+    _module("core.models")
+    _module("core.models.voice", ApiVoice=ApiVoice, ApiThematic=ApiThematic, ApiThematicLevel=ApiThematicLevel)
+    _module("core.repositories")
+    _module("core.repositories.base_repository", BaseRepository=BaseRepository)
+    _module("core.repositories.alchemy")
+    _module(
+        "core.repositories.alchemy.models",
+        Base=Base,
+        StatusChoices=StatusChoices,
+        VoiceStatus=StatusChoices,
+        UserRole=UserRole,
+        SqlVoice=SqlVoice,
+        SqlThematic=SqlThematic,
+        SqlCategory=SqlThematic,
+    )
+    _module("core.repositories.alchemy.db", AsyncSessionLocal=None)
+    _module("conf")
+    _module(
+        "conf.settings",
+        settings=types.SimpleNamespace(db=types.SimpleNamespace(voice_count_for_update=1000)),
+    )
+
+
+def _install_aliases() -> None:
+    # Порядок важен: каждый модуль импортирует предыдущие по именам core.repositories.*
+    _module("core.repositories.filters")
+    for name in ("filter_config", "strategy", "text_search", "filter_engine"):
+        _alias(f"core.repositories.filters.{name}", f"filters.{name}")
+    _alias("core.repositories.alchemy.decorators", "filters.decorators")
+    _alias("core.repositories.alchemy.repository", "uow.repo")
+    _alias("core.repositories.alchemy.uow", "uow.uow")
+
+
+def _app_installed() -> bool:
+    try:
+        return importlib.util.find_spec("core.repositories.alchemy.models") is not None
+    except ModuleNotFoundError:
+        return False
+
+
+if not _app_installed() and importlib.util.find_spec("pydantic") is not None:
+    _install_schemas()
+    _install_models()
+    _install_aliases()
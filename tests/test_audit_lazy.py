@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("jinja2")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Отдельный интерпретатор: в процессе pytest pydantic и jinja2 уже могли быть импортированы
+SCRIPT = textwrap.dedent("""
+    import asyncio
+    import json
+    import os
+    import sys
+
+    from perf.fluent import FakeFluentCollector
+
+    HEAVY = ("jinja2", "pydantic")
+
+
+    def loaded():
+        return [name for name in HEAVY if name in sys.modules]
+
+
+    async def main():
+        collector = await FakeFluentCollector("127.0.0.1").start()
+        os.environ["AUDIT_FLUENT_HOST"] = "127.0.0.1"
+        os.environ["AUDIT_FLUENT_PORT"] = str(collector.port)
+
+        from ss.audit import audit_event
+
+        @audit_event("Логин")
+        async def login():
+            return 1
+
+        @audit_event("Логин")
+        def logout():
+            raise ValueError("logout")
+
+        report = {"after_import": loaded()}
+        report["result"] = await login()
+        try:
+            await asyncio.to_thread(logout)
+        except ValueError:
+            report["raised"] = True
+        report["after_call"] = loaded()
+        for _ in range(100):
+            if collector.stats()["messages"] >= 4:
+                break
+            await asyncio.sleep(0.05)
+        report["messages"] = collector.stats()["messages"]
+        await collector.stop()
+        sys.stdout.write(json.dumps(report))
+
+
+    asyncio.run(main())
+    """)
+
+
+def test_audit_loads_heavy_dependencies_on_first_call():
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.run(
+        [sys.executable, "-c", SCRIPT], env=env, cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    assert process.returncode == 0, process.stderr
+
+    report = json.loads(process.stdout)
+
+    assert report["after_import"] == []
+    assert report["after_call"] == ["jinja2", "pydantic"]
+    assert report["result"] == 1 and report["raised"]
+    # START и SUCCESS асинхронного вызова, START и FAILURE синхронного
+    assert report["messages"] == 4
@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from uow.bulk import bulk_insert
+
+pytest.importorskip("aiosqlite")
+
+metadata = MetaData()
+items = Table(
+    "items",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("code", String, unique=True, nullable=False),
+    Column("name", String),
+)
+
+
+def run(scenario, rows=()):
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(metadata.create_all)
+                if rows:
+                    await connection.execute(items.insert(), list(rows))
+            async with AsyncSession(engine) as session:
+                report = await scenario(session)
+                await session.commit()
+                stored = (await session.execute(select(items.c.code, items.c.name).order_by(items.c.code))).all()
+                return report, [tuple(row) for row in stored]
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_inserts_dicts_and_tuples_in_chunks():
+    rows = [(f"c{i}", f"n{i}") for i in range(7)]
+
+    report, stored = run(lambda session: bulk_insert(session, items, rows, columns=["code", "name"], chunk_size=3))
+
+    assert (report.total, report.saved, report.ok) == (7, 7, True)
+    assert stored == sorted(rows)
+
+
+def test_failed_chunk_is_reported_and_rolled_back_alone():
+    rows = [{"code": "a", "name": "1"}, {"code": "b", "name": "2"}, {"code": "a", "name": "3"}, {"code": "c"}]
+
+    report, stored = run(lambda session: bulk_insert(session, items, rows, chunk_size=2))
+
+    assert (report.total, report.saved) == (4, 2)
+    assert [(failure.offset, failure.size) for failure in report.failures] == [(2, 2)]
+    assert stored == [("a", "1"), ("b", "2")]
+
+
+def test_upsert_updates_existing_rows():
+    rows = [{"code": "a", "name": "new"}, {"code": "z", "name": "added"}]
+
+    report, stored = run(
+        lambda session: bulk_insert(session, items, rows, conflict_columns=["code"]),
+        rows=[{"code": "a", "name": "old"}],
+    )
+
+    assert report.ok and report.saved == 2
+    assert stored == [("a", "new"), ("z", "added")]
+
+
+def test_upsert_keeps_primary_key_of_existing_row():
+    async def scenario(session):
+        report = await bulk_insert(session, items, [{"id": 9, "code": "a", "name": "new"}], conflict_columns=["code"])
+        return report, (await session.execute(select(items.c.id, items.c.name))).all()
+
+    (report, stored_ids), stored = run(scenario, rows=[{"id": 1, "code": "a", "name": "old"}])
+
+    assert report.ok
+    assert [tuple(row) for row in stored_ids] == [(1, "new")]
+
+
+def test_tuples_require_columns():
+    with pytest.raises(ValueError):
+        run(lambda session: bulk_insert(session, items, [("a", "1")]))
+
+
+def test_upsert_on_unsupported_dialect_fails_before_inserting():
+    consumed = []
+
+    def rows():
+        consumed.append(True)
+        yield {"code": "a"}
+
+    session = SimpleNamespace(bind=SimpleNamespace(dialect=SimpleNamespace(name="mysql", driver="aiomysql")))
+    with pytest.raises(NotImplementedError, match="mysql"):
+        asyncio.run(bulk_insert(session, items, rows(), conflict_columns=["code"]))
+    assert not consumed
+
+
+def test_bulk_benchmark_reports_every_method(tmp_path):
+    pytest.importorskip("core.repositories.alchemy.models")
+    from perf.bulk_bench import BULK_METHODS, BulkOptions, format_bulk, run_bulk
+
+    options = BulkOptions(database_url=f"sqlite+aiosqlite:///{tmp_path / 'bulk.db'}", rows=50, chunk_size=20)
+
+    report = asyncio.run(run_bulk(options))
+
+    assert list(report["results"]) == list(BULK_METHODS)
+    assert all(result["rows"] == 50 and result["rows_per_second"] > 0 for result in report["results"].values())
+    assert "upsert" in format_bulk(report)
@@ -0,0 +1,51 @@
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from monitoring.db import EngineInstrumentation, instrument_engine
+
+
+class CountingInstrumentation(EngineInstrumentation):
+    def __init__(self, *args, **kwargs):
+        self.pool_events = 0
+        super().__init__(*args, **kwargs)
+
+    def _update_pool_gauges(self, *args):
+        self.pool_events += 1
+        super()._update_pool_gauges(*args)
+
+
+def _waits(name) -> float:
+    return REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", {"engine": name}) or 0
+
+
+def test_dispose_does_not_duplicate_pool_listeners(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    instrumentation = CountingInstrumentation(engine, "test_dispose")
+    try:
+        engine.dispose()
+        engine.dispose()
+        instrumentation.pool_events, waits = 0, _waits("test_dispose")
+
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+        # connect, checkout и checkin — по одному разу; ожидание соединения замерено один раз
+        assert instrumentation.pool_events == 3
+        assert _waits("test_dispose") == waits + 1
+    finally:
+        engine.dispose()
+
+
+def test_instrument_engine_is_idempotent(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    try:
+        first = instrument_engine(engine, "test_idempotent")
+        assert instrument_engine(engine, "test_idempotent") is first
+        waits = _waits("test_idempotent")
+
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+        assert _waits("test_idempotent") == waits + 1
+    finally:
+        engine.dispose()
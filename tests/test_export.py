@@ -0,0 +1,124 @@
+import asyncio
+import csv
+import datetime
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from uow.export import encode_chunks
+
+
+async def _chunks(*chunks):
+    for rows in chunks:
+        yield rows
+
+
+def _encode(fmt, *chunks, columns=()):
+    async def main():
+        return b"".join([data async for data in encode_chunks(_chunks(*chunks), fmt, columns)])
+
+    return asyncio.run(main()).decode("utf-8")
+
+
+def test_csv_writes_header_for_empty_result():
+    assert _encode("csv", columns=["id", "name"]) == "id,name\r\n"
+    assert _encode("csv", [], columns=["id", "name"]) == "id,name\r\n"
+
+
+def test_csv_keeps_column_order_and_plain_values():
+    created = datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc)
+    chunks = [{"name": "Привет, мир", "id": 1, "created_at": created}], [{"id": 2, "name": None, "created_at": None}]
+
+    data = _encode("csv", *chunks, columns=["id", "name", "created_at"])
+
+    assert list(csv.reader(io.StringIO(data))) == [
+        ["id", "name", "created_at"],
+        ["1", "Привет, мир", created.isoformat()],
+        ["2", "", ""],
+    ]
+
+
+def test_csv_requires_columns():
+    with pytest.raises(ValueError, match="column"):
+        _encode("csv", [{"id": 1}])
+
+
+def test_ndjson_writes_one_object_per_row():
+    data = _encode("ndjson", [{"id": 1, "name": "a"}], [{"id": 2, "name": "б"}])
+
+    assert [json.loads(line) for line in data.splitlines()] == [{"id": 1, "name": "a"}, {"id": 2, "name": "б"}]
+    assert _encode("ndjson") == ""
+
+
+@pytest.fixture
+def app_client(tmp_path, monkeypatch):
+    """
+    Приложение app:app на SQLite-файле с тремя голосами; пользователь — администратор.
+    """
+    pytest.importorskip("httpx")
+    pytest.importorskip("aiosqlite")
+    models = pytest.importorskip("core.repositories.alchemy.models")
+    from fastapi.testclient import TestClient
+
+    from perf.seed import generate_rows
+    from uow import di
+
+    import app as application
+
+    # Импорт приложения не создаёт движок: драйвер БД нужен только при первом запросе
+    assert di.session_factory.cache_info().currsize == 0
+
+    url = f"sqlite+aiosqlite:///{tmp_path / 'voices.db'}"
+    table = models.SqlVoice.__table__
+    overrides = {
+        "record_id": lambda i, rng: f"r{i}",
+        "voice_id": lambda i, rng: f"v{i}",
+        "status": lambda i, rng: models.VoiceStatus.NEW.value,
+        "is_top": lambda i, rng: True,
+    }
+
+    async def seed():
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        engine = create_async_engine(url)
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(table.create)
+                await connection.execute(table.insert(), list(generate_rows(table, 3, overrides)))
+        finally:
+            await engine.dispose()
+
+    asyncio.run(seed())
+    monkeypatch.setattr(di, "DATABASE_URL", url)
+    monkeypatch.setattr(di, "DATABASE_REPLICA_URLS", [])
+    di.session_factory.cache_clear()
+    admin = SimpleNamespace(id=1, role=models.UserRole.ADMIN)
+    application.app.dependency_overrides[di.get_current_user] = lambda: admin
+    try:
+        with TestClient(application.app) as client:
+            yield client, table.columns.keys()
+    finally:
+        application.app.dependency_overrides.clear()
+        di.session_factory.cache_clear()
+
+
+def _missing():
+    return {"field": "voice_id", "op": "=", "value": "missing"}
+
+
+def test_export_endpoint_streams_csv_and_ndjson(app_client):
+    client, columns = app_client
+    body = {"source": "assigment_area"}
+
+    ndjson = client.post("/voices/export", json=body)
+    empty = client.post("/voices/export", params={"format": "csv"}, json={**body, "and": [_missing()]})
+    full = client.post("/voices/export", params={"format": "csv"}, json=body)
+
+    assert ndjson.status_code == 200 and ndjson.headers["content-type"] == "application/x-ndjson"
+    assert sorted(json.loads(line)["voice_id"] for line in ndjson.text.splitlines()) == ["v0", "v1", "v2"]
+    assert empty.status_code == 200 and empty.headers["content-disposition"] == 'attachment; filename="voices.csv"'
+    assert list(csv.reader(io.StringIO(empty.text))) == [columns]
+    rows = list(csv.DictReader(io.StringIO(full.text)))
+    assert sorted(row["record_id"] for row in rows) == ["r0", "r1", "r2"]
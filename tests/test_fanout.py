@@ -0,0 +1,108 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from uow.fanout import ConcurrentReader
+
+pytest.importorskip("aiosqlite")
+
+DELAY = 0.3
+
+
+def _engine(path):
+    """
+    Движок SQLite-файла с функцией slow(seconds): засыпает в потоке соединения aiosqlite.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def register(dbapi_connection, connection_record):
+        dbapi_connection.create_function("slow", 1, lambda seconds: time.sleep(seconds) or seconds)
+
+    return engine
+
+
+async def _timed(session):
+    started = time.perf_counter()
+    await session.execute(text("SELECT slow(:seconds)"), {"seconds": DELAY})
+    return started, time.perf_counter()
+
+
+def _overlaps(intervals) -> bool:
+    return max(start for start, _ in intervals) < min(end for _, end in intervals)
+
+
+def test_queries_run_on_separate_connections_at_once(tmp_path):
+    async def main():
+        engine = _engine(tmp_path / "fanout.db")
+        try:
+            return await ConcurrentReader(engine).run(_timed, _timed)
+        finally:
+            await engine.dispose()
+
+    assert _overlaps(asyncio.run(main()))
+
+
+def test_max_concurrency_is_honoured_per_reader(tmp_path):
+    async def main():
+        engine = _engine(tmp_path / "fanout.db")
+        try:
+            wide = await ConcurrentReader(engine, max_concurrency=4).run(_timed, _timed)
+            narrow = await ConcurrentReader(engine, max_concurrency=1).run(_timed, _timed)
+            return wide, narrow
+        finally:
+            await engine.dispose()
+
+    wide, narrow = asyncio.run(main())
+
+    assert _overlaps(wide)
+    assert not _overlaps(narrow)
+
+
+def test_repository_page_and_count_overlap_and_return_plain_objects(tmp_path):
+    models = pytest.importorskip("core.repositories.alchemy.models")
+    from api.v1.schemas import FilterSource
+    from perf.seed import generate_rows, voice_overrides
+    from uow.repo import VoiceRepository
+    from uow.result_cache import VoiceListCache
+    from uow.thematic_catalog import ThematicCatalog
+
+    SqlVoice = models.SqlVoice
+    payload = SimpleNamespace(source=FilterSource.ASSIGMENT_AREA, and_=[], or_=[], global_order_by=None)
+    admin = SimpleNamespace(id=1, role=models.UserRole.ADMIN)
+    in_use, peak = [0], [0]
+
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'voices.db'}")
+
+        @event.listens_for(engine.sync_engine.pool, "checkout")
+        def checkout(*args):
+            in_use[0] += 1
+            peak[0] = max(peak[0], in_use[0])
+
+        @event.listens_for(engine.sync_engine.pool, "checkin")
+        def checkin(*args):
+            in_use[0] -= 1
+
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(SqlVoice.__table__.create)
+                rows = list(generate_rows(SqlVoice.__table__, 20, voice_overrides(2)))
+                await connection.execute(SqlVoice.__table__.insert(), rows)
+            peak[0] = 0
+            async with AsyncSession(engine) as session:
+                repository = VoiceRepository(session, ThematicCatalog(), VoiceListCache())
+                return await repository.get_voices_with_paginates(payload, admin, 5, 0)
+        finally:
+            await engine.dispose()
+
+    voices, total = asyncio.run(main())
+
+    assert total == 10 and len(voices) == 5
+    assert peak[0] == 2
+    assert not any(inspect(voice).detached for voice in voices)
+    assert {voice.voice_id for voice in voices} <= {f"voice-{i}" for i in range(10)}
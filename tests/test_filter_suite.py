@@ -0,0 +1,118 @@
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("core.repositories.alchemy.models")
+
+from sqlalchemy import Column, Integer, MetaData, Table, inspect, select  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from perf.filter_suite import (  # noqa: E402
+    DatasetSpec,
+    FilterStrategy,
+    SuiteOptions,
+    check_report,
+    default_catalog,
+    ensure_dataset,
+    run_suite,
+    seed_baseline,
+)
+
+SPEC = DatasetSpec(rows=2000)
+BASELINE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "perf/baselines/filters-sqlite.json"
+)
+
+metadata = MetaData()
+accounts = Table("accounts", metadata, Column("id", Integer, primary_key=True))
+
+
+@pytest.fixture
+def app_db(tmp_path):
+    """
+    База «приложения»: чужая таблица accounts с одной строкой и без отметки набора данных.
+    """
+    url = f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"
+
+    async def create():
+        engine = create_async_engine(url)
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(metadata.create_all)
+                await connection.execute(accounts.insert(), [{"id": 1}])
+        finally:
+            await engine.dispose()
+
+    asyncio.run(create())
+    return url
+
+
+def _run(url, scenario):
+    async def main():
+        engine = create_async_engine(url)
+        try:
+            return await scenario(engine)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def _contents(engine):
+    async with engine.connect() as connection:
+        tables = await connection.run_sync(lambda sync_connection: inspect(sync_connection).get_table_names())
+        return set(tables), (await connection.execute(select(accounts.c.id))).scalars().all()
+
+
+def test_ensure_dataset_refuses_foreign_database(app_db):
+    with pytest.raises(RuntimeError, match="perf_dataset"):
+        _run(app_db, lambda engine: ensure_dataset(engine, SPEC))
+
+    assert _run(app_db, _contents) == ({"accounts"}, [1])
+
+
+def test_ensure_dataset_recreate_replaces_only_voice_table(app_db):
+    assert _run(app_db, lambda engine: ensure_dataset(engine, SPEC, recreate=True))
+    assert not _run(app_db, lambda engine: ensure_dataset(engine, SPEC))
+
+    tables, kept = _run(app_db, _contents)
+    assert {"accounts", "perf_dataset"} <= tables and kept == [1]
+
+
+def test_catalog_varies_system_filters_and_icontains_finds_rows(tmp_path):
+    shapes = ("system_only/", "name_contains_rare/", "name_icontains/")
+    catalog = [
+        case
+        for case in default_catalog(SPEC)
+        if case.name.startswith(shapes) and "/admin/assigment_area" in case.name and "sort_" not in case.name
+    ]
+    options = SuiteOptions(database_url=f"sqlite+aiosqlite:///{tmp_path / 'perf.db'}", dataset=SPEC, repeat=1, warmup=0)
+
+    report = asyncio.run(run_suite(options, catalog))
+
+    totals = {result["case"]: result["total"] for result in report["results"].values()}
+    errors, _ = check_report(report, seed_baseline(SPEC, catalog=catalog))
+    assert not [error for error in errors if error.kind != "budget"]
+    assert totals["name_icontains/admin/assigment_area"] == totals["name_contains_rare/admin/assigment_area"] > 0
+    system = [totals[f"system_only/admin/assigment_area{suffix}"] for suffix in ("", "/all_records", "/all_time")]
+    assert max(system) < totals["system_only/admin/assigment_area/all_records_all_time"]
+    assert system[0] < min(system[1:])
+
+
+def test_stored_baseline_is_measured_on_default_dataset_within_budgets():
+    from perf.report import load_report
+
+    baseline = load_report(BASELINE)
+    catalog = {case.name: case for case in default_catalog(DatasetSpec())}
+
+    assert baseline["meta"]["dialect"] == "sqlite"
+    assert baseline["meta"]["dataset"] == DatasetSpec().__dict__
+    assert set(baseline["results"]) == {f"{name}@{strategy.value}" for name in catalog for strategy in FilterStrategy}
+    for key, result in baseline["results"].items():
+        assert result["budget_ms"] == catalog[result["case"]].budget_ms, key
+        assert result["median_ms"] <= result["budget_ms"], key
+    # Прогон, совпадающий с базовым, проверку проходит
+    errors, _ = check_report(baseline, baseline)
+    assert not errors
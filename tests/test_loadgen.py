@@ -0,0 +1,86 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from fastapi import FastAPI, Request  # noqa: E402
+
+from perf.loadgen import USER_HEADER, LoadGenerator, Scenario, Step  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_steps_of_one_run_share_user_payload():
+    app = FastAPI()
+    received = []
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        received.append((request.headers[USER_HEADER], await request.json()))
+        return {}
+
+    steps = [Step("POST", "/echo", json=lambda user, run: {"user": user, "run": run}) for _ in range(2)]
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            generator = LoadGenerator(client, [Scenario("echo", steps)], rps=200, duration=0.05, users=3)
+            return await generator.run()
+
+    result = asyncio.run(main())
+
+    assert result.scenarios["echo"].errors == 0
+    assert len(received) == 2 * result.scheduled
+    for first, second in zip(received[::2], received[1::2]):
+        assert first == second and first[0] == str(first[1]["user"])
+    assert {body["run"] for _, body in received} == set(range(result.scheduled))
+
+
+def test_user_voice_filters_do_not_overlap():
+    pytest.importorskip("api.v1.schemas")
+    from perf.harness import user_voice_filter
+
+    users = 4
+    build = user_voice_filter({"source": "all"}, voices=200, users=users, size=5)
+
+    def ids(user, run):
+        payload = build(user, run)
+        (condition,) = payload.get("and_") or payload["and"]
+        return set(condition["value"])
+
+    # Одновременные запуски разных пользователей и соседние запуски одного пользователя
+    runs = [ids(run % users + 1, run) for run in range(3 * users)]
+    assert all(len(voices) == 5 for voices in runs)
+    assert len(set().union(*runs)) == 5 * len(runs)
+    assert build(1, 0)["source"] == "all"
+
+
+def test_harness_runs_default_scenarios_against_app(tmp_path):
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("api.v1.schemas")
+    output = tmp_path / "report.json"
+    # Отдельный процесс: модули приложения читают DATABASE_URL при импорте; модели из conftest ставятся заново
+    code = "import sys, tests.conftest; from perf.__main__ import main; sys.exit(main(sys.argv[1:]))"
+    args = ["run", "--rps", "20", "--duration", "2", "--warmup", "0.5", "--voices", "200", "--role", "ADMIN"]
+    env = {name: value for name, value in os.environ.items() if not name.startswith(("DATABASE_", "PROMETHEUS_"))}
+    env["PYTHONPATH"] = ROOT
+
+    finished = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code, *args, "--output", str(output)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+    assert finished.returncode == 0, finished.stderr
+    report = json.loads(output.read_text())
+    assert set(report["scenarios"]) == {"login", "voices_page", "status_change", "__total__"}
+    assert all(scenario["errors"] == 0 for scenario in report["scenarios"].values()), report["scenarios"]
+    assert report["audit"]["messages"] > 0
@@ -0,0 +1,61 @@
+import asyncio
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+from monitoring.loop_monitor import LoopMonitor
+
+
+def _watchdogs():
+    return [thread for thread in threading.enumerate() if thread.name == "loop-monitor-watchdog"]
+
+
+def test_restart_leaves_single_watchdog(monkeypatch):
+    # Сторож первого запуска задерживается между проверками, пока монитор перезапускают
+    entered, release = threading.Event(), threading.Event()
+
+    def monotonic():
+        if threading.current_thread().name == "loop-monitor-watchdog":
+            entered.set()
+            release.wait()
+        return time.monotonic()
+
+    monkeypatch.setattr(sys.modules[LoopMonitor.__module__], "time", SimpleNamespace(monotonic=monotonic))
+    monitor = LoopMonitor(interval=0.02, block_threshold=0.02, log_stacks=False)
+
+    async def scenario():
+        monitor.start()
+        first = monitor._watchdog
+        assert await asyncio.to_thread(entered.wait, 1)
+        monitor.stop()
+        monitor.start()
+        release.set()
+        await asyncio.sleep(0.1)
+        running = _watchdogs()
+        monitor.stop()
+        return first, running
+
+    first, running = asyncio.run(scenario())
+
+    assert not first.is_alive()
+    assert len(running) == 1 and running[0] is not first
+    for thread in _watchdogs():
+        thread.join(timeout=1)
+    assert not _watchdogs()
+
+
+def test_blocking_call_is_reported_once():
+    monitor = LoopMonitor(interval=0.02, block_threshold=0.05, log_stacks=False)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.3)
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+    asyncio.run(scenario())
+
+    assert len(monitor.reports) == 1
+    assert "time.sleep(0.3)" in monitor.reports[0].stack
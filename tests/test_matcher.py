@@ -0,0 +1,77 @@
+import random
+import re
+
+import pytest
+
+from ss.metrics.matcher import ENDPOINT_RULES, EndpointMatcher, EndpointRule
+
+ALPHABET = "ab/"
+
+
+def _linear_match(rules, path):
+    """
+    Эталон: перебор правил по порядку, как до компиляции в одно выражение.
+    """
+    for rule in rules:
+        if rule.kind == "prefix" and path.startswith(rule.pattern):
+            return rule.label
+        if rule.kind == "contains" and rule.pattern in path:
+            return rule.label
+        if rule.kind == "regex" and re.match(rule.pattern, path):
+            return rule.label
+    return None
+
+
+def _random_text(rng, max_length):
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, max_length)))
+
+
+def _random_rule(rng, i):
+    kind = rng.choice(["prefix", "prefix", "contains", "regex"])
+    pattern = _random_text(rng, 4)
+    if kind == "regex":
+        pattern = re.escape(pattern) + rng.choice(["", "b+", "[ab]/", "a?"])
+    return EndpointRule(kind, pattern, f"label_{i}")
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matcher_agrees_with_linear_scan(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        rules = [_random_rule(rng, i) for i in range(rng.randint(0, 7))]
+        matcher = EndpointMatcher(rules)
+        for _ in range(20):
+            path = _random_text(rng, 7)
+            assert matcher.match(path) == _linear_match(rules, path), (rules, path)
+
+
+@pytest.mark.parametrize(
+    "path, label",
+    [
+        ("/api/v1/dashboard/42", "dashboard"),
+        ("/api/v1/chart/", "chart"),
+        ("/superset/explore/?form_data=1", "explore"),
+        ("/api/v1/dashboard", None),
+        ("/health", None),
+    ],
+)
+def test_default_rules(path, label):
+    assert EndpointMatcher(ENDPOINT_RULES).match(path) == label == _linear_match(ENDPOINT_RULES, path)
+
+
+def test_earlier_short_prefix_shadows_longer_one():
+    rules = [EndpointRule("prefix", "/api", "api"), EndpointRule("prefix", "/api/v1", "v1")]
+
+    assert EndpointMatcher(rules).match("/api/v1/x") == "api"
+    assert EndpointMatcher(list(reversed(rules))).match("/api/v1/x") == "v1"
+
+
+@pytest.mark.parametrize("prefix_only", [False, True])
+def test_matcher_benchmark_agrees_with_linear_scan(prefix_only):
+    from perf.matcher_bench import MatcherOptions, format_matcher, run_matcher
+
+    report = run_matcher(MatcherOptions(rules=300, paths=500, lookups=1000, prefix_only=prefix_only))
+
+    assert list(report["results"]) == ["linear", "compiled"]
+    assert all(result["agree"] for result in report["results"].values())
+    assert "compiled" in format_matcher(report)
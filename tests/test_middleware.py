@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from prometheus_client import REGISTRY  # noqa: E402
+
+from monitoring.middleware import PrometheusMiddleware  # noqa: E402
+from ss.metrics.labels import LabelBudget  # noqa: E402
+
+
+def _app(**options):
+    app = FastAPI()
+
+    @app.get("/api/v1/voices/{voice_id}")
+    async def voice(voice_id: str):
+        return {"id": voice_id}
+
+    @app.get("/api/v1/fail")
+    async def fail():
+        raise RuntimeError("boom")
+
+    @app.get("/health")
+    async def health():
+        return {}
+
+    app.add_middleware(PrometheusMiddleware, label_budget=LabelBudget(), **options)
+    return app
+
+
+def _middleware(app) -> PrometheusMiddleware:
+    layer = app.middleware_stack
+    while not isinstance(layer, PrometheusMiddleware):
+        layer = layer.app
+    return layer
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_paths_of_one_route_share_template_and_cache_entries():
+    app = _app()
+    before = _sample("http_requests_total", method="GET", path_template="/api/v1/voices/{voice_id}")
+
+    with TestClient(app) as client:
+        for voice_id in ("1", "2", "1"):
+            assert client.get(f"/api/v1/voices/{voice_id}").status_code == 200
+
+    middleware = _middleware(app)
+    assert _sample("http_requests_total", method="GET", path_template="/api/v1/voices/{voice_id}") - before == 3
+    assert dict(middleware._templates) == {
+        ("GET", "/api/v1/voices/1"): ("/api/v1/voices/{voice_id}", True),
+        ("GET", "/api/v1/voices/2"): ("/api/v1/voices/{voice_id}", True),
+    }
+
+
+def test_template_cache_is_bounded_lru():
+    app = _app(template_cache_size=2)
+
+    with TestClient(app) as client:
+        for voice_id in ("1", "2", "1", "3"):
+            client.get(f"/api/v1/voices/{voice_id}")
+
+    assert list(_middleware(app)._templates) == [("GET", "/api/v1/voices/1"), ("GET", "/api/v1/voices/3")]
+
+
+def test_cached_template_is_used_and_corrected_by_route():
+    app = _app()
+    before = _sample("http_requests_total", method="GET", path_template="/api/v1/stale")
+
+    with TestClient(app) as client:
+        client.get("/api/v1/voices/1")
+        middleware = _middleware(app)
+        middleware._templates[("GET", "/api/v1/voices/1")] = ("/api/v1/stale", True)
+        client.get("/api/v1/voices/1")
+
+    assert _sample("http_requests_total", method="GET", path_template="/api/v1/stale") - before == 1
+    assert middleware._templates[("GET", "/api/v1/voices/1")] == ("/api/v1/voices/{voice_id}", True)
+
+
+def test_unhandled_paths_are_normalized_or_filtered():
+    app = _app()
+    before = _sample("http_requests_total", method="GET", path_template="/api/v1/missing/{id}")
+
+    with TestClient(app) as client:
+        for n in range(3):
+            assert client.get(f"/api/v1/missing/{n}").status_code == 404
+
+    assert _sample("http_requests_total", method="GET", path_template="/api/v1/missing/{id}") - before == 3
+
+    filtered = _app(filter_unhandled_paths=True)
+    with TestClient(filtered) as client:
+        client.get("/api/v1/missing/7")
+    assert _sample("http_requests_total", method="GET", path_template="/api/v1/missing/{id}") - before == 3
+
+
+def test_exceptions_and_status_are_recorded():
+    app = _app()
+    labels = {"method": "GET", "path_template": "/api/v1/fail"}
+    exceptions = _sample("http_exceptions_total", exception_type="RuntimeError", **labels)
+    responses = _sample("http_responses_total", status_code="500", **labels)
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        assert client.get("/api/v1/fail").status_code == 500
+
+    assert _sample("http_exceptions_total", exception_type="RuntimeError", **labels) - exceptions == 1
+    assert _sample("http_responses_total", status_code="500", **labels) - responses == 1
+    assert _sample("http_requests_in_progress", **labels) == 0
+
+
+def test_paths_outside_prefixes_are_not_measured():
+    app = _app()
+
+    with TestClient(app) as client:
+        client.get("/health")
+
+    assert _sample("http_requests_total", method="GET", path_template="/health") == 0
+    assert not _middleware(app)._templates
+
+
+def test_middleware_benchmark_reports_overhead():
+    from perf.middleware_bench import MIDDLEWARE_VARIANTS, MiddlewareOptions, format_middleware, run_middleware
+
+    report = asyncio.run(run_middleware(MiddlewareOptions(routes=10, paths=5, requests=50, warmup=5)))
+
+    assert list(report["results"]) == list(MIDDLEWARE_VARIANTS)
+    assert report["results"]["none"]["overhead_us"] == 0
+    assert "base_http" in format_middleware(report)
+
+
+def test_paths_over_label_budget_are_counted_as_overflow():
+    from ss.metrics.labels import OVERFLOW_LABEL
+
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware, label_budget=LabelBudget(max_values=1))
+    labels = {"method": "GET", "path_template": OVERFLOW_LABEL}
+    requests, responses = _sample("http_requests_total", **labels), _sample(
+        "http_responses_total", status_code="404", **labels
+    )
+
+    with TestClient(app) as client:
+        for name in ("alpha", "beta", "gamma", "delta"):
+            assert client.get(f"/api/v1/{name}").status_code == 404
+
+    assert _sample("http_requests_total", method="GET", path_template="/api/v1/alpha") == 1
+    assert _sample("http_requests_total", **labels) - requests == 3
+    assert _sample("http_responses_total", status_code="404", **labels) - responses == 3
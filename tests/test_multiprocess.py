@@ -0,0 +1,207 @@
+import os
+import re
+import subprocess
+import sys
+import signal
+import textwrap
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("flask")
+
+from monitoring.multiprocess import (  # noqa: E402
+    MULTIPROC_DIR_ENV,
+    child_exit,
+    metrics_registry,
+    on_starting,
+    prepare_directory,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Flask-приложение воркера: каждый процесс пишет метрики в свои файлы каталога
+APP = textwrap.dedent("""
+    import sys
+    from flask import Flask
+    from ss.metrics.middl import MetricsMiddleware
+
+    app = Flask(__name__)
+
+    @app.get("/api/v1/chart/<int:n>")
+    def chart(n):
+        return "ok"
+
+    MetricsMiddleware(app)
+    client = app.test_client()
+    """)
+WORKER = APP + "for n in range(int(sys.argv[1])):\n    client.get(f'/api/v1/chart/{n}')\n"
+SCRAPER = APP + "sys.stdout.write(client.get('/metrics').get_data(as_text=True))\n"
+
+
+# ASGI-воркер: держит argv[1] запросов открытыми, пока в stdin не придёт строка
+ASGI_WORKER = textwrap.dedent("""
+    import asyncio
+    import sys
+
+    import httpx
+    from fastapi import FastAPI
+
+    from monitoring.middleware import PrometheusMiddleware
+    from ss.metrics.labels import LabelBudget
+
+    app = FastAPI()
+    release = None
+
+    @app.get("/api/v1/slow")
+    async def slow():
+        print("started", flush=True)
+        await release
+        return {}
+
+    app.add_middleware(PrometheusMiddleware, label_budget=LabelBudget())
+
+    async def main():
+        global release
+        loop = asyncio.get_running_loop()
+        release = loop.run_in_executor(None, sys.stdin.readline)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://worker") as client:
+            await asyncio.gather(*(client.get("/api/v1/slow") for _ in range(int(sys.argv[1]))))
+
+    asyncio.run(main())
+    """)
+IN_PROGRESS = ("http_requests_in_progress", {"method": "GET", "path_template": "/api/v1/slow"})
+
+
+def _python(code: str, directory, *args) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop(MULTIPROC_DIR_ENV.lower(), None)
+    if directory is not None:
+        env[MULTIPROC_DIR_ENV] = str(directory)
+    else:
+        env.pop(MULTIPROC_DIR_ENV, None)
+    return subprocess.Popen(
+        [sys.executable, "-c", code, *args],
+        env=env,
+        cwd=ROOT,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+
+def _spawn_workers(directory, *requests: int):
+    workers = [_python(WORKER, directory, str(count)) for count in requests]
+    assert [worker.wait(timeout=60) for worker in workers] == [0] * len(workers)
+
+
+def _requests_total(directory) -> float:
+    scraper = _python(SCRAPER, directory)
+    output, _ = scraper.communicate(timeout=60)
+    assert scraper.returncode == 0
+    found = re.search(r'^http_requests_total\{method="GET",path_template="chart"\} (\S+)$', output, re.MULTILINE)
+    return float(found.group(1)) if found else 0.0
+
+
+def test_flask_metrics_sum_all_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv(MULTIPROC_DIR_ENV, str(tmp_path))
+    on_starting(server=None)
+
+    _spawn_workers(tmp_path, 3, 4, 5)
+
+    assert len(list(tmp_path.glob("counter_*.db"))) == 3
+    assert _requests_total(tmp_path) == 12
+
+
+def test_on_starting_drops_previous_run(tmp_path, monkeypatch):
+    monkeypatch.setenv(MULTIPROC_DIR_ENV, str(tmp_path))
+    _spawn_workers(tmp_path, 2)
+
+    on_starting(server=None)
+    _spawn_workers(tmp_path, 1)
+
+    assert _requests_total(tmp_path) == 1
+
+
+def test_prepare_directory_without_multiprocess_mode_is_noop(tmp_path, monkeypatch):
+    monkeypatch.delenv(MULTIPROC_DIR_ENV, raising=False)
+    monkeypatch.delenv(MULTIPROC_DIR_ENV.lower(), raising=False)
+    (tmp_path / "keep.db").write_text("")
+
+    prepare_directory()
+
+    assert (tmp_path / "keep.db").exists()
+    # Без каталога /metrics отдаёт реестр самого процесса
+    assert _requests_total(None) == 0
+
+
+def test_prepare_directory_removes_only_metric_files(tmp_path, monkeypatch):
+    monkeypatch.setenv(MULTIPROC_DIR_ENV, str(tmp_path))
+    for name in ("counter_1.db", "gauge_livesum_1.db", "sketch_1.json", "notes.txt", "settings.json"):
+        (tmp_path / name).write_text("")
+    (tmp_path / "nested").mkdir()
+
+    prepare_directory()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["nested", "notes.txt", "settings.json"]
+
+
+def _slow_workers(directory, *in_flight: int) -> list[subprocess.Popen]:
+    """
+    Запускает ASGI-воркеры и ждёт, пока каждый начнёт обрабатывать все свои запросы.
+    """
+    pytest.importorskip("httpx")
+    workers = [_python(ASGI_WORKER, directory, str(count)) for count in in_flight]
+    for worker, count in zip(workers, in_flight):
+        assert [worker.stdout.readline() for _ in range(count)] == ["started\n"] * count
+    return workers
+
+
+def _release(worker: subprocess.Popen):
+    worker.stdin.write("\n")
+    worker.stdin.flush()
+    assert worker.wait(timeout=60) == 0
+
+
+def _in_progress() -> float:
+    return metrics_registry().get_sample_value(*IN_PROGRESS) or 0
+
+
+def test_requests_in_progress_sum_live_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv(MULTIPROC_DIR_ENV, str(tmp_path))
+    on_starting(server=None)
+    first, second = _slow_workers(tmp_path, 2, 3)
+    try:
+        assert _in_progress() == 5
+
+        _release(first)
+        assert _in_progress() == 3
+    finally:
+        for worker in (first, second):
+            worker.kill()
+            worker.wait(timeout=60)
+
+
+def test_dead_worker_gauges_are_removed(tmp_path, monkeypatch):
+    monkeypatch.setenv(MULTIPROC_DIR_ENV, str(tmp_path))
+    on_starting(server=None)
+    swept, exited, alive = _slow_workers(tmp_path, 1, 2, 4)
+    try:
+        for worker in (swept, exited):
+            worker.send_signal(signal.SIGKILL)
+            worker.wait(timeout=60)
+        # Убитые воркеры не успели уменьшить gauge: без уборки их запросы считались бы идущими
+        assert (tmp_path / f"gauge_livesum_{exited.pid}.db").exists()
+
+        child_exit(server=None, worker=SimpleNamespace(pid=exited.pid))
+        assert not (tmp_path / f"gauge_livesum_{exited.pid}.db").exists()
+
+        # Сбор метрик сам убирает файлы остальных завершившихся воркеров (sweep_dead_workers)
+        assert _in_progress() == 4
+        assert not (tmp_path / f"gauge_livesum_{swept.pid}.db").exists()
+        registry = metrics_registry()
+        assert registry.get_sample_value("http_requests_total", IN_PROGRESS[1]) == 7
+    finally:
+        alive.kill()
+        alive.wait(timeout=60)
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from fastapi import FastAPI  # noqa: E402
+
+from monitoring.middleware import init  # noqa: E402
+from monitoring.profiler import RequestProfiler  # noqa: E402
+
+
+def busy_wait(seconds):
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        pass
+
+
+def _app(profiler):
+    app = FastAPI()
+
+    @app.get("/api/v1/slow")
+    async def slow_handler():
+        await asyncio.sleep(0.03)
+        busy_wait(0.05)
+        return {}
+
+    # BaseHTTPMiddleware выполняет маршрут в дочерней задаче
+    @app.middleware("http")
+    async def passthrough(request, call_next):
+        return await call_next(request)
+
+    init(app, profiler=profiler)
+    return app
+
+
+def _get(app, path):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path)
+
+    return asyncio.run(main())
+
+
+def test_profile_includes_route_behind_base_http_middleware(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), sample_rate=1.0, interval=0.002)
+
+    assert _get(_app(profiler), "/api/v1/slow").status_code == 200
+
+    (collapsed,) = tmp_path.glob("*.collapsed")
+    stacks = collapsed.read_text()
+    assert "slow_handler" in stacks
+    assert "busy_wait" in stacks
+    assert list(tmp_path.glob("*.speedscope.json"))
+
+
+def test_write_failure_is_logged_not_raised(tmp_path, monkeypatch, caplog):
+    profiler = RequestProfiler(str(tmp_path), sample_rate=1.0, interval=0.002)
+
+    def broken_write(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(profiler, "_write", broken_write)
+
+    with caplog.at_level(logging.ERROR, logger="profiler"):
+        assert _get(_app(profiler), "/api/v1/slow").status_code == 200
+
+    assert "Failed to write profile of GET /api/v1/slow" in caplog.text
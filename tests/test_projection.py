@@ -0,0 +1,120 @@
+import asyncio
+import datetime
+import enum
+import json
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import Column, DateTime, Enum, Integer, String, create_engine, select
+from sqlalchemy.orm import Session, declarative_base
+
+from uow.projection import dump_many_json, page_json, projection_columns, validate_many
+
+Base = declarative_base()
+
+
+class Status(str, enum.Enum):
+    NEW = "NEW"
+    DONE = "DONE"
+
+
+class Voice(Base):
+    __tablename__ = "voice"
+    id = Column(Integer, primary_key=True)
+    voice_id = Column(String)
+    name = Column(String)
+    status = Column(Enum(Status))
+    created_at = Column(DateTime)
+    secret = Column(String)
+
+
+class VoiceOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    voice_id: str
+    name: Optional[str]
+    status: Status
+    created_at: datetime.datetime
+
+
+class VoiceWithScore(VoiceOut):
+    score: Optional[int] = None
+
+
+ROWS = [
+    {"id": 1, "voice_id": "a", "name": "Привет", "status": Status.NEW, "secret": "x"},
+    {"id": 2, "voice_id": "b", "name": None, "status": Status.DONE, "secret": "y"},
+    {"id": 3, "voice_id": "c", "name": 'quote "q"', "status": Status.NEW, "secret": None},
+]
+
+
+def _database():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    created_at = datetime.datetime(2024, 5, 1, 12, 30)
+    with Session(engine) as session:
+        session.add_all(Voice(created_at=created_at + datetime.timedelta(hours=row["id"]), **row) for row in ROWS)
+        session.commit()
+    return engine
+
+
+def test_projection_columns_follow_schema_fields():
+    assert [column.key for column in projection_columns(Voice, VoiceOut)] == [
+        "id",
+        "voice_id",
+        "name",
+        "status",
+        "created_at",
+    ]
+    assert [column.key for column in projection_columns(Voice, VoiceWithScore)][-1] == "created_at"
+
+
+def test_projection_json_matches_per_object_serialization():
+    engine = _database()
+    with Session(engine) as session:
+        objects = session.execute(select(Voice).order_by(Voice.id)).scalars().all()
+        expected = [VoiceOut.model_validate(voice).model_dump(mode="json") for voice in objects]
+        columns = projection_columns(Voice, VoiceOut)
+        rows = [dict(row) for row in session.execute(select(*columns).order_by(Voice.id)).mappings()]
+    engine.dispose()
+
+    assert json.loads(dump_many_json(VoiceOut, rows)) == expected
+    assert json.loads(dump_many_json(VoiceOut, rows, trusted=True)) == expected
+    assert json.loads(dump_many_json(VoiceOut, objects, from_attributes=True)) == expected
+    assert [voice.model_dump(mode="json") for voice in validate_many(VoiceOut, rows)] == expected
+    assert "secret" not in rows[0]
+
+
+def test_validated_projection_fills_schema_defaults():
+    rows = [{"id": 1, "voice_id": "a", "name": None, "status": "NEW", "created_at": "2024-05-01T12:30:00"}]
+
+    assert json.loads(dump_many_json(VoiceWithScore, rows))[0]["score"] is None
+
+
+def test_page_json_wraps_items():
+    assert json.loads(page_json(b'[{"id":1}]', 42)) == {"items": [{"id": 1}], "total": 42}
+    assert json.loads(page_json(dump_many_json(VoiceOut, []), 0)) == {"items": [], "total": 0}
+
+
+def test_serialize_benchmark_paths_agree(tmp_path):
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("core.repositories.alchemy.models")
+    from perf.filter_suite import DatasetSpec
+    from perf.serialize_bench import SERIALIZE_PATHS, SerializeOptions, format_serialize, run_serialize
+
+    options = SerializeOptions(
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'serialize.db'}",
+        dataset=DatasetSpec(rows=400, operators=5),
+        page_size=20,
+        pages=2,
+        repeat=3,
+        warmup=1,
+    )
+
+    report = asyncio.run(run_serialize(options))
+
+    assert list(report["results"]) == list(SERIALIZE_PATHS)
+    assert all(result["agree"] and result["bytes"] > 20 for result in report["results"].values())
+    assert "trusted" in format_serialize(report)
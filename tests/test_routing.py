@@ -0,0 +1,123 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from uow.bulk import _copy_chunk
+from uow.routing import USE_PRIMARY, EngineRouter, RoutingSession
+
+pytest.importorskip("aiosqlite")
+
+metadata = MetaData()
+marker = Table("marker", metadata, Column("name", String, primary_key=True))
+
+
+def run(scenario, tmp_path, voices=None):
+    """
+    Выполняет scenario(session_factory) на двух SQLite-файлах: primary и replica.
+
+    В каждой базе таблица marker со своим именем; voices — база -> строки таблицы голосов.
+    """
+
+    async def main():
+        engines = {
+            name: create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db") for name in ("primary", "replica")
+        }
+        try:
+            for name, engine in engines.items():
+                async with engine.begin() as connection:
+                    await connection.run_sync(metadata.create_all)
+                    await connection.execute(insert(marker).values(name=name))
+                    if voices:
+                        table = voices["table"]
+                        await connection.run_sync(table.create)
+                        await connection.execute(table.insert(), voices[name])
+            factory = async_sessionmaker(
+                bind=engines["primary"],
+                class_=AsyncSession,
+                sync_session_class=RoutingSession,
+                router=EngineRouter(engines["primary"], [engines["replica"]]),
+                expire_on_commit=False,
+            )
+            return await scenario(factory)
+        finally:
+            for engine in engines.values():
+                await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def _names(session) -> list[str]:
+    return sorted((await session.execute(select(marker.c.name))).scalars())
+
+
+def test_reads_go_to_replica_until_first_write(tmp_path):
+    async def scenario(factory):
+        async with factory() as session:
+            before = await _names(session)
+            await session.execute(insert(marker).values(name="written"))
+            after = await _names(session)
+            await session.commit()
+        async with factory() as session:
+            fresh = await _names(session)
+        return before, after, fresh
+
+    before, after, fresh = run(scenario, tmp_path)
+
+    assert before == ["replica"]
+    assert after == ["primary", "written"]
+    # Новая сессия снова читает с реплики, куда запись не реплицируется
+    assert fresh == ["replica"]
+
+
+def test_unit_of_work_stays_on_primary_unless_read_only(tmp_path):
+    pytest.importorskip("core.repositories.alchemy.models")
+    from uow.uow import UnitOfWork
+
+    async def scenario(factory):
+        uow = UnitOfWork(factory)
+        async with uow() as work:
+            writing = await _names(work.session)
+        async with uow(read_only=True) as work:
+            reading = await _names(work.session)
+        return writing, reading
+
+    assert run(scenario, tmp_path) == (["primary"], ["replica"])
+
+
+def test_copy_connection_is_taken_from_primary(tmp_path):
+    async def scenario(factory):
+        async with factory() as session:
+            # У aiosqlite нет COPY: важно только, с какого движка взято соединение
+            with pytest.raises(AttributeError):
+                await _copy_chunk(session, marker, ["name"], [("copied",)])
+            return session.info.get(USE_PRIMARY)
+
+    assert run(scenario, tmp_path)
+
+
+def test_claim_next_reads_candidates_on_primary(tmp_path):
+    models = pytest.importorskip("core.repositories.alchemy.models")
+    from api.v1.schemas import FilterSource
+
+    from perf.seed import generate_rows, voice_overrides
+    from uow.repo import VoiceRepository
+
+    SqlVoice, VoiceStatus = models.SqlVoice, models.VoiceStatus
+    rows = list(generate_rows(SqlVoice.__table__, 4, voice_overrides(1)))
+    # Реплика отстала: на ней голоса уже разобраны
+    stale = [{**row, "status": VoiceStatus.IN_PROGRESS.value} for row in rows]
+    payload = SimpleNamespace(source=FilterSource.ASSIGMENT_AREA, and_=[], or_=[], global_order_by=None)
+    user = SimpleNamespace(id=5, role=models.UserRole.ADMIN)
+
+    async def scenario(factory):
+        async with factory() as session:
+            claimed = await VoiceRepository(session).claim_next(user, 2, payload)
+            await session.commit()
+            return claimed
+
+    claimed = run(scenario, tmp_path, voices={"table": SqlVoice.__table__, "primary": rows, "replica": stale})
+
+    assert claimed == ["voice-0", "voice-1"]
@@ -0,0 +1,163 @@
+import json
+import os
+import random
+import threading
+import time
+
+import pytest
+
+from monitoring.sketch import DEFAULT_QUANTILES, DDSketch, RouteSketches, SketchCollector
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            pytest.fail("condition was not met in time")
+        time.sleep(0.01)
+
+
+def test_quantiles_stay_within_relative_accuracy():
+    rng = random.Random(0)
+    values = sorted(rng.lognormvariate(-3, 1) for _ in range(10_000))
+    sketch, other = DDSketch(0.01), DDSketch(0.01)
+    for i, value in enumerate(values):
+        (sketch if i % 2 else other).add(value)
+    sketch.merge(other)
+
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact * 1.01
+
+
+def test_observe_leaves_file_writes_to_background_thread(tmp_path, monkeypatch):
+    sketches = RouteSketches(directory=str(tmp_path), flush_interval=0.05)
+    writers = []
+    flush = sketches.flush
+    monkeypatch.setattr(sketches, "flush", lambda: writers.append(threading.current_thread()) or flush())
+    path = tmp_path / f"sketch_{os.getpid()}.json"
+
+    for _ in range(100):
+        sketches.observe("GET", "/api/v1/voices", 0.02)
+    assert not writers
+
+    _wait_for(path.exists)
+    sketches.close()
+
+    assert threading.main_thread() not in writers[:-1]
+    assert writers[-1] is threading.current_thread()
+    (entry,) = json.loads(path.read_text())
+    assert (entry["method"], entry["path_template"], entry["sketch"]["count"]) == ("GET", "/api/v1/voices", 100)
+
+
+def test_without_directory_nothing_is_written(tmp_path):
+    sketches = RouteSketches(flush_interval=0)
+    sketches.observe("GET", "/", 0.1)
+    sketches.close()
+
+    assert sketches.merged()[("GET", "/")].count == 1
+    assert not list(tmp_path.iterdir())
+
+
+def test_merged_adds_sketches_saved_by_other_workers(tmp_path):
+    for pid, durations in ((111, [0.1, 0.2]), (222, [0.3])):
+        worker = RouteSketches()
+        for seconds in durations:
+            worker.observe("GET", "/api/v1/voices", seconds)
+        worker.observe("POST", f"/api/v1/only-{pid}", 1.0)
+        (tmp_path / f"sketch_{pid}.json").write_text(json.dumps(worker._dump()))
+    # Свой файл устарел: значения текущего процесса берутся из памяти, а не с диска
+    (tmp_path / f"sketch_{os.getpid()}.json").write_text(json.dumps(RouteSketches()._dump()))
+    (tmp_path / "sketch_333.json").write_text("{broken")
+    (tmp_path / "sketch_444.json.tmp").write_text("[]")
+    sketches = RouteSketches(directory=str(tmp_path), flush_interval=3600)
+    try:
+        sketches.observe("GET", "/api/v1/voices", 0.4)
+
+        merged = sketches.merged()
+    finally:
+        sketches.close()
+
+    assert {key: sketch.count for key, sketch in merged.items()} == {
+        ("GET", "/api/v1/voices"): 4,
+        ("POST", "/api/v1/only-111"): 1,
+        ("POST", "/api/v1/only-222"): 1,
+    }
+    voices = merged[("GET", "/api/v1/voices")]
+    assert voices.sum == pytest.approx(1.0)
+    assert (voices.min, voices.max) == (0.1, 0.4)
+
+
+def _samples(families) -> dict:
+    return {
+        (family.name, sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in families
+        for sample in family.samples
+    }
+
+
+def test_collector_exports_quantiles_and_overridden_buckets():
+    sketches = RouteSketches()
+    for ms in range(1, 101):
+        sketches.observe("GET", "/api/v1/voices", ms / 1000)
+    sketches.observe("GET", "/api/v1/health", 0.005)
+    collector = SketchCollector(sketches, quantiles=(0.5, 0.99), bucket_overrides={"/api/v1/voices": [0.05, 0.01, 0.1]})
+
+    families = list(collector.collect())
+    samples = _samples(families)
+
+    assert [family.name for family in families] == [
+        "http_request_duration_quantile_seconds",
+        "http_request_duration_route_seconds",
+    ]
+
+    def quantile(path, q):
+        labels = (("method", "GET"), ("path_template", path), ("quantile", q))
+        return samples[("http_request_duration_quantile_seconds", "http_request_duration_quantile_seconds", labels)]
+
+    assert quantile("/api/v1/voices", "0.5") == pytest.approx(0.050, rel=0.02)
+    assert quantile("/api/v1/voices", "0.99") == pytest.approx(0.099, rel=0.02)
+    assert quantile("/api/v1/health", "0.5") == pytest.approx(0.005, rel=0.02)
+
+    route = (("method", "GET"), ("path_template", "/api/v1/voices"))
+    buckets = {
+        dict(labels)["le"]: value
+        for (family, name, labels), value in samples.items()
+        if name == "http_request_duration_route_seconds_bucket"
+    }
+    assert buckets == {"0.01": 10, "0.05": 50, "0.1": 100, "+Inf": 100}
+    assert samples[("http_request_duration_route_seconds", "http_request_duration_route_seconds_count", route)] == 100
+    assert samples[
+        ("http_request_duration_route_seconds", "http_request_duration_route_seconds_sum", route)
+    ] == pytest.approx(5.05)
+    # Гистограмма — только для маршрутов из bucket_overrides
+    assert not any("/api/v1/health" in dict(labels).values() for (_, name, labels) in samples if "route" in name)
+
+
+def test_collector_without_overrides_exports_only_quantiles():
+    sketches = RouteSketches()
+    sketches.observe("GET", "/api/v1/voices", 0.1)
+
+    families = list(SketchCollector(sketches).collect())
+
+    assert [family.name for family in families] == ["http_request_duration_quantile_seconds"]
+    assert len(families[0].samples) == len(DEFAULT_QUANTILES)
+
+
+def test_max_bins_collapses_lowest_bins_and_keeps_the_tail():
+    values = [10 ** (exponent / 10) for exponent in range(-60, 11)]  # 1e-6 .. 10 с шагом ~26%
+    sketch, left, right = DDSketch(0.01, max_bins=20), DDSketch(0.01, max_bins=20), DDSketch(0.01, max_bins=20)
+    for i, value in enumerate(values):
+        sketch.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    for collapsed in (sketch, left):
+        assert len(collapsed.bins) <= 20
+        assert collapsed.count == len(values)
+        assert sum(collapsed.bins.values()) == len(values)
+        # Верхние корзины не тронуты: хвост оценивается с заявленной точностью
+        assert collapsed.quantile(1.0) == pytest.approx(10, rel=0.01)
+        assert collapsed.quantile(0.95) == pytest.approx(values[int(0.95 * (len(values) - 1))], rel=0.01)
+        # Нижние значения слиты в нижнюю оставшуюся корзину и завышаются
+        assert collapsed.quantile(0.0) > values[0] * 1.01
@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+from filters.strategy import AdaptiveStrategySelector, FilterShape, FilterStrategy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIELDS = ("name", "status")
+OPERATORS = ("=", "in", "contains")
+
+
+def _payload(and_=(), or_=(), order_by=None):
+    return SimpleNamespace(
+        source="assigment_area",
+        and_=[SimpleNamespace(field=f, op=op, value=None) for f, op in and_],
+        or_=[SimpleNamespace(field=f, op=op, value=None) for f, op in or_],
+        global_order_by=order_by,
+    )
+
+
+def _shape(payload, use_sorting=False):
+    user = SimpleNamespace(id=1, role="operator")
+    return FilterShape.from_payload(
+        payload, user, use_sorting, fields=FIELDS, operators=OPERATORS, sort_columns=("id", "name")
+    )
+
+
+def test_shape_ignores_fields_and_operators_outside_white_list():
+    base = _shape(_payload(and_=[("name", "=")]))
+    noisy = [
+        _shape(_payload(and_=[("name", "="), (f"junk_{i}", "=")], or_=[("status", f"op_{i}")], order_by=f"col_{i}"))
+        for i in range(100)
+    ]
+
+    assert {shape for shape in noisy} == {base}
+    assert base.and_ == (("name", "="),)
+
+
+def test_shape_keeps_known_sort_column_only():
+    assert _shape(_payload(order_by="name"), use_sorting=True).sorting == "name"
+    assert _shape(_payload(order_by="drop table"), use_sorting=True).sorting is None
+    assert _shape(_payload(order_by="name"), use_sorting=False).sorting is None
+
+
+def test_selector_explores_then_picks_fastest_and_respects_pins():
+    selector = AdaptiveStrategySelector(min_samples=2)
+    shape = _shape(_payload(and_=[("name", "contains")]))
+    latency = {FilterStrategy.INLINE: 0.03, FilterStrategy.CTE: 0.01, FilterStrategy.HYBRID: 0.02}
+
+    for _ in range(2 * len(FilterStrategy)):
+        strategy = selector.choose(shape)
+        selector.record_latency(shape, strategy, latency[strategy])
+
+    assert selector.decisions()[-1].reason == "explore"
+    assert selector.choose(shape) == FilterStrategy.CTE
+    assert selector.decisions()[-1].reason == "latency"
+
+    selector.pin(FilterStrategy.INLINE, shape)
+    assert selector.choose(shape) == FilterStrategy.INLINE
+    assert selector.choose(shape, override=FilterStrategy.HYBRID) == FilterStrategy.HYBRID
+    selector.unpin(shape)
+    assert selector.choose(shape) == FilterStrategy.CTE
+
+
+def test_strategy_module_imports_without_application_schemas():
+    # api.v1.schemas нужен только для аннотаций; None в sys.modules запрещает его импорт
+    code = (
+        "import sys; sys.modules['api'] = None\n"
+        "from types import SimpleNamespace as NS\n"
+        "from filters.strategy import AdaptiveStrategySelector, FilterShape, FilterStrategy\n"
+        "payload = NS(source='work_area', and_=[NS(field='name', op='=')], or_=[], global_order_by=None)\n"
+        "shape = FilterShape.from_payload(payload, NS(id=1, role='admin'), False, fields=('name',), operators=('=',))\n"
+        "selector = AdaptiveStrategySelector(min_samples=1)\n"
+        "for strategy in FilterStrategy: selector.record_latency(shape, strategy, 0.01 if strategy == 'cte' else 0.1)\n"
+        "print(selector.choose(shape).value)"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.strip() == "cte"
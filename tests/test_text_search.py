@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, declarative_base
+
+from filters.text_search import register_sqlite_functions, text_contains, text_icontains, text_match, text_startswith
+
+Base = declarative_base()
+
+NAMES = ["Привет мир", "привет МИР", "hello_world", "Hello World", "50% off", "abc", "ПРИВЕТСТВИЕ", None]
+
+
+class Note(Base):
+    __tablename__ = "note"
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+class IndexedNote(Base):
+    __tablename__ = "indexed_note"
+    FTS_TABLE = "indexed_note_fts"
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+@pytest.fixture(scope="module")
+def session():
+    engine = create_engine("sqlite://")
+    register_sqlite_functions(engine)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Note(id=i, name=name) for i, name in enumerate(NAMES, 1))
+        session.add_all(IndexedNote(id=i, name=name) for i, name in enumerate(NAMES, 1))
+        session.flush()
+        session.execute(
+            text("CREATE VIRTUAL TABLE indexed_note_fts USING fts5(name, content='indexed_note', content_rowid='id')")
+        )
+        session.execute(text("INSERT INTO indexed_note_fts(indexed_note_fts) VALUES ('rebuild')"))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def _names(session, condition, model=Note):
+    return sorted(session.execute(select(model.name).where(condition)).scalars())
+
+
+def test_contains_is_case_sensitive_and_escapes_wildcards(session):
+    assert _names(session, text_contains(Note.name, "_")) == ["hello_world"]
+    assert _names(session, text_contains(Note.name, "%")) == ["50% off"]
+    assert _names(session, text_contains(Note.name, "Привет")) == ["Привет мир"]
+
+
+def test_icontains_folds_non_ascii_case(session):
+    assert _names(session, text_icontains(Note.name, "привет")) == ["ПРИВЕТСТВИЕ", "Привет мир", "привет МИР"]
+    assert _names(session, text_icontains(Note.name, "МИР")) == ["Привет мир", "привет МИР"]
+    assert _names(session, text_icontains(Note.name, "HELLO")) == ["Hello World", "hello_world"]
+
+
+def test_icontains_works_on_aiosqlite():
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        register_sqlite_functions(engine)
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+                await connection.execute(Note.__table__.insert(), [{"id": 1, "name": "Привет мир"}])
+                stmt = select(Note.id).where(text_icontains(Note.name, "ПРИВЕТ"))
+                return (await connection.execute(stmt)).scalars().all()
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == [1]
+
+
+def test_startswith_uses_range(session):
+    condition = text_startswith(Note.name, "hel")
+    assert _names(session, condition) == ["hello_world"]
+    assert ">=" in str(select(Note.id).where(condition).compile(session.bind))
+    assert len(_names(session, text_startswith(Note.name, ""))) == len(NAMES) - 1
+
+
+def test_match_without_fts_requires_every_word(session):
+    assert _names(session, text_match(Note.name, "мир привет")) == ["Привет мир", "привет МИР"]
+
+
+def test_match_uses_fts_table(session):
+    stmt = select(IndexedNote.id).where(text_match(IndexedNote.name, "hello"))
+    assert "indexed_note_fts MATCH" in str(stmt.compile(session.bind))
+    assert _names(session, text_match(IndexedNote.name, "hello"), IndexedNote) == ["Hello World", "hello_world"]
+
+
+@pytest.mark.parametrize("query", ["", "   ", "%%", '"'])
+def test_empty_match_finds_nothing(session, query):
+    assert _names(session, text_match(Note.name, query)) == []
+    assert _names(session, text_match(IndexedNote.name, query), IndexedNote) == []
+
+
+def test_sqlite_functions_are_registered_per_engine():
+    registered, plain = create_engine("sqlite://"), create_engine("sqlite://")
+    register_sqlite_functions(registered)
+    register_sqlite_functions(registered)
+    stmt = text("SELECT unicode_lower('ПРИВЕТ')")
+    try:
+        with registered.connect() as connection:
+            assert connection.execute(stmt).scalar() == "привет"
+        with plain.connect() as connection, pytest.raises(OperationalError, match="unicode_lower"):
+            connection.execute(stmt)
+    finally:
+        registered.dispose()
+        plain.dispose()
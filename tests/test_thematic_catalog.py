@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+
+from uow.thematic_catalog import ThematicCatalog
+
+
+def _thematic(ext_id, *names):
+    levels = {f"level_{i}_id": f"{ext_id}-{i}" if i > 1 else "root" for i in range(1, 5)}
+    levels.update({f"level_{i}_name": name for i, name in enumerate(names, 1)})
+    return SimpleNamespace(ext_id=ext_id, **levels)
+
+
+class Source:
+    """
+    Таблица тематик с подсчётом загрузок.
+    """
+
+    def __init__(self, *thematics):
+        self.thematics = list(thematics)
+        self.version = 1
+        self.loads = 0
+
+    async def load(self):
+        self.loads += 1
+        return list(self.thematics)
+
+    async def load_version(self):
+        return self.version
+
+
+def _names(snapshot, prefix=("root",)):
+    return [entry["name"] for entry in snapshot.level_entries(prefix)]
+
+
+def test_reloads_after_ttl_without_version_loader():
+    # Переименование не меняет количество строк: без столбца версии снимок перечитывается всегда
+    source = Source(_thematic("t1", "Root", "Old", "c", "d"))
+    catalog = ThematicCatalog(ttl=0)
+
+    async def scenario():
+        first = await catalog.get(source.load, "ext_id")
+        source.thematics = [_thematic("t1", "Root", "New", "c", "d")]
+        return first, await catalog.get(source.load, "ext_id")
+
+    first, second = asyncio.run(scenario())
+
+    assert source.loads == 2
+    assert (_names(first), _names(second)) == (["Old"], ["New"])
+
+
+def test_same_version_extends_snapshot_and_new_version_reloads():
+    source = Source(_thematic("t1", "Root", "Old", "c", "d"))
+    catalog = ThematicCatalog(ttl=0)
+
+    async def scenario():
+        await catalog.get(source.load, "ext_id", source.load_version)
+        await catalog.get(source.load, "ext_id", source.load_version)
+        loads_before_change = source.loads
+        source.thematics, source.version = [_thematic("t1", "Root", "New", "c", "d")], 2
+        return loads_before_change, await catalog.get(source.load, "ext_id", source.load_version)
+
+    loads_before_change, snapshot = asyncio.run(scenario())
+
+    assert loads_before_change == 1
+    assert source.loads == 2 and _names(snapshot) == ["New"]
+
+
+def test_level_entries_are_copies():
+    catalog = ThematicCatalog()
+    source = Source(_thematic("t1", "Root", "b", "c", "d"), _thematic("t2", "Root", "e", "f", "g"))
+    snapshot = asyncio.run(catalog.get(source.load, "ext_id"))
+
+    entries = snapshot.level_entries(("root",))
+    entries[0]["name"] = "changed"
+    entries.clear()
+
+    assert _names(snapshot) == ["b", "e"]
+    assert snapshot.level_entries(("root", "t1-2", "t1-3", "t1-4")) == [
+        {"id": "t1-4", "name": "d", "thematic_id": "t1"}
+    ]
+    assert snapshot.level_entries(("missing",)) == []
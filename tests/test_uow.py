@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, event, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("core.repositories.alchemy.models")
+
+from uow.uow import UnitOfWork  # noqa: E402
+
+metadata = MetaData()
+notes = Table("notes", metadata, Column("id", Integer, primary_key=True), Column("text", String))
+
+
+def run(scenario, tmp_path):
+    """
+    Выполняет scenario(uow) на SQLite-файле; возвращает результат, сохранённые тексты и число выдач соединений.
+    """
+    checkouts = [0]
+
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'uow.db'}")
+
+        @event.listens_for(engine.sync_engine.pool, "checkout")
+        def checkout(*args):
+            checkouts[0] += 1
+
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(metadata.create_all)
+            checkouts[0] = 0
+            result = await scenario(UnitOfWork(async_sessionmaker(engine, expire_on_commit=False)))
+            used = checkouts[0]
+            async with engine.connect() as connection:
+                stored = (await connection.execute(select(notes.c.text).order_by(notes.c.id))).scalars().all()
+            return result, stored, used
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def _add(uow, text):
+    await uow.session.execute(insert(notes).values(text=text))
+
+
+def test_connection_is_taken_and_committed_only_when_used(tmp_path):
+    async def scenario(uow):
+        async with uow():
+            pass
+        return uow.session
+
+    session, stored, used = run(scenario, tmp_path)
+
+    assert session is None and stored == [] and used == 0
+
+    async def writing(uow):
+        async with uow() as work:
+            await _add(work, "a")
+
+    assert run(writing, tmp_path)[1:] == (["a"], 1)
+
+
+def test_read_only_does_not_commit(tmp_path):
+    async def scenario(uow):
+        async with uow(read_only=True) as work:
+            await _add(work, "lost")
+            return (await work.session.execute(select(notes.c.text))).scalars().all()
+
+    seen, stored, _ = run(scenario, tmp_path)
+
+    assert seen == ["lost"] and stored == []
+
+
+def test_exception_rolls_back_whole_unit(tmp_path):
+    async def scenario(uow):
+        with pytest.raises(ValueError):
+            async with uow() as work:
+                await _add(work, "a")
+                raise ValueError("boom")
+
+    assert run(scenario, tmp_path)[1] == []
+
+
+def test_nested_call_rolls_back_only_its_savepoint(tmp_path):
+    async def scenario(uow):
+        async with uow() as work:
+            await _add(work, "outer")
+            with pytest.raises(ValueError):
+                async with uow() as inner:
+                    await _add(inner, "failed")
+                    raise ValueError("boom")
+            async with uow() as inner:
+                await _add(inner, "inner")
+
+    assert run(scenario, tmp_path)[1] == ["outer", "inner"]
+
+
+def test_nested_read_only_discards_its_writes(tmp_path):
+    async def scenario(uow):
+        async with uow() as work:
+            await _add(work, "outer")
+            async with uow(read_only=True) as inner:
+                await _add(inner, "preview")
+                seen = (await inner.session.execute(select(notes.c.text))).scalars().all()
+        return seen
+
+    seen, stored, _ = run(scenario, tmp_path)
+
+    assert seen == ["outer", "preview"]
+    assert stored == ["outer"]
+
+
+def test_writing_call_inside_read_only_is_rejected(tmp_path):
+    async def scenario(uow):
+        async with uow(read_only=True):
+            with pytest.raises(RuntimeError, match="read_only"):
+                async with uow():
+                    pass
+
+    run(scenario, tmp_path)
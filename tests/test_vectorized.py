@@ -0,0 +1,155 @@
+import datetime
+import enum
+import random
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+models = pytest.importorskip("core.repositories.alchemy.models")
+
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from api.v1.schemas import FilterSource  # noqa: E402
+from filters.filter_engine import SqlAlchemyFilterEngine  # noqa: E402
+from filters.strategy import FilterStrategy  # noqa: E402
+from filters.text_search import register_sqlite_functions  # noqa: E402
+from filters.vectorized import ColumnarSnapshot, NumpyFilterEngine  # noqa: E402
+from perf.seed import generate_rows  # noqa: E402
+
+SqlVoice = models.SqlVoice
+UserRole = models.UserRole
+VoiceStatus = models.VoiceStatus
+
+ROWS = 400
+WORDS = ("alpha", "Beta", "gamma", "заявка", "Оператор", "50%_off")
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def _random_value(column, i, rng):
+    python_type = _python_type(column)
+    if column.nullable and not column.primary_key and rng.random() < 0.15:
+        return None
+    if column.name == "status":
+        return rng.choice(list(VoiceStatus))
+    if column.name in ("user_id", "author_id"):
+        return rng.choice([1, 2, 3])
+    if python_type is bool:
+        return rng.random() < 0.7
+    if python_type is datetime.datetime:
+        return NOW - datetime.timedelta(days=rng.uniform(0, 60))
+    if python_type is str and not (column.primary_key or column.unique):
+        return " ".join(rng.choices(WORDS, k=rng.randint(1, 3)))
+    return None
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    """
+    SQLite-таблица голосов со случайными значениями и её колоночный снимок.
+    """
+    rng = random.Random(0)
+    table = SqlVoice.__table__
+    overrides = {
+        column.name: (lambda i, rng, column=column: _random_value(column, i, rng))
+        for column in table.columns
+        if column.name in ("status", "user_id", "author_id", "is_top", "created_at")
+        or (_python_type(column) is str and not (column.primary_key or column.unique))
+    }
+    engine = create_engine("sqlite://")
+    register_sqlite_functions(engine)
+    table.create(engine)
+    with engine.begin() as connection:
+        connection.execute(table.insert(), list(generate_rows(table, ROWS, overrides, seed=rng.randrange(1000))))
+        rows = [dict(row) for row in connection.execute(select(table)).mappings()]
+    snapshot = ColumnarSnapshot.from_rows(rows, table.columns.keys())
+    yield engine, snapshot, rows
+    engine.dispose()
+
+
+def _conditions(rows, rng):
+    """
+    Случайные условия по полям FILTER_WHITE_LIST; значения берутся из самих данных.
+    """
+    table = SqlVoice.__table__
+    fields = [name for name in SqlVoice.FILTER_WHITE_LIST if name in table.columns]
+    conditions = []
+    for _ in range(rng.randint(1, 3)):
+        name = rng.choice(fields)
+        python_type = _python_type(table.columns[name])
+        values = [row[name] for row in rows if row[name] is not None] or [None]
+        value = rng.choice(values)
+        ops = ["=", "!=", "in", "not_in", "is_null"]
+        if python_type in (int, str, datetime.datetime) and not isinstance(value, enum.Enum):
+            ops += ["<", ">", "<=", ">=", "between"]
+        if python_type is str and not isinstance(value, enum.Enum):
+            ops += ["contains", "icontains", "startswith"]
+        op = rng.choice(ops)
+        if op in ("in", "not_in"):
+            value = rng.sample(values, min(len(values), rng.randint(1, 4)))
+        elif op == "is_null":
+            value = rng.random() < 0.5
+        elif op == "between":
+            value = sorted(rng.sample(values, 2) if len(values) > 1 else values * 2)
+        elif op in ("contains", "icontains", "startswith"):
+            start = rng.randrange(len(value))
+            value = value[start : start + rng.randint(1, 4)] if op != "startswith" else value[: rng.randint(0, 4)]
+            value = value.swapcase() if op == "icontains" else value
+        conditions.append(SimpleNamespace(field=name, op=op, value=value))
+    return conditions
+
+
+def _payloads(rows, count, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        conditions = _conditions(rows, rng)
+        split = rng.randint(0, len(conditions))
+        yield SimpleNamespace(
+            source=rng.choice(list(FilterSource)),
+            and_=conditions[:split],
+            or_=conditions[split:],
+            global_order_by=None,
+            global_order_direction="asc",
+        )
+
+
+@pytest.mark.parametrize("strategy", list(FilterStrategy))
+def test_numpy_engine_agrees_with_sql(dataset, strategy):
+    engine, snapshot, rows = dataset
+    sql_engine = SqlAlchemyFilterEngine(SqlVoice, SqlVoice.FILTER_WHITE_LIST, strategy_selector=None)
+    numpy_engine = NumpyFilterEngine(SqlVoice.FILTER_WHITE_LIST)
+    pk = SqlVoice.__table__.primary_key.columns.values()[0]
+
+    with Session(engine) as session:
+        for payload in _payloads(rows, 150, seed=list(FilterStrategy).index(strategy)):
+            for user in (SimpleNamespace(id=1, role=role) for role in UserRole):
+                stmt = sql_engine.apply(payload, user, base_stmt=select(pk), strategy=strategy)
+                expected = sorted(session.execute(stmt).scalars())
+                actual = sorted(snapshot.values[pk.key][numpy_engine.apply(snapshot, payload, user)].tolist())
+                assert actual == expected, (payload, user.role)
+
+
+def test_snapshot_accepts_naive_and_aware_datetimes():
+    # SQLite возвращает наивные даты, PostgreSQL — aware; окно deep search должно работать для обоих
+    recent = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=1)
+    old = recent - datetime.timedelta(days=60)
+    rows = [
+        {"id": 1, "created_at": recent.replace(tzinfo=None), "is_top": True},
+        {"id": 2, "created_at": old.replace(tzinfo=None), "is_top": True},
+        {"id": 3, "created_at": recent.astimezone(datetime.timezone(datetime.timedelta(hours=3))), "is_top": True},
+        {"id": 4, "created_at": None, "is_top": True},
+    ]
+    snapshot = ColumnarSnapshot.from_rows(rows, ["id", "created_at", "is_top"])
+
+    mask = NumpyFilterEngine([])._deep_search(snapshot)
+
+    assert mask.tolist() == [True, False, True, False]
+    assert snapshot.compare("created_at", lambda col: col < np.datetime64(recent.replace(tzinfo=None), "us")).sum() == 1
@@ -0,0 +1,349 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+models = pytest.importorskip("core.repositories.alchemy.models")
+pytest.importorskip("conf.settings")
+
+from sqlalchemy import event, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+from api.v1.schemas import FilterSource  # noqa: E402
+
+from perf.seed import generate_rows  # noqa: E402
+from uow.repo import VoiceRepository  # noqa: E402
+from uow.result_cache import VoiceListCache  # noqa: E402
+from uow.thematic_catalog import ThematicCatalog  # noqa: E402
+
+SqlVoice = models.SqlVoice
+UserRole = models.UserRole
+VoiceStatus = models.VoiceStatus
+
+ADMIN = SimpleNamespace(id=1, role=UserRole.ADMIN)
+
+
+def _payload(source, and_=()):
+    return SimpleNamespace(
+        source=source,
+        and_=[SimpleNamespace(field=f, op=op, value=value) for f, op, value in and_],
+        or_=[],
+        global_order_by=None,
+        global_order_direction="asc",
+    )
+
+
+def _voices(layout: dict[str, int], status=None, statuses: dict | None = None) -> list[dict]:
+    """
+    Строки голосов: layout — voice_id -> количество записей, statuses — статус голоса (по умолчанию status или NEW).
+    """
+    statuses = statuses or {}
+    records = [(voice, f"{voice}-r{n}") for voice, count in layout.items() for n in range(count)]
+    overrides = {
+        "voice_id": lambda i, rng: records[i][0],
+        "record_id": lambda i, rng: records[i][1],
+        "status": lambda i, rng: statuses.get(records[i][0], status or VoiceStatus.NEW),
+        "user_id": lambda i, rng: None,
+        "author_id": lambda i, rng: None,
+        "is_top": lambda i, rng: True,
+    }
+    return list(generate_rows(SqlVoice.__table__, len(records), overrides))
+
+
+def run(scenario, rows: list[dict], cache: VoiceListCache | None = None):
+    """
+    Выполняет scenario(repository, session) на SQLite в памяти с таблицей голосов из rows.
+    """
+
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(SqlVoice.__table__.create)
+                await connection.execute(SqlVoice.__table__.insert(), rows)
+            async with AsyncSession(engine) as session:
+                repository = VoiceRepository(session, ThematicCatalog(), cache or VoiceListCache())
+                return await scenario(repository, session)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def _statuses(session) -> dict[str, str]:
+    record_id = SqlVoice.get_record_id()
+    result = await session.execute(select(record_id, SqlVoice.status))
+    return {record: getattr(status, "value", status) for record, status in result.all()}
+
+
+def test_annotate_updates_record_batches_with_one_statement_each():
+    rows = _voices({"a": 2, "b": 3, "c": 1}, status=VoiceStatus.IN_PROGRESS)
+    annotated = ["a-r0", "a-r1", "b-r0", "b-r1", "b-r2", "c-r0"]
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split(None, 1)[0].upper())
+
+    async def scenario(repository, session):
+        engine = session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            rows_per_batch = await repository.annotate(annotated, ["a", "b", "c"], VoiceStatus.CHANGED, batch_size=4)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        return rows_per_batch, await _statuses(session)
+
+    rows_per_batch, statuses = run(scenario, rows)
+
+    assert rows_per_batch == [4, 2]
+    assert statements == ["UPDATE", "UPDATE"]
+    assert statuses == {record: VoiceStatus.CHANGED.value for record in annotated}
+
+
+def test_annotate_does_not_reset_sibling_records():
+    rows = _voices({"a": 3, "b": 2}, status=VoiceStatus.IN_PROGRESS)
+
+    async def scenario(repository, session):
+        rows_per_batch = await repository.annotate(["a-r1", "b-r0", "x-r9"], ["a", "b"], VoiceStatus.CHANGED, 1)
+        return rows_per_batch, await _statuses(session)
+
+    rows_per_batch, statuses = run(scenario, rows)
+
+    assert rows_per_batch == [1, 1, 0]
+    assert statuses == {
+        "a-r0": VoiceStatus.IN_PROGRESS.value,
+        "a-r1": VoiceStatus.CHANGED.value,
+        "a-r2": VoiceStatus.IN_PROGRESS.value,
+        "b-r0": VoiceStatus.CHANGED.value,
+        "b-r1": VoiceStatus.IN_PROGRESS.value,
+    }
+
+
+def test_annotate_skips_records_of_other_voices():
+    rows = _voices({"a": 1, "b": 1}, status=VoiceStatus.IN_PROGRESS)
+
+    async def scenario(repository, session):
+        await repository.annotate(["a-r0", "b-r0"], ["a"], VoiceStatus.CHANGED)
+        return await _statuses(session)
+
+    assert run(scenario, rows) == {"a-r0": VoiceStatus.CHANGED.value, "b-r0": VoiceStatus.IN_PROGRESS.value}
+
+
+@pytest.mark.parametrize(
+    "and_, allowed, expected",
+    [
+        ((), VoiceStatus.NEW, (3, 0)),
+        ((), VoiceStatus.IN_PROGRESS, (3, 3)),
+        ((("voice_id", "in", ["a", "b"]),), VoiceStatus.IN_PROGRESS, (2, 2)),
+        ((("voice_id", "=", "missing"),), VoiceStatus.NEW, (0, 0)),
+    ],
+)
+def test_count_status_transition(and_, allowed, expected):
+    rows = _voices({"a": 1, "b": 1, "c": 1, "d": 2}, statuses={"d": VoiceStatus.IN_PROGRESS})
+
+    async def scenario(repository, session):
+        payload = _payload(FilterSource.ASSIGMENT_AREA, and_)
+        return await repository.count_status_transition(payload, ADMIN, allowed)
+
+    assert run(scenario, rows) == expected
+
+
+async def _authors(session) -> dict[str, int | None]:
+    result = await session.execute(select(SqlVoice.get_record_id(), SqlVoice.author_id))
+    return dict(result.all())
+
+
+def test_assign_by_filter_updates_every_record_of_matched_voices():
+    rows = _voices({"a": 2, "b": 1, "c": 1, "d": 1}, statuses={"c": VoiceStatus.IN_PROGRESS})
+    user = SimpleNamespace(id=7, role=UserRole.ADMIN)
+
+    async def scenario(repository, session):
+        payload = _payload(FilterSource.ASSIGMENT_AREA, [("voice_id", "in", ["a", "b", "c"])])
+        assigned = await repository.assign_by_filter(payload, user, VoiceStatus.NEW, VoiceStatus.IN_PROGRESS)
+        return assigned, await _statuses(session), await _authors(session)
+
+    assigned, statuses, authors = run(scenario, rows)
+
+    assert sorted(assigned) == ["a", "b"]
+    assert statuses == {
+        "a-r0": VoiceStatus.IN_PROGRESS.value,
+        "a-r1": VoiceStatus.IN_PROGRESS.value,
+        "b-r0": VoiceStatus.IN_PROGRESS.value,
+        "c-r0": VoiceStatus.IN_PROGRESS.value,
+        "d-r0": VoiceStatus.NEW.value,
+    }
+    assert authors == {"a-r0": 7, "a-r1": 7, "b-r0": 7, "c-r0": None, "d-r0": None}
+
+
+def test_unassign_by_filter_returns_voices_to_queue():
+    rows = _voices({"a": 2, "b": 1}, status=VoiceStatus.IN_PROGRESS)
+
+    async def scenario(repository, session):
+        payload = _payload(FilterSource.WORK_AREA, [("voice_id", "=", "a")])
+        unassigned = await repository.unassign_by_filter(payload, ADMIN, VoiceStatus.IN_PROGRESS, VoiceStatus.NEW)
+        return unassigned, await _statuses(session)
+
+    unassigned, statuses = run(scenario, rows)
+
+    assert unassigned == ["a"]
+    assert statuses == {
+        "a-r0": VoiceStatus.NEW.value,
+        "a-r1": VoiceStatus.NEW.value,
+        "b-r0": VoiceStatus.IN_PROGRESS.value,
+    }
+
+
+def test_annotate_by_filter_updates_matched_records_only():
+    rows = _voices({"a": 2, "b": 1, "c": 1}, status=VoiceStatus.IN_PROGRESS, statuses={"c": VoiceStatus.NEW})
+
+    async def scenario(repository, session):
+        payload = _payload(FilterSource.WORK_AREA, [("record_id", "in", ["a-r0", "b-r0", "c-r0"])])
+        annotated = await repository.annotate_by_filter(payload, ADMIN, VoiceStatus.IN_PROGRESS, VoiceStatus.CONFIRMED)
+        return annotated, await _statuses(session)
+
+    annotated, statuses = run(scenario, rows)
+
+    assert sorted(annotated) == ["a-r0", "b-r0"]
+    assert statuses == {
+        "a-r0": VoiceStatus.CONFIRMED.value,
+        "a-r1": VoiceStatus.IN_PROGRESS.value,
+        "b-r0": VoiceStatus.CONFIRMED.value,
+        "c-r0": VoiceStatus.NEW.value,
+    }
+
+
+def test_assign_by_filter_respects_operator_visibility():
+    rows = _voices({"a": 1, "b": 1}, statuses={"b": VoiceStatus.IN_PROGRESS})
+    operator = SimpleNamespace(id=3, role=UserRole.OPERATOR)
+
+    async def scenario(repository, session):
+        payload = _payload(FilterSource.ASSIGMENT_AREA)
+        total = await repository.count_status_transition(payload, operator, VoiceStatus.NEW)
+        assigned = await repository.assign_by_filter(payload, operator, VoiceStatus.NEW, VoiceStatus.IN_PROGRESS)
+        return total, assigned, await _authors(session)
+
+    total, assigned, authors = run(scenario, rows)
+
+    assert total == (1, 0)
+    assert assigned == ["a"]
+    assert authors == {"a-r0": 3, "b-r0": None}
+
+
+def test_cached_page_is_not_shared_between_sessions():
+    rows = _voices({"a": 1, "b": 1})
+    payload = _payload(FilterSource.ASSIGMENT_AREA)
+    payload.model_dump_json = lambda: "{}"
+    cache = VoiceListCache(enabled=True)
+
+    async def scenario(repository, session):
+        first, _ = await repository.get_voices_with_paginates(payload, ADMIN, 10, 0)
+        first[0].status = VoiceStatus.CHANGED
+        other = VoiceRepository(session, ThematicCatalog(), cache)
+        second, total = await other.get_voices_with_paginates(payload, ADMIN, 10, 0)
+        third, _ = await other.get_voices_with_paginates(payload, ADMIN, 10, 0)
+        return first, second, third, total
+
+    first, second, third, total = run(scenario, rows, cache)
+
+    assert cache.stats()["entries"] == 1 and total == 2
+    assert not {id(voice) for voice in first} & {id(voice) for voice in second + third}
+    assert {voice.status for voice in second} == {VoiceStatus.NEW}
+    assert [voice.voice_id for voice in second] == [voice.voice_id for voice in first]
+
+
+def test_claim_next_respects_filter_and_status():
+    rows = _voices({"a": 1, "b": 1, "c": 1, "d": 1}, statuses={"b": VoiceStatus.IN_PROGRESS})
+    user = SimpleNamespace(id=7, role=UserRole.ADMIN)
+
+    async def scenario(repository, session):
+        payload = _payload(FilterSource.ASSIGMENT_AREA, [("voice_id", "in", ["a", "b", "c"])])
+        claimed = await repository.claim_next(user, 5, payload)
+        return claimed, await _statuses(session)
+
+    claimed, statuses = run(scenario, rows)
+
+    assert sorted(claimed) == ["a", "c"]
+    assert statuses == {
+        "a-r0": VoiceStatus.IN_PROGRESS.value,
+        "b-r0": VoiceStatus.IN_PROGRESS.value,
+        "c-r0": VoiceStatus.IN_PROGRESS.value,
+        "d-r0": VoiceStatus.NEW.value,
+    }
+
+
+def test_claim_next_returns_distinct_voices_with_all_their_records():
+    rows = _voices({"a": 3, "b": 2, "c": 1, "d": 2})
+    user = SimpleNamespace(id=7, role=UserRole.ADMIN)
+
+    async def scenario(repository, session):
+        claimed = await repository.claim_next(user, 2, _payload(FilterSource.ASSIGMENT_AREA))
+        return claimed, await _statuses(session), await _authors(session)
+
+    claimed, statuses, authors = run(scenario, rows)
+
+    assert claimed == ["a", "b"]
+    in_progress = {record for record, status in statuses.items() if status == VoiceStatus.IN_PROGRESS.value}
+    assert in_progress == {"a-r0", "a-r1", "a-r2", "b-r0", "b-r1"}
+    assert {record for record, author in authors.items() if author == user.id} == in_progress
+
+
+def test_concurrent_claims_assign_each_voice_once(tmp_path):
+    # Операторы в разных сессиях разбирают общую очередь; проигранные гонки не дают двойного назначения
+    rows = _voices({f"v{i:03}": i % 3 + 1 for i in range(60)})
+    operators = [SimpleNamespace(id=i, role=UserRole.ADMIN) for i in range(1, 9)]
+    payload = _payload(FilterSource.ASSIGMENT_AREA)
+
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'voices.db'}")
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(SqlVoice.__table__.create)
+                await connection.execute(SqlVoice.__table__.insert(), rows)
+
+            async def operator(user):
+                claimed = []
+                while True:
+                    async with AsyncSession(engine) as session:
+                        repository = VoiceRepository(session, ThematicCatalog(), VoiceListCache())
+                        batch = await repository.claim_next(user, 3, payload)
+                        await session.commit()
+                    if not batch:
+                        return user.id, claimed
+                    claimed.extend(batch)
+                    await asyncio.sleep(0)
+
+            claims = dict(await asyncio.gather(*(operator(user) for user in operators)))
+            async with AsyncSession(engine) as session:
+                result = await session.execute(select(SqlVoice.get_voice_id(), SqlVoice.author_id, SqlVoice.status))
+                return claims, result.all()
+        finally:
+            await engine.dispose()
+
+    claims, stored = asyncio.run(main())
+
+    claimed = [voice for voices in claims.values() for voice in voices]
+    assert sorted(claimed) == sorted({row["voice_id"] for row in rows})
+    owners = {voice: user_id for user_id, voices in claims.items() for voice in voices}
+    assert {voice: author for voice, author, _ in stored} == owners
+    assert {getattr(status, "value", status) for _, _, status in stored} == {VoiceStatus.IN_PROGRESS.value}
+
+
+def test_projected_page_matches_orm_page():
+    rows = _voices({"a": 2, "b": 1, "c": 1})
+    payload = _payload(FilterSource.ASSIGMENT_AREA, [("voice_id", "in", ["a", "c"])])
+    columns = (SqlVoice.get_record_id(), SqlVoice.get_voice_id(), SqlVoice.status)
+
+    async def scenario(repository, session):
+        voices, total = await repository.get_voices_with_paginates(payload, ADMIN, 10, 0)
+        projected, projected_total = await repository.get_voice_rows_with_paginates(payload, ADMIN, 10, 0, columns)
+        return voices, total, projected, projected_total
+
+    voices, total, projected, projected_total = run(scenario, rows)
+
+    keys = [column.key for column in columns]
+    assert projected_total == total == 3
+    assert all(list(row) == keys for row in projected)
+    assert sorted(tuple(row.values()) for row in projected) == sorted(
+        tuple(getattr(voice, key) for key in keys) for voice in voices
+    )
@@ -0,0 +1,150 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping, Sequence
+
+from sqlalchemy import Table, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+Row = Mapping[str, Any] | Sequence[Any]
+
+# Диалекты с INSERT ... ON CONFLICT
+UPSERT_DIALECTS = {"postgresql", "sqlite"}
+
+
+@dataclass
+class ChunkFailure:
+    offset: int
+    size: int
+    error: str
+
+
+@dataclass
+class BulkSaveReport:
+    """
+    Итог массовой вставки: сколько строк сохранено, какие пачки упали и за какое время.
+    """
+
+    total: int = 0
+    saved: int = 0
+    failures: list[ChunkFailure] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.saved / self.elapsed if self.elapsed else 0.0
+
+
+def _chunks(rows: Iterable[Row], size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _upsert_stmt(dialect_name: str, table: Table, columns: Sequence[str], conflict_columns: Sequence[str]):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported for dialect {dialect_name}")
+
+    stmt = dialect_insert(table)
+    # Первичный ключ существующей строки не переписывается значением из вставляемой
+    keep = {*conflict_columns, *(column.name for column in table.primary_key.columns)}
+    update_columns = {name: stmt.excluded[name] for name in columns if name not in keep}
+    if not update_columns:
+        return stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+    return stmt.on_conflict_do_update(index_elements=conflict_columns, set_=update_columns)
+
+
+async def _copy_chunk(session: AsyncSession, table: Table, columns: Sequence[str], chunk: list[Sequence[Any]]):
+    # DML-выражение в bind_arguments: маршрутизирующая сессия отправит COPY на primary, а не на реплику
+    connection = await session.connection(bind_arguments={"clause": insert(table)})
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table.name, records=chunk, columns=list(columns), schema_name=table.schema
+    )
+
+
+async def bulk_insert(
+    session: AsyncSession,
+    table: Table,
+    rows: Iterable[Row],
+    columns: Sequence[str] | None = None,
+    chunk_size: int = 5000,
+    conflict_columns: Sequence[str] | None = None,
+    use_copy: bool = True,
+) -> BulkSaveReport:
+    """
+    Вставляет строки пачками через Core, минуя unit of work ORM.
+
+    Каждая пачка выполняется в своей точке сохранения: ошибка в пачке откатывает только её
+    и попадает в отчёт. На PostgreSQL с asyncpg обычная вставка идёт через COPY,
+    upsert — через INSERT ... ON CONFLICT DO UPDATE.
+
+    Args:
+        session: Асинхронная сессия.
+        table: Таблица для вставки.
+        rows: Словари колонок или кортежи значений в порядке columns.
+        columns: Имена колонок; обязательны для кортежей.
+        chunk_size: Размер пачки.
+        conflict_columns: Колонки уникального ключа для upsert; None — обычная вставка.
+        use_copy: Разрешить COPY на PostgreSQL.
+
+    Returns:
+        Отчёт BulkSaveReport.
+
+    Raises:
+        NotImplementedError: upsert запрошен на диалекте без ON CONFLICT; проверяется до вставки.
+    """
+    report = BulkSaveReport()
+    started = time.perf_counter()
+    dialect = session.bind.dialect
+    if conflict_columns and dialect.name not in UPSERT_DIALECTS:
+        raise NotImplementedError(
+            f"Upsert is not supported for dialect {dialect.name}; pass conflict_columns=None for a plain insert"
+        )
+    copy = use_copy and not conflict_columns and dialect.name == "postgresql" and dialect.driver == "asyncpg"
+
+    stmt = None
+    for chunk in _chunks(rows, chunk_size):
+        offset = report.total
+        report.total += len(chunk)
+        if columns is None:
+            if not isinstance(chunk[0], Mapping):
+                raise ValueError("columns are required when rows are tuples")
+            columns = list(chunk[0].keys())
+        if copy:
+            chunk = [tuple(row[name] for name in columns) if isinstance(row, Mapping) else row for row in chunk]
+        else:
+            chunk = [row if isinstance(row, Mapping) else dict(zip(columns, row)) for row in chunk]
+            if stmt is None:
+                stmt = (
+                    _upsert_stmt(dialect.name, table, columns, conflict_columns) if conflict_columns else insert(table)
+                )
+
+        try:
+            async with session.begin_nested():
+                if copy:
+                    await _copy_chunk(session, table, columns, chunk)
+                else:
+                    await session.execute(stmt, chunk)
+            report.saved += len(chunk)
+        except Exception as e:
+            logger.warning(f"Bulk insert into {table.name} failed for rows {offset}..{offset + len(chunk) - 1}: {e}")
+            report.failures.append(ChunkFailure(offset=offset, size=len(chunk), error=str(e)))
+
+    report.elapsed = time.perf_counter() - started
+    return report
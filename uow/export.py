@@ -0,0 +1,86 @@
+import csv
+import datetime
+import enum
+import io
+import json
+from typing import Any, AsyncIterator, Iterable, Mapping, Sequence
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(rows: Iterable[Mapping[str, Any]]) -> bytes:
+    """
+    Кодирует пачку строк в NDJSON: один JSON-объект на строку.
+    """
+    return "".join(
+        json.dumps({key: _plain(value) for key, value in row.items()}, ensure_ascii=False, default=str) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+class CsvEncoder:
+    """
+    Кодирует пачки строк в CSV с заданными колонками. Заголовок отдаёт header(), в том числе для пустой выборки.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _flush(self) -> bytes:
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data.encode("utf-8")
+
+    def header(self) -> bytes:
+        self._writer.writerow(self.columns)
+        return self._flush()
+
+    def encode(self, rows: Iterable[Mapping[str, Any]]) -> bytes:
+        for row in rows:
+            self._writer.writerow([_plain(row[column]) for column in self.columns])
+        return self._flush()
+
+
+async def encode_chunks(
+    chunks: AsyncIterator[list[Mapping[str, Any]]], fmt: str, columns: Sequence[str] = ()
+) -> AsyncIterator[bytes]:
+    """
+    Превращает поток пачек строк в поток байтов выбранного формата.
+
+    Следующая пачка запрашивается из БД только после того, как предыдущая отдана клиенту,
+    поэтому память не зависит от размера выборки, а медленный клиент притормаживает чтение курсора.
+
+    Args:
+        chunks: Асинхронный итератор пачек строк.
+        fmt: Формат выгрузки: ndjson или csv.
+        columns: Колонки CSV в порядке вывода; обязательны для csv.
+
+    Returns:
+        Асинхронный итератор байтов.
+    """
+    if fmt == "ndjson":
+        async for rows in chunks:
+            yield encode_ndjson(rows)
+    elif fmt == "csv":
+        if not columns:
+            raise ValueError("CSV export requires column names")
+        encoder = CsvEncoder(columns)
+        yield encoder.header()
+        async for rows in chunks:
+            yield encoder.encode(rows)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
@@ -0,0 +1,47 @@
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+Query = Callable[[AsyncSession], Awaitable[Any]]
+
+# Движок -> лимит -> семафор: читатели с одинаковым лимитом делят один семафор
+_limits: "weakref.WeakKeyDictionary[AsyncEngine, dict[int, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+class ConcurrentReader:
+    """
+    Выполняет независимые читающие запросы параллельно, каждый на своём соединении из пула.
+
+    AsyncSession не допускает конкурентных операций, поэтому каждый запрос получает
+    короткоживущую сессию, которая закрывается сразу после запроса. Запрос должен вернуть
+    строки или значения, а не ORM-объекты: после закрытия сессии они были бы отсоединены.
+    Читатели одного движка с одинаковым max_concurrency выполняют вместе не больше
+    max_concurrency запросов. При ошибке или отмене одного запроса остальные отменяются,
+    а их соединения возвращаются в пул до выхода из run().
+
+    Запросы не видят незафиксированных изменений вызывающей сессии.
+    """
+
+    def __init__(self, engine: AsyncEngine, max_concurrency: int = 4):
+        self.engine = engine
+        limits = _limits.setdefault(engine, {})
+        if max_concurrency not in limits:
+            limits[max_concurrency] = asyncio.Semaphore(max_concurrency)
+        self._semaphore = limits[max_concurrency]
+
+    async def _run_one(self, query: Query) -> Any:
+        async with self._semaphore:
+            async with AsyncSession(self.engine, expire_on_commit=False) as session:
+                return await query(session)
+
+    async def run(self, *queries: Query) -> list[Any]:
+        tasks = [asyncio.ensure_future(self._run_one(query)) for query in queries]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
@@ -0,0 +1,67 @@
+import json
+from typing import Iterator, Sequence
+
+from sqlalchemy import Boolean, String, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import coercions, roles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+
+class InIdSet(ColumnElement):
+    """
+    Проверка вхождения значения колонки в набор идентификаторов, переданный одним параметром.
+
+    Текст запроса не зависит от размера набора, поэтому план и скомпилированный запрос
+    переиспользуются между пачками любого размера.
+
+    PostgreSQL: `col = ANY(:ids)` с параметром-массивом.
+    SQLite: `col IN (SELECT value FROM json_each(:ids))` с параметром-JSON.
+    Остальные диалекты: обычный `IN` с раскрытием параметра.
+    """
+
+    type = Boolean()
+    _is_implicitly_boolean = True
+    inherit_cache = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("ids", InternalTraversal.dp_clauseelement),
+        ("ids_json", InternalTraversal.dp_clauseelement),
+        ("ids_expanding", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, column, ids: Sequence[str]):
+        self.column = coercions.expect(roles.ExpressionElementRole, column)
+        ids = list(ids)
+        # Все представления набора участвуют в ключе кеша, чтобы значения подставлялись при повторном использовании
+        self.ids = bindparam(None, ids, type_=ARRAY(String()))
+        self.ids_json = bindparam(None, json.dumps(ids), type_=String())
+        self.ids_expanding = bindparam(None, ids, expanding=True)
+
+
+@compiles(InIdSet)
+def _in_id_set_default(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    return f"({column} IN {compiler.process(element.ids_expanding, **kw)})"
+
+
+@compiles(InIdSet, "postgresql")
+def _in_id_set_postgresql(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    return f"({column} = ANY({compiler.process(element.ids, **kw)}))"
+
+
+@compiles(InIdSet, "sqlite")
+def _in_id_set_sqlite(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    return f"({column} IN (SELECT value FROM json_each({compiler.process(element.ids_json, **kw)})))"
+
+
+def in_id_set(column, ids: Sequence[str]) -> InIdSet:
+    return InIdSet(column, ids)
+
+
+def batched(ids: Sequence[str], batch_size: int) -> Iterator[Sequence[str]]:
+    for i in range(0, len(ids), batch_size):
+        yield ids[i : i + batch_size]
@@ -0,0 +1,57 @@
+import functools
+from typing import Any, Iterable, Mapping
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import inspect
+
+# Доверенные строки (прочитанные из своей БД по проекции схемы) сериализуются без валидации
+_raw_rows_adapter = TypeAdapter(list[dict[str, Any]])
+
+
+@functools.lru_cache(maxsize=None)
+def projection_columns(model, schema: type[BaseModel]) -> tuple:
+    """
+    Колонки модели, нужные для схемы ответа: поля схемы, у которых есть одноимённый атрибут-колонка.
+    """
+    column_keys = {attr.key for attr in inspect(model).column_attrs}
+    return tuple(getattr(model, name) for name in schema.model_fields if name in column_keys)
+
+
+@functools.lru_cache(maxsize=None)
+def list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+def validate_many(schema: type[BaseModel], rows: Iterable[Any], from_attributes: bool = False) -> list[BaseModel]:
+    """
+    Валидирует весь список одним вызовом TypeAdapter вместо model_validate на каждый объект.
+    """
+    return list_adapter(schema).validate_python(list(rows), from_attributes=from_attributes)
+
+
+def dump_many_json(
+    schema: type[BaseModel],
+    rows: Iterable[Mapping[str, Any] | Any],
+    trusted: bool = False,
+    from_attributes: bool = False,
+) -> bytes:
+    """
+    Сериализует список строк в JSON-массив байтов.
+
+    Args:
+        schema: Схема ответа.
+        rows: Строки-словари проекции или ORM-объекты (с from_attributes).
+        trusted: Не валидировать строки-словари, а сериализовать как есть.
+        from_attributes: Читать поля из атрибутов объектов.
+
+    Returns:
+        JSON-массив в байтах.
+    """
+    if trusted and not from_attributes:
+        return _raw_rows_adapter.dump_json([dict(row) for row in rows])
+    adapter = list_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(list(rows), from_attributes=from_attributes))
+
+
+def page_json(items: bytes, total: int) -> bytes:
+    return b'{"items":' + items + b',"total":' + str(total).encode() + b"}"
@@ -1,50 +1,118 @@
-import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Iterable, Mapping, Sequence
 
 from api.v1.schemas import FilterPayload
 from core.repositories.alchemy.db import AsyncSessionLocal
 from core.repositories.alchemy.decorators import handle_db_errors
-from core.repositories.alchemy.filters.filter_engine import SqlAlchemyFilterEngine
+from core.repositories.filters.filter_engine import SqlAlchemyFilterEngine
+from core.repositories.filters.strategy import FilterStrategy
 from core.repositories.alchemy.models import SqlThematic, SqlVoice, VoiceStatus
+from conf.settings import settings
 from core.repositories.base_repository import BaseRepository
-from sqlalchemy import and_, func, select, update
+from sqlalchemy import func, select, update
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.exc import SQLAlchemyError
+from monitoring.db import instrument_repository
+from uow.bulk import BulkSaveReport, bulk_insert
+from uow.fanout import ConcurrentReader
+from uow.id_set import batched, in_id_set
+from uow.result_cache import VoiceListCache, voice_list_cache
+from uow.routing import read_engine
+from uow.thematic_catalog import LEVELS, ThematicCatalog, ThematicSnapshot, thematic_catalog
 
+logger = logging.getLogger(__name__)
 
+# Диалекты, где claim_next выполняется одним UPDATE с FOR UPDATE SKIP LOCKED
+SKIP_LOCKED_DIALECTS = {"postgresql"}
+
+
+@instrument_repository
 class VoiceRepository(BaseRepository):
     """
     Репозиторий для работы с данными в базе данных с использованием SQLAlchemy.
     """
 
-    def __init__(self, db: AsyncSessionLocal):
+    # Базовые запросы неизменяемы и строятся один раз на класс, а не на каждый экземпляр
+    voice_model = SqlVoice
+    thematic_model = SqlThematic
+    base_thematic_stmt = select(SqlThematic)
+    base_voice_stmt = select(SqlVoice)
+    active_thematic_stmt = base_thematic_stmt.where(SqlThematic.is_active())
+    active_voice_stmt = base_voice_stmt.where(SqlVoice.is_active())
+
+    def __init__(
+        self,
+        db: AsyncSessionLocal,
+        thematic_catalog: ThematicCatalog = thematic_catalog,
+        result_cache: VoiceListCache = voice_list_cache,
+    ):
         """
         Инициализация репозитория.
 
         Args:
             db: Экземпляр асинхронной сессии базы данных.
+            thematic_catalog: Кеш дерева тематик, общий для процесса.
+            result_cache: Кеш страниц списка голосов, общий для процесса.
         """
         self.db = db
-        self.voice_model = SqlVoice
-        self.thematic_model = SqlThematic
-        self.base_thematic_stmt = select(SqlThematic)
-        self.base_voice_stmt = select(SqlVoice)
-        self.active_thematic_stmt = self.base_thematic_stmt.where(self.thematic_model.is_active())
-        self.active_voice_stmt = self.base_voice_stmt.where(self.voice_model.is_active())
+        self.thematic_catalog = thematic_catalog
+        self.result_cache = result_cache
+        self.has_writes = False
+
+    async def _read_concurrently(self, *queries):
+        """
+        Выполняет независимые читающие запросы параллельно на отдельных соединениях.
+
+        Если в сессии уже были изменения, запросы выполняются последовательно в ней же,
+        чтобы видеть собственные незафиксированные записи.
+        """
+        engine = read_engine(self.db)
+        if self.has_writes or engine is None:
+            return [await query(self.db) for query in queries]
+        return await ConcurrentReader(engine).run(*queries)
+
+    async def _load_thematics(self) -> list[SqlThematic]:
+        result = await self.db.execute(self.active_thematic_stmt)
+        thematics = result.scalars().all()
+        # Снимок разделяется между сессиями, поэтому объекты отвязываются от текущей
+        for thematic in thematics:
+            self.db.expunge(thematic)
+        return thematics
+
+    async def _thematic_version(self):
+        result = await self.db.execute(
+            self.active_thematic_stmt.with_only_columns(func.count(), func.max(self.thematic_model.updated_at))
+        )
+        return tuple(result.one())
+
+    async def _thematic_snapshot(self) -> ThematicSnapshot:
+        # Без updated_at надёжной версии нет (переименование не меняет количество), и снимок перечитывается по ttl
+        version_loader = self._thematic_version if hasattr(self.thematic_model, "updated_at") else None
+        return await self.thematic_catalog.get(
+            self._load_thematics, self.thematic_model.get_ext_id().key, version_loader
+        )
+
+    def _copy_thematic(self, thematic: SqlThematic) -> SqlThematic:
+        # Объекты снимка общие для всех сессий, поэтому наружу отдаются копии
+        columns = sa_inspect(self.thematic_model).column_attrs
+        return self.thematic_model(**{column.key: getattr(thematic, column.key) for column in columns})
 
     @handle_db_errors(default_return=[])
     async def get_all_thematics(self) -> list[SqlThematic]:
         """
-        Возвращает все категории из базы данных.
+        Возвращает все категории из снимка каталога тематик.
 
         Returns:
             Список всех категорий.
         """
-        result = await self.db.execute(self.active_thematic_stmt)
-        return result.scalars().all()
+        snapshot = await self._thematic_snapshot()
+        return [self._copy_thematic(thematic) for thematic in snapshot.thematics]
 
     @handle_db_errors(default_return=None)
     async def get_thematic_by_id(self, _id: str) -> SqlThematic | None:
         """
-        Возвращает тематику по её идентификатору.
+        Возвращает тематику по её идентификатору из снимка каталога тематик.
 
         Args:
             _id: Идентификатор тематики.
@@ -52,14 +120,16 @@ class VoiceRepository(BaseRepository):
         Returns:
             Объект тематики или None, если тематика не найдена.
         """
-        stmt = self.active_thematic_stmt.where(self.thematic_model.get_ext_id() == _id)
-        result = await self.db.execute(stmt)
-        return result.scalar_one_or_none()
+        snapshot = await self._thematic_snapshot()
+        thematic = snapshot.by_id.get(_id)
+        return self._copy_thematic(thematic) if thematic is not None else None
 
     @handle_db_errors(default_return=[])
     async def get_thematic_levels(self, ids: list[str]) -> list[dict]:
         """
-        Возвращает уровни категорий по списку идентификаторов.
+        Возвращает уровни категорий по списку идентификаторов из префиксного индекса каталога.
+
+        Для полного пути из четырёх уровней возвращается сама тематика с thematic_id.
 
         Args:
             ids: Список идентификаторов категорий.
@@ -67,32 +137,11 @@ class VoiceRepository(BaseRepository):
         Returns:
             Список словарей с уровнями категорий.
         """
-        level_fields = [
-            (SqlThematic.level_1_id, SqlThematic.level_1_name),
-            (SqlThematic.level_2_id, SqlThematic.level_2_name),
-            (SqlThematic.level_3_id, SqlThematic.level_3_name),
-            (SqlThematic.level_4_id, SqlThematic.level_4_name),
-        ]
-
-        if ids is None or len(ids) > len(level_fields):
+        if ids is None or len(ids) > LEVELS:
             return []
 
-        level = len(ids)
-
-        id_field, name_field = level_fields[level]
-        columns = [
-            id_field.label("id"),
-            name_field.label("name"),
-        ]
-        if level == 4:
-            columns.append(SqlThematic.get_ext_id().label("thematic_id"))
-        stmt = self.active_thematic_stmt.with_only_columns(*columns).distinct(id_field)
-
-        for i, id_value in enumerate(ids):
-            stmt = stmt.where(level_fields[i][0] == id_value)
-
-        result = await self.db.execute(stmt)
-        return result.mappings().all()
+        snapshot = await self._thematic_snapshot()
+        return snapshot.level_entries(tuple(ids))
 
     @handle_db_errors(default_return=([], 0))
     async def get_voices_with_paginates(
@@ -110,18 +159,75 @@ class VoiceRepository(BaseRepository):
         Returns:
             Кортеж, содержащий список голосов и общее количество голосов.
         """
+        return await self._paginate(filter_payload, user, limit, offset)
+
+    @handle_db_errors(default_return=([], 0))
+    async def get_voice_rows_with_paginates(
+        self, filter_payload: FilterPayload, user, limit: int, offset: int, columns: Sequence
+    ) -> tuple[list[dict], int]:
+        """
+        Возвращает страницу голосов в виде словарей только с нужными колонками и общее количество.
+
+        Args:
+            filter_payload: Объект FilterPayload для фильтрации голосов
+            user: Объект пользователя
+            limit: Максимальное количество возвращаемых голосов
+            offset: Сдвиг для пагинации.
+            columns: Колонки модели голоса для выборки.
+
+        Returns:
+            Кортеж, содержащий список словарей и общее количество голосов.
+        """
+        return await self._paginate(filter_payload, user, limit, offset, tuple(columns))
+
+    async def _paginate(
+        self, filter_payload: FilterPayload, user, limit: int, offset: int, columns: tuple | None = None
+    ):
+        # Пока в сессии есть незафиксированные изменения, кеш не читается и не пополняется
+        use_cache = self.result_cache.enabled and not self.has_writes
+        if use_cache:
+            projection = tuple(column.key for column in columns) if columns else None
+            cache_key = self.result_cache.key(filter_payload, user, limit, offset, projection)
+            generation = self.result_cache.generation
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                rows, total = cached
+                return self._from_rows(rows, columns), total
+
         filter_engine = SqlAlchemyFilterEngine(model=self.voice_model, white_list=self.voice_model.FILTER_WHITE_LIST)
-        stmt_voice = filter_engine.apply(filter_payload, user)
+        strategy = filter_engine.choose_strategy(filter_payload, user)
+        # Страница читается строками: запрос может выполниться в чужой короткоживущей сессии
+        base_stmt = select(*(columns or self._voice_columns()))
+        stmt_voice = filter_engine.apply(filter_payload, user, base_stmt=base_stmt, strategy=strategy)
         stmt_voice = stmt_voice.limit(limit).offset(offset)
-        stmt_voice_cnt = select(func.count()).select_from(filter_engine.apply(filter_payload, user).subquery())
-        voice_result, total_result = await asyncio.gather(
-            self.db.execute(stmt_voice),
-            self.db.execute(stmt_voice_cnt),
+        stmt_voice_cnt = select(func.count()).select_from(
+            filter_engine.apply(filter_payload, user, base_stmt=base_stmt, strategy=strategy).subquery()
         )
-        voices = voice_result.scalars().all()
-        total = total_result.scalar_one()
 
-        return voices, total
+        async def fetch_page(session):
+            result = await session.execute(stmt_voice)
+            return [dict(row) for row in result.mappings()]
+
+        async def fetch_total(session):
+            result = await session.execute(stmt_voice_cnt)
+            return result.scalar_one()
+
+        started = time.perf_counter()
+        rows, total = await self._read_concurrently(fetch_page, fetch_total)
+        filter_engine.record_latency(filter_payload, user, strategy, time.perf_counter() - started)
+
+        if use_cache:
+            self.result_cache.put(cache_key, (tuple(rows), total), generation)
+        return self._from_rows(rows, columns), total
+
+    def _voice_columns(self) -> tuple:
+        return tuple(getattr(self.voice_model, attr.key) for attr in sa_inspect(self.voice_model).column_attrs)
+
+    def _from_rows(self, rows, columns: tuple | None) -> list:
+        # Копии строк: ни кеш, ни другие вызовы не должны видеть изменений вызывающего
+        if columns:
+            return [dict(row) for row in rows]
+        return [self.voice_model(**row) for row in rows]
 
     @handle_db_errors(default_return=([], 0))
     async def get_voices(self, filter_payload: FilterPayload, user) -> list[SqlVoice]:
@@ -137,12 +243,35 @@ class VoiceRepository(BaseRepository):
             список голосов
         """
         filter_engine = SqlAlchemyFilterEngine(model=self.voice_model, white_list=self.voice_model.FILTER_WHITE_LIST)
-        stmt_voice = filter_engine.apply(filter_payload, user)
+        strategy = filter_engine.choose_strategy(filter_payload, user)
+        stmt_voice = filter_engine.apply(filter_payload, user, strategy=strategy)
 
+        started = time.perf_counter()
         voice_result = await self.db.execute(stmt_voice)
+        filter_engine.record_latency(filter_payload, user, strategy, time.perf_counter() - started)
         voices = voice_result.scalars().all()
         return voices
 
+    async def stream_voices(
+        self, filter_payload: FilterPayload, user, chunk_size: int = 1000
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Потоково читает голоса по фильтру серверным курсором.
+
+        Args:
+            filter_payload: Объект FilterPayload для фильтрации голосов
+            user: Объект пользователя
+            chunk_size: Количество строк, которое курсор отдаёт за раз.
+
+        Returns:
+            Асинхронный итератор пачек строк (словарей колонок), без ORM-объектов.
+        """
+        filter_engine = SqlAlchemyFilterEngine(model=self.voice_model, white_list=self.voice_model.FILTER_WHITE_LIST)
+        stmt = filter_engine.apply(filter_payload, user, base_stmt=select(*self.voice_model.__table__.columns))
+        result = await self.db.stream(stmt.execution_options(yield_per=chunk_size))
+        async for partition in result.mappings().partitions(chunk_size):
+            yield partition
+
     @handle_db_errors(default_return=None)
     async def get_voice_by_id(self, _id: str) -> list[SqlVoice]:
         stmt = self.active_voice_stmt.where(self.voice_model.get_voice_id() == _id)
@@ -159,41 +288,286 @@ class VoiceRepository(BaseRepository):
         Returns:
             True, если сохранение прошло успешно, иначе False.
         """
+        self.has_writes = True
         try:
             self.db.add_all(voices)
             await self.db.commit()
+            self.result_cache.invalidate()
             return True
         except SQLAlchemyError as e:
             await self.db.rollback()
-            print(f"Error during bulk insert: {e}")
+            logger.error(f"Error during bulk insert: {e}")
             return False
 
-    async def annotate(self, record_ids: list[str], voice_ids: list[str], status: VoiceStatus):
-        stmt_record = (
-            update(self.voice_model).where(self.voice_model.get_record_id().in_(record_ids)).values(status=status.value)
-        )
-        stmt_voice = update(self.voice_model).where(
-            and_(self.voice_model.get_voice_id().in_(voice_ids), self.voice_model.get_record_id().not_in(record_ids))
+    async def bulk_save_voices(
+        self,
+        rows: Iterable[Mapping[str, Any] | Sequence[Any]],
+        columns: Sequence[str] | None = None,
+        chunk_size: int = 5000,
+        upsert: bool = True,
+    ) -> BulkSaveReport:
+        """
+        Массово сохраняет голоса из словарей или кортежей без создания ORM-объектов.
+
+        Args:
+            rows: Строки голосов: словари колонок или кортежи значений в порядке columns.
+            columns: Имена колонок; обязательны для кортежей.
+            chunk_size: Размер пачки.
+            upsert: Обновлять существующие записи по record id вместо ошибки уникальности
+                (PostgreSQL и SQLite; на других диалектах — NotImplementedError до вставки).
+
+        Returns:
+            Отчёт с количеством сохранённых строк, упавшими пачками и скоростью вставки.
+        """
+        self.has_writes = True
+        conflict_columns = [self.voice_model.get_record_id().expression.name] if upsert else None
+        report = await bulk_insert(
+            self.db, self.voice_model.__table__, rows, columns, chunk_size, conflict_columns=conflict_columns
         )
-        await asyncio.gather(
-            *[
-                self.db.execute(stmt_record),
-                self.db.execute(stmt_voice),
-            ]
+        await self.db.commit()
+        self.result_cache.invalidate()
+        return report
+
+    async def count_status_transition(
+        self, filter_payload: FilterPayload, user, allowed_status: VoiceStatus
+    ) -> tuple[int, int]:
+        """
+        Считает голоса по фильтру одним запросом.
+
+        Args:
+            filter_payload: Объект FilterPayload для фильтрации голосов
+            user: Объект пользователя
+            allowed_status: Статус, из которого разрешён переход.
+
+        Returns:
+            Кортеж (количество голосов по фильтру, количество голосов в статусе, отличном от allowed_status).
+        """
+        filter_engine = SqlAlchemyFilterEngine(model=self.voice_model, white_list=self.voice_model.FILTER_WHITE_LIST)
+        filtered = filter_engine.apply(
+            filter_payload, user, base_stmt=select(self.voice_model.status), strategy=FilterStrategy.INLINE
+        ).subquery()
+        stmt = select(func.count(), func.count().filter(filtered.c.status != allowed_status.value)).select_from(
+            filtered
         )
+        result = await self.db.execute(stmt)
+        total, violations = result.one()
+        return total, violations
 
-    async def assign(self, voice_ids: list[str], status: VoiceStatus, user):
+    async def _update_by_filter(
+        self, filter_payload: FilterPayload, user, key_column, allowed_status: VoiceStatus, values: dict
+    ) -> list[str]:
+        filter_engine = SqlAlchemyFilterEngine(model=self.voice_model, white_list=self.voice_model.FILTER_WHITE_LIST)
+        matched = filter_engine.apply(
+            filter_payload,
+            user,
+            base_stmt=select(key_column).where(self.voice_model.status == allowed_status.value),
+            strategy=FilterStrategy.INLINE,
+        )
         stmt = (
             update(self.voice_model)
-            .where(self.voice_model.get_voice_id().in_(voice_ids))
-            .values(status=status.value, author_id=user.id)
+            .where(key_column.in_(matched))
+            .values(**values)
+            .returning(key_column)
+            .execution_options(synchronize_session=False)
         )
-        await self.db.execute(stmt)
+        self.has_writes = True
+        result = await self.db.execute(stmt)
+        # RETURNING возвращает ключ на каждую строку, а у голоса их несколько
+        return list(dict.fromkeys(result.scalars()))
 
-    async def unassign(self, voice_ids: list[str], status: VoiceStatus):
-        stmt = (
-            update(self.voice_model)
-            .where(self.voice_model.get_voice_id().in_(voice_ids))
-            .values(status=status.value, author_id=None)
+    async def assign_by_filter(
+        self, filter_payload: FilterPayload, user, allowed_status: VoiceStatus, status: VoiceStatus
+    ) -> list[str]:
+        """
+        Назначает пользователю голоса по фильтру одним UPDATE (аналог assign).
+
+        Returns:
+            Идентификаторы обновлённых голосов.
+        """
+        return await self._update_by_filter(
+            filter_payload,
+            user,
+            self.voice_model.get_voice_id(),
+            allowed_status,
+            {"status": status.value, "author_id": user.id},
+        )
+
+    async def unassign_by_filter(
+        self, filter_payload: FilterPayload, user, allowed_status: VoiceStatus, status: VoiceStatus
+    ) -> list[str]:
+        """
+        Снимает назначение с голосов по фильтру одним UPDATE (аналог unassign).
+
+        Returns:
+            Идентификаторы обновлённых голосов.
+        """
+        return await self._update_by_filter(
+            filter_payload,
+            user,
+            self.voice_model.get_voice_id(),
+            allowed_status,
+            {"status": status.value, "author_id": None},
+        )
+
+    async def annotate_by_filter(
+        self, filter_payload: FilterPayload, user, allowed_status: VoiceStatus, status: VoiceStatus
+    ) -> list[str]:
+        """
+        Проставляет статус записям по фильтру одним UPDATE (аналог annotate).
+
+        Returns:
+            Идентификаторы обновлённых записей.
+        """
+        return await self._update_by_filter(
+            filter_payload, user, self.voice_model.get_record_id(), allowed_status, {"status": status.value}
+        )
+
+    def _claim_candidates(self, filter_payload: FilterPayload, user, n: int):
+        """
+        Голоса-кандидаты на назначение: voice_id записей NEW по фильтру, по возрастанию voice_id.
+
+        Без DISTINCT: PostgreSQL не разрешает его вместе с FOR UPDATE, поэтому при нескольких подходящих
+        записях голоса он может встретиться несколько раз.
+        """
+        filter_engine = SqlAlchemyFilterEngine(model=self.voice_model, white_list=self.voice_model.FILTER_WHITE_LIST)
+        voice_id = self.voice_model.get_voice_id()
+        stmt = filter_engine.apply(
+            filter_payload,
+            user,
+            base_stmt=select(voice_id).where(self.voice_model.status == VoiceStatus.NEW.value),
+            strategy=FilterStrategy.INLINE,
+        )
+        return stmt.order_by(voice_id).limit(n)
+
+    async def claim_next(self, user, n: int, filter_payload: FilterPayload, max_attempts: int = 5) -> list[str]:
+        """
+        Атомарно назначает пользователю до n разных голосов в статусе NEW, подходящих под фильтр.
+
+        Назначаются все записи NEW выбранных голосов. На PostgreSQL кандидаты выбираются подзапросом
+        с FOR UPDATE SKIP LOCKED: конкурирующие операторы пропускают чужие заблокированные строки
+        вместо ожидания. На остальных диалектах — цикл compare-and-set: UPDATE выполняется
+        с повторной проверкой статуса. Если голосов набралось меньше n (кандидат встретился несколько
+        раз или гонка проиграна), недостающие добираются новыми кандидатами не более max_attempts раз.
+
+        Args:
+            user: Объект пользователя
+            n: Максимальное количество голосов.
+            filter_payload: Объект FilterPayload для фильтрации голосов
+            max_attempts: Количество попыток добора.
+
+        Returns:
+            Идентификаторы назначенных голосов без повторов.
+        """
+        voice_id = self.voice_model.get_voice_id()
+        values = {"status": VoiceStatus.IN_PROGRESS.value, "author_id": user.id}
+        self.has_writes = True
+
+        # Связь по UPDATE закрепляет сессию за primary: кандидаты читаются там же, где назначаются
+        dialect = self.db.get_bind(clause=update(self.voice_model)).dialect
+        skip_locked = dialect.name in SKIP_LOCKED_DIALECTS
+        claimed: dict[str, None] = {}
+        for _ in range(max_attempts):
+            candidates = self._claim_candidates(filter_payload, user, n - len(claimed))
+            if skip_locked:
+                batch = None
+                voices = voice_id.in_(candidates.with_for_update(skip_locked=True).scalar_subquery())
+            else:
+                batch = (await self.db.execute(candidates.distinct())).scalars().all()
+                if not batch:
+                    break
+                voices = in_id_set(voice_id, batch)
+            stmt = (
+                update(self.voice_model)
+                .where(voices, self.voice_model.status == VoiceStatus.NEW.value)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if dialect.update_returning:
+                won = (await self.db.execute(stmt.returning(voice_id))).scalars().all()
+            else:
+                await self.db.execute(stmt)
+                won_stmt = select(voice_id).where(
+                    in_id_set(voice_id, batch),
+                    self.voice_model.status == VoiceStatus.IN_PROGRESS.value,
+                    self.voice_model.author_id == user.id,
+                )
+                won = (await self.db.execute(won_stmt)).scalars().all()
+            new = [voice for voice in dict.fromkeys(won) if voice not in claimed]
+            claimed.update(dict.fromkeys(new))
+            # Под SKIP LOCKED пустой UPDATE значит, что свободных кандидатов не осталось
+            if len(claimed) >= n or (skip_locked and not new):
+                break
+        return list(claimed)[:n]
+
+    async def _update_in_batches(self, ids: list[str], batch_size: int | None, build_stmt) -> list[int]:
+        """
+        Выполняет UPDATE по пачкам идентификаторов, передавая каждую пачку одним параметром-массивом.
+
+        Текст запроса одинаков для всех пачек, поэтому план и скомпилированный запрос переиспользуются.
+
+        Args:
+            ids: Идентификаторы для обновления.
+            batch_size: Размер пачки; по умолчанию settings.db.voice_count_for_update.
+            build_stmt: Функция, строящая UPDATE по пачке идентификаторов.
+
+        Returns:
+            Количество обновлённых строк в каждой пачке.
+        """
+        self.has_writes = True
+        rows = []
+        for batch in batched(ids, batch_size or settings.db.voice_count_for_update):
+            result = await self.db.execute(build_stmt(batch), execution_options={"synchronize_session": False})
+            rows.append(result.rowcount)
+        return rows
+
+    async def annotate(
+        self, record_ids: list[str], voice_ids: list[str], status: VoiceStatus, batch_size: int | None = None
+    ) -> list[int]:
+        """
+        Проставляет статус записям голосов voice_ids; остальные записи голосов не меняются (как annotate_by_filter).
+
+        Каждая пачка record_ids обновляется одним UPDATE с условием на record_id и voice_id, поэтому
+        записи, которых нет в БД или которые принадлежат другим голосам, пропускаются без отдельного SELECT.
+
+        Returns:
+            Количество обновлённых строк в каждой пачке.
+        """
+        record_id, voice_id = self.voice_model.get_record_id(), self.voice_model.get_voice_id()
+        voices = list(dict.fromkeys(voice_ids))
+        return await self._update_in_batches(
+            record_ids,
+            batch_size,
+            lambda batch: update(self.voice_model)
+            .where(in_id_set(record_id, batch), in_id_set(voice_id, voices))
+            .values(status=status.value),
+        )
+
+    async def assign(self, voice_ids: list[str], status: VoiceStatus, user, batch_size: int | None = None) -> list[int]:
+        """
+        Назначает голоса пользователю.
+
+        Returns:
+            Количество обновлённых строк в каждой пачке.
+        """
+        return await self._update_in_batches(
+            voice_ids,
+            batch_size,
+            lambda batch: update(self.voice_model)
+            .where(in_id_set(self.voice_model.get_voice_id(), batch))
+            .values(status=status.value, author_id=user.id),
+        )
+
+    async def unassign(self, voice_ids: list[str], status: VoiceStatus, batch_size: int | None = None) -> list[int]:
+        """
+        Снимает назначение с голосов.
+
+        Returns:
+            Количество обновлённых строк в каждой пачке.
+        """
+        return await self._update_in_batches(
+            voice_ids,
+            batch_size,
+            lambda batch: update(self.voice_model)
+            .where(in_id_set(self.voice_model.get_voice_id(), batch))
+            .values(status=status.value, author_id=None),
         )
-        await self.db.execute(stmt)
@@ -0,0 +1,141 @@
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Hashable, Optional
+
+from prometheus_client import Counter, Gauge
+
+from api.v1.schemas import FilterPayload
+
+# Метрики
+CACHE_REQUESTS = Counter("voice_list_cache_requests_total", "Voice list cache lookups", ["result"])
+CACHE_EVICTIONS = Counter("voice_list_cache_evictions_total", "Voice list cache evictions", ["reason"])
+CACHE_ENTRIES = Gauge("voice_list_cache_entries", "Entries in the voice list cache", multiprocess_mode="livesum")
+CACHE_BYTES = Gauge(
+    "voice_list_cache_bytes", "Approximate memory used by the voice list cache", multiprocess_mode="livesum"
+)
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Грубая оценка памяти результата: контейнеры, словари строк, ORM-объекты (по загруженным атрибутам) и скаляры.
+    """
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value.values())
+    state = getattr(value, "__dict__", None)
+    if state is not None:
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(item) for name, item in state.items() if not name.startswith("_sa_")
+        )
+    return sys.getsizeof(value)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    size: int
+    generation: int
+    stored_at: float = field(default_factory=time.monotonic)
+
+
+class VoiceListCache:
+    """
+    Кеш страниц списка голосов в памяти процесса.
+
+    Запись вытесняется по LRU при превышении max_entries или max_bytes и устаревает через ttl секунд.
+    Любая зафиксированная запись голосов увеличивает generation: записи прошлых поколений
+    не выдаются, а результат запроса, начатого до инвалидации, не сохраняется.
+    Хранятся значения колонок (словари), а не ORM-объекты: на каждое попадание вызывающий код
+    получает новые объекты, не привязанные к чужой сессии.
+
+    Кеш рассчитан на один event loop и один процесс: generation живёт в памяти процесса,
+    и запись в другом воркере его не увеличит. При нескольких воркерах кеш не включается.
+    """
+
+    def __init__(self, enabled: bool = False, ttl: float = 30.0, max_entries: int = 1024, max_bytes: int = 64 << 20):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.generation = 0
+        self.bytes = 0
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+
+    def configure(self, **options):
+        for name, value in options.items():
+            if not hasattr(self, name):
+                raise AttributeError(f"Unknown cache option: {name}")
+            setattr(self, name, value)
+        self._shrink()
+
+    @staticmethod
+    def key(
+        filter_payload: FilterPayload, user, limit: int, offset: int, projection: Optional[tuple] = None
+    ) -> Hashable:
+        role = getattr(user.role, "value", user.role)
+        return str(role), str(user.id), filter_payload.model_dump_json(), limit, offset, projection
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None and entry.generation == self.generation:
+            if time.monotonic() - entry.stored_at < self.ttl:
+                self._entries.move_to_end(key)
+                CACHE_REQUESTS.labels("hit").inc()
+                return entry.value
+            self._evict(key, "ttl")
+            self._update_gauges()
+        CACHE_REQUESTS.labels("miss").inc()
+        return None
+
+    def put(self, key: Hashable, value: Any, generation: int):
+        """
+        Сохраняет результат, если с начала запроса (generation) не было инвалидации.
+        """
+        if not self.enabled or generation != self.generation:
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._evict(key, "replace")
+        self._entries[key] = CacheEntry(value, size, generation)
+        self.bytes += size
+        self._shrink()
+
+    def invalidate(self):
+        self.generation += 1
+        if self._entries:
+            CACHE_EVICTIONS.labels("invalidate").inc(len(self._entries))
+        self._entries.clear()
+        self.bytes = 0
+        self._update_gauges()
+
+    def _evict(self, key: Hashable, reason: str):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        CACHE_EVICTIONS.labels(reason).inc()
+
+    def _shrink(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            self._evict(next(iter(self._entries)), "lru" if len(self._entries) > self.max_entries else "memory")
+        self._update_gauges()
+
+    def _update_gauges(self):
+        CACHE_ENTRIES.set(len(self._entries))
+        CACHE_BYTES.set(self.bytes)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "generation": self.generation,
+        }
+
+
+voice_list_cache = VoiceListCache()
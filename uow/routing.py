@@ -0,0 +1,89 @@
+import itertools
+import threading
+from typing import Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+USE_PRIMARY = "use_primary"
+
+
+class EngineRouter:
+    """
+    Выбирает движок для чтения: реплику по кругу или наименее загруженную по занятым соединениям пула.
+    """
+
+    def __init__(self, primary: AsyncEngine, replicas: Sequence[AsyncEngine] = (), policy: str = "round_robin"):
+        if policy not in ("round_robin", "least_loaded"):
+            raise ValueError(f"Unknown replica policy: {policy}")
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.policy = policy
+        self._cycle = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load(engine: AsyncEngine) -> int:
+        checkedout = getattr(engine.pool, "checkedout", None)
+        return checkedout() if checkedout else 0
+
+    def pick_replica(self) -> AsyncEngine:
+        if not self.replicas:
+            return self.primary
+        if self.policy == "least_loaded":
+            return min(self.replicas, key=self._load)
+        with self._lock:
+            return next(self._cycle)
+
+
+class RoutingSession(Session):
+    """
+    Сессия, отправляющая чтения на реплику, а запись — на primary.
+
+    Реплика выбирается один раз на сессию. После первой записи (flush, DML, SELECT ... FOR UPDATE,
+    текстовый SQL) сессия закрепляется за primary, чтобы дальнейшие чтения видели свои изменения.
+    Закрепить сессию заранее можно через session.info["use_primary"] = True.
+    """
+
+    def __init__(self, *args, router: Optional[EngineRouter] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.router = router
+        self._replica: Optional[AsyncEngine] = None
+
+    def _is_write(self, clause) -> bool:
+        if self._flushing or clause is None:
+            return self._flushing
+        return (
+            getattr(clause, "is_dml", False)
+            or getattr(clause, "_for_update_arg", None) is not None
+            or isinstance(clause, TextClause)
+        )
+
+    def read_engine(self) -> AsyncEngine:
+        if self.info.get(USE_PRIMARY):
+            return self.router.primary
+        if self._replica is None:
+            self._replica = self.router.pick_replica()
+        return self._replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.router is None:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self._is_write(clause):
+            self.info[USE_PRIMARY] = True
+        return self.read_engine().sync_engine
+
+    def close(self):
+        super().close()
+        self._replica = None
+
+
+def read_engine(session: AsyncSession) -> Optional[AsyncEngine]:
+    """
+    Возвращает движок, на котором сессия сейчас выполняет чтения.
+    """
+    sync_session = session.sync_session
+    if isinstance(sync_session, RoutingSession) and sync_session.router is not None:
+        return sync_session.read_engine()
+    return session.bind if isinstance(session.bind, AsyncEngine) else None
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+LEVELS = 4
+
+
+@dataclass(frozen=True)
+class ThematicSnapshot:
+    """
+    Неизменяемый снимок дерева тематик.
+
+    levels: префикс идентификаторов уровней -> список {id, name} следующего уровня;
+    для полного префикса из четырёх уровней дополнительно указывается thematic_id.
+    """
+
+    thematics: tuple[Any, ...]
+    by_id: dict[str, Any]
+    levels: dict[tuple[str, ...], list[dict]]
+    version: Any = None
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def build(cls, thematics: list[Any], ext_id_attr: str, version: Any = None) -> "ThematicSnapshot":
+        by_id = {}
+        levels: dict[tuple[str, ...], dict[str, dict]] = {}
+        for th in thematics:
+            by_id[getattr(th, ext_id_attr)] = th
+            path = tuple(getattr(th, f"level_{i}_id") for i in range(1, LEVELS + 1))
+            for level in range(LEVELS):
+                prefix = path[:level]
+                entries = levels.setdefault(prefix, {})
+                entries.setdefault(path[level], {"id": path[level], "name": getattr(th, f"level_{level + 1}_name")})
+            levels.setdefault(path, {}).setdefault(
+                path[-1],
+                {"id": path[-1], "name": getattr(th, f"level_{LEVELS}_name"), "thematic_id": getattr(th, ext_id_attr)},
+            )
+        return cls(
+            thematics=tuple(thematics),
+            by_id=by_id,
+            levels={prefix: list(entries.values()) for prefix, entries in levels.items()},
+            version=version,
+        )
+
+    def level_entries(self, prefix: tuple[str, ...]) -> list[dict]:
+        """
+        Копии записей следующего уровня для префикса: снимок общий для всех запросов и не должен меняться.
+        """
+        return [dict(entry) for entry in self.levels.get(prefix, ())]
+
+
+class ThematicCatalog:
+    """
+    Кеш дерева тематик в памяти процесса.
+
+    Снимок перечитывается не чаще раза в ttl секунд. Если задан version_loader, по истечении ttl
+    сначала сверяется версия (дешёвый запрос), и при совпадении снимок продлевается без перезагрузки;
+    версия должна меняться при любой правке тематик. Без version_loader снимок перечитывается по ttl всегда.
+    Загрузка выполняется одним запросом: конкурентные вызовы ждут его результата, а не идут в БД.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._snapshot: Optional[ThematicSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self, snapshot: Optional[ThematicSnapshot]) -> bool:
+        return snapshot is not None and time.monotonic() - snapshot.loaded_at < self.ttl
+
+    async def get(
+        self,
+        loader: Callable[[], Awaitable[list[Any]]],
+        ext_id_attr: str,
+        version_loader: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> ThematicSnapshot:
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+
+            version = await version_loader() if version_loader else None
+            if snapshot is not None and version_loader and version == snapshot.version:
+                snapshot = ThematicSnapshot(snapshot.thematics, snapshot.by_id, snapshot.levels, version)
+            else:
+                snapshot = ThematicSnapshot.build(await loader(), ext_id_attr, version)
+            self._snapshot = snapshot
+            return snapshot
+
+    def invalidate(self):
+        self._snapshot = None
+
+
+thematic_catalog = ThematicCatalog()
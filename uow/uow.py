@@ -2,33 +2,62 @@ from contextlib import asynccontextmanager
 
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
-
-from contextlib import asynccontextmanager
-from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
-
 from uow.repo import VoiceRepository
+from uow.routing import USE_PRIMARY
 
 
 class UnitOfWork:
     def __init__(self, session_factory: async_sessionmaker):
         self.session_factory = session_factory
         self.session = None
+        self._voices = None
+        self._read_only = False
 
     @asynccontextmanager
-    async def __call__(self):
+    async def __call__(self, read_only: bool = False):
+        """
+        Открывает транзакцию.
+
+        Соединение берётся из пула только при первом запросе. Пишущая единица работы целиком
+        выполняется на primary и фиксируется, если в ней что-то выполнялось; read_only разрешает
+        читать с реплик и не делает commit. Вложенный вызов открывает точку сохранения; вложенный
+        read_only откатывает её при выходе, а пишущий вызов внутри read_only запрещён.
+
+        Raises:
+            RuntimeError: Пишущий вызов вложен в read_only.
+        """
+        if self.session is not None:
+            if self._read_only and not read_only:
+                raise RuntimeError("Нельзя открыть пишущую единицу работы внутри read_only")
+            async with self.session.begin_nested() as savepoint:
+                yield self
+                if read_only:
+                    await savepoint.rollback()
+            return
+
         self.session = self.session_factory()
+        self.session.info[USE_PRIMARY] = not read_only
+        self._read_only = read_only
         try:
             yield self
-            await self.session.commit()
+            if not read_only and self.session.in_transaction():
+                await self.session.commit()
+                if self._voices is not None and self._voices.has_writes:
+                    self._voices.result_cache.invalidate()
         except Exception:
-            await self.session.rollback()
+            if self.session.in_transaction():
+                await self.session.rollback()
             raise
         finally:
             await self.session.close()
             self.session = None
+            self._voices = None
+            self._read_only = False
 
     @property
-    def voices(self):
+    def voices(self) -> VoiceRepository:
         if self.session is None:
             raise RuntimeError("Сессия не инициализирована. Используйте 'async with uow()' для транзакций.")
-        return VoiceRepository(self.session)
+        if self._voices is None:
+            self._voices = VoiceRepository(self.session)
+        return self._voices
@@ -1,11 +1,23 @@
-from conf.settings import settings
+from typing import AsyncIterator
+
 from core.models.voice import ApiThematic, ApiThematicLevel, ApiVoice
-from core.repositories.alchemy.filters.filter_engine import FilterPayload
+from core.repositories.filters.filter_engine import FilterPayload
 from core.repositories.alchemy.models import VoiceStatus
 from core.repositories.alchemy.repository import VoiceRepository
 from core.repositories.alchemy.uow import UnitOfWork
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
+from uow.export import encode_chunks
+from uow.projection import dump_many_json, page_json, projection_columns, validate_many
+
+# Новый статус -> (статус, из которого разрешён переход, описание перехода для ошибки)
+TRANSITION_STATUS_RULES = {
+    VoiceStatus.NEW: (VoiceStatus.IN_PROGRESS, "IN_PROGRESS => NEW"),
+    VoiceStatus.IN_PROGRESS: (VoiceStatus.NEW, "NEW => IN_PROGRESS"),
+    VoiceStatus.CHANGED: (VoiceStatus.IN_PROGRESS, "IN_PROGRESS => CHANGED"),
+    VoiceStatus.CONFIRMED: (VoiceStatus.IN_PROGRESS, "IN_PROGRESS => CONFIRMED"),
+    VoiceStatus.VIEWED: (VoiceStatus.IN_PROGRESS, "IN_PROGRESS => VIEWED"),
+}
 
 
 class VoiceService:
@@ -31,7 +43,7 @@ class VoiceService:
             Список объектов ApiCategory.
         """
         thematics = await self.voices.get_all_thematics()
-        return [ApiThematic.model_validate(th) for th in thematics]
+        return validate_many(ApiThematic, thematics, from_attributes=True)
 
     async def get_thematic_by_id(self, _id) -> ApiThematic | None:
         """
@@ -54,7 +66,7 @@ class VoiceService:
             Список объектов ApiThematicLevel.
         """
         levels = await self.voices.get_thematic_levels(ids)
-        return [ApiThematicLevel.model_validate(level) for level in levels]
+        return validate_many(ApiThematicLevel, levels)
 
     async def get_voices(
         self, filter_payload: FilterPayload, user, limit: int, offset: int
@@ -72,7 +84,63 @@ class VoiceService:
             Кортеж, содержащий список объектов ApiVoice и общее количество голосов.
         """
         voices, total = await self.voices.get_voices_with_paginates(filter_payload, user, limit, offset)
-        return [ApiVoice.model_validate(voice) for voice in voices], total
+        return validate_many(ApiVoice, voices, from_attributes=True), total
+
+    async def get_voices_json(
+        self, filter_payload: FilterPayload, user, limit: int, offset: int, trusted: bool = False
+    ) -> bytes:
+        """
+        Возвращает страницу голосов сразу в JSON: {"items": [...], "total": N}.
+
+        Из БД читаются только колонки, нужные ApiVoice, а весь список валидируется и сериализуется
+        одним вызовом TypeAdapter.
+
+        Args:
+            filter_payload: Объект FilterPayload для фильтрации голосов
+            user: Объект пользователя
+            limit: Максимальное количество возвращаемых голосов
+            offset: Сдвиг для пагинации.
+            trusted: Сериализовать строки без валидации схемой.
+
+        Returns:
+            JSON-ответ в байтах.
+        """
+        columns = projection_columns(self.voices.voice_model, ApiVoice)
+        rows, total = await self.voices.get_voice_rows_with_paginates(filter_payload, user, limit, offset, columns)
+        return page_json(dump_many_json(ApiVoice, rows, trusted=trusted), total)
+
+    async def get_all_thematics_json(self) -> bytes:
+        """
+        Возвращает все тематики JSON-массивом в байтах.
+        """
+        thematics = await self.voices.get_all_thematics()
+        return dump_many_json(ApiThematic, thematics, from_attributes=True)
+
+    async def get_thematic_levels_json(self, ids: list[str]) -> bytes:
+        """
+        Возвращает уровни тематик JSON-массивом в байтах.
+        """
+        levels = await self.voices.get_thematic_levels(ids)
+        return dump_many_json(ApiThematicLevel, levels)
+
+    async def export_voices(
+        self, filter_payload: FilterPayload, user, fmt: str = "ndjson", chunk_size: int = 1000
+    ) -> AsyncIterator[bytes]:
+        """
+        Потоково выгружает голоса, соответствующие фильтру, в NDJSON или CSV.
+
+        Args:
+            filter_payload: Объект FilterPayload для фильтрации голосов
+            user: Объект пользователя
+            fmt: Формат выгрузки: ndjson или csv.
+            chunk_size: Количество строк в одной пачке.
+
+        Returns:
+            Асинхронный итератор байтов для StreamingResponse.
+        """
+        columns = self.voices.voice_model.__table__.columns.keys()
+        async for data in encode_chunks(self.voices.stream_voices(filter_payload, user, chunk_size), fmt, columns):
+            yield data
 
     async def get_voice_by_id(self, _id: str) -> list[ApiVoice]:
         """
@@ -86,38 +154,36 @@ class VoiceService:
         voices = await self.voices.get_voice_by_id(_id)
         return [ApiVoice.model_validate(voice) for voice in voices]
 
-    async def _validate_status_transition(self, current_statuses: list[VoiceStatus], new_status: VoiceStatus):
-        transition_status_rules = {
-            VoiceStatus.NEW: (lambda x: x == VoiceStatus.IN_PROGRESS, "IN_PROGRESS => NEW"),
-            VoiceStatus.IN_PROGRESS: (lambda x: x == VoiceStatus.NEW, "NEW => IN_PROGRESS"),
-            VoiceStatus.CHANGED: (lambda x: x == VoiceStatus.IN_PROGRESS, "IN_PROGRESS => CHANGED"),
-            VoiceStatus.CONFIRMED: (lambda x: x == VoiceStatus.IN_PROGRESS, "IN_PROGRESS => CONFIRMED"),
-            VoiceStatus.VIEWED: (lambda x: x == VoiceStatus.IN_PROGRESS, "IN_PROGRESS => VIEWED"),
-        }
-        rule, msg = transition_status_rules[new_status]
-        if not all(rule(status) for status in current_statuses):
-            raise HTTPException(status_code=400, detail=f"Для выбранных голосов разрешено только {msg}")
-
     async def change_status_by_filter(self, filter_payload: FilterPayload, new_status: VoiceStatus, user) -> None:
+        allowed_status, msg = TRANSITION_STATUS_RULES[new_status]
         async with self.uow() as uow:
-            voices = await uow.voices.get_voices(filter_payload, user)
-            if not voices:
+            total, violations = await uow.voices.count_status_transition(filter_payload, user, allowed_status)
+            if not total:
                 raise HTTPException(status_code=404, detail="Голоса по фильтру не найдены")
+            if violations:
+                raise HTTPException(status_code=400, detail=f"Для выбранных голосов разрешено только {msg}")
 
-            current_statuses = [VoiceStatus(vote.status) for vote in voices]
-            await self._validate_status_transition(current_statuses, new_status)
+            if new_status == VoiceStatus.IN_PROGRESS:
+                await uow.voices.assign_by_filter(filter_payload, user, allowed_status, VoiceStatus.IN_PROGRESS)
+            elif new_status in [VoiceStatus.CONFIRMED, VoiceStatus.CHANGED]:
+                await uow.voices.annotate_by_filter(filter_payload, user, allowed_status, new_status)
+            elif new_status == VoiceStatus.NEW:
+                await uow.voices.unassign_by_filter(filter_payload, user, allowed_status, VoiceStatus.NEW)
 
-            voice_ids = [voice.get_voice_id() for voice in voices]
-            record_ids = [voice.get_record_id() for voice in voices]
+    async def claim_next(self, user, n: int, filter_payload: FilterPayload) -> list[str]:
+        """
+        Назначает пользователю до n свободных голосов по фильтру без гонок между операторами.
 
-            batch_size = settings.db.voice_count_for_update
-            for i in range(0, len(voice_ids), batch_size):
-                batch_voice_ids = voice_ids[i : i + batch_size]
-                batch_record_ids = record_ids[i : i + batch_size]
+        Args:
+            user: Объект пользователя
+            n: Максимальное количество голосов.
+            filter_payload: Объект FilterPayload для фильтрации голосов
 
-                if new_status == VoiceStatus.IN_PROGRESS:
-                    await uow.voices.assign(batch_voice_ids, VoiceStatus.IN_PROGRESS, user)
-                elif new_status in [VoiceStatus.CONFIRMED, VoiceStatus.CHANGED]:
-                    await uow.voices.annotate(batch_record_ids, batch_voice_ids, new_status)
-                elif new_status == VoiceStatus.NEW:
-                    await uow.voices.unassign(batch_voice_ids, VoiceStatus.NEW)
+        Returns:
+            Идентификаторы назначенных голосов.
+        """
+        async with self.uow() as uow:
+            claimed = await uow.voices.claim_next(user, n, filter_payload)
+        if not claimed:
+            raise HTTPException(status_code=404, detail="Свободные голоса по фильтру не найдены")
+        return claimed